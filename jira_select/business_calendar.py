@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import datetime
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import portion
+from dateutil.parser import parse as parse_date
+from dateutil.tz import tzlocal
+from pytz import timezone
+
+from .intervals import IntervalSet
+from .intervals import iter_segments
+
+DateLike = Union[datetime.date, str]
+
+
+def _get_weekday(date: datetime.date) -> int:
+    """Return the day of the week as `strftime('%w')` would (0 is Sunday)."""
+    return date.isoweekday() % 7
+
+
+def _as_date(value: DateLike) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    elif isinstance(value, datetime.date):
+        return value
+
+    return parse_date(value).date()
+
+
+class BusinessCalendar:
+    """The business hours of each day for a particular schedule.
+
+    Business hours run from `start_hour` to `end_hour` (local to
+    `timezone_name`, or to your computer if unspecified) on each of
+    `work_days` (0 being Sunday) that is not one of `holidays`.
+
+    Rather than building an interval for each day, the amount of
+    business time between two moments is calculated from the number of
+    full weeks between them, the days left over, and the two partial
+    days at either end.
+
+    """
+
+    def __init__(
+        self,
+        start_hour: int = 9,
+        end_hour: int = 17,
+        timezone_name: Optional[str] = None,
+        work_days: Iterable[int] = (1, 2, 3, 4, 5),
+        holidays: Iterable[DateLike] = (),
+    ):
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.timezone_name = timezone_name
+        self.tz: datetime.tzinfo = (
+            timezone(timezone_name) if timezone_name is not None else tzlocal()
+        )
+        self.work_days = frozenset(work_days)
+        self.holidays: Tuple[datetime.date, ...] = tuple(
+            sorted({_as_date(holiday) for holiday in holidays})
+        )
+        self._holiday_set = frozenset(self.holidays)
+
+        self.day_length = datetime.timedelta(hours=end_hour - start_hour)
+
+        self._intervals: Dict[Tuple[datetime.date, datetime.date], portion.Interval] = (
+            {}
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<BusinessCalendar {self.start_hour}-{self.end_hour} "
+            f"{self.timezone_name or 'local'} on {sorted(self.work_days)}>"
+        )
+
+    def localize(self, value: datetime.datetime) -> datetime.datetime:
+        """Return `value` in this calendar's timezone.
+
+        Naive datetimes are considered to already be local to this
+        calendar's timezone.
+
+        """
+        if value.tzinfo is not None:
+            return value.astimezone(self.tz)
+
+        localize = getattr(self.tz, "localize", None)
+        if localize is not None:
+            return localize(value)
+
+        return value.replace(tzinfo=self.tz)
+
+    def is_business_day(self, date: datetime.date) -> bool:
+        return _get_weekday(date) in self.work_days and date not in self._holiday_set
+
+    def get_business_hours(
+        self, date: datetime.date
+    ) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Return the start and end of business hours on `date`."""
+        midnight = datetime.datetime.combine(date, datetime.time())
+
+        return (
+            self.localize(midnight + datetime.timedelta(hours=self.start_hour)),
+            self.localize(midnight + datetime.timedelta(hours=self.end_hour)),
+        )
+
+    def count_business_days(self, start: datetime.date, end: datetime.date) -> int:
+        """Count the business days from `start` up to (but excluding) `end`."""
+        days = (end - start).days
+        if days <= 0:
+            return 0
+
+        weeks, remainder = divmod(days, 7)
+        count = weeks * len(self.work_days)
+        first_weekday = _get_weekday(start)
+        for offset in range(remainder):
+            if (first_weekday + offset) % 7 in self.work_days:
+                count += 1
+
+        for holiday in self.holidays[
+            bisect_left(self.holidays, start) : bisect_left(self.holidays, end)
+        ]:
+            if _get_weekday(holiday) in self.work_days:
+                count -= 1
+
+        return count
+
+    def _get_partial_day(
+        self, date: datetime.date, start: datetime.datetime, end: datetime.datetime
+    ) -> datetime.timedelta:
+        if not self.is_business_day(date):
+            return datetime.timedelta()
+
+        day_start, day_end = self.get_business_hours(date)
+        overlap = min(end, day_end) - max(start, day_start)
+
+        return max(overlap, datetime.timedelta())
+
+    def _get_partial_days(
+        self,
+        first: datetime.date,
+        last: datetime.date,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> datetime.timedelta:
+        """Sum the business time between `start` and `end` on `first` to `last`."""
+        total = datetime.timedelta()
+        for offset in range((last - first).days + 1):
+            total += self._get_partial_day(
+                first + datetime.timedelta(days=offset), start, end
+            )
+
+        return total
+
+    def get_business_time(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> datetime.timedelta:
+        """Return the amount of business time between `start` and `end`."""
+        start = self.localize(start)
+        end = self.localize(end)
+        if end <= start:
+            return datetime.timedelta()
+
+        # Business hours ending after midnight (e.g. 9 to 33) spill over
+        # into the next date; the day before `start` and the day before
+        # `end` may then only partially overlap, too.
+        overhang = datetime.timedelta(days=max(self.end_hour - 1, 0) // 24)
+        start_date = start.date()
+        end_date = end.date()
+        full_start = start_date + datetime.timedelta(days=1)
+        full_end = end_date - overhang
+        if full_start >= full_end:
+            return self._get_partial_days(start_date - overhang, end_date, start, end)
+
+        return (
+            self._get_partial_days(start_date - overhang, start_date, start, end)
+            + self.count_business_days(full_start, full_end) * self.day_length
+            + self._get_partial_days(full_end, end_date, start, end)
+        )
+
+    def get_interval_business_time(
+        self, interval: Union[portion.Interval, IntervalSet]
+    ) -> datetime.timedelta:
+        """Return the amount of business time within `interval`."""
+        total = datetime.timedelta()
+        for lower, upper in iter_segments(interval):
+            total += self.get_business_time(lower, upper)
+
+        return total
+
+    def get_intervals(
+        self, start: datetime.date, end: datetime.date
+    ) -> portion.Interval:
+        """Return an interval holding the business hours of each day.
+
+        Days from `start` up to (but excluding) `end` are included; the
+        interval for each range of days is built only once.
+
+        """
+        key = (start, end)
+        if key not in self._intervals:
+            self._intervals[key] = portion.Interval(
+                *(
+                    portion.closed(*self.get_business_hours(day))
+                    for day in (
+                        start + datetime.timedelta(days=offset)
+                        for offset in range((end - start).days)
+                    )
+                    if self.is_business_day(day)
+                )
+            )
+
+        return self._intervals[key]
+
+
+@lru_cache(maxsize=None)
+def _get_business_calendar(
+    start_hour: int,
+    end_hour: int,
+    timezone_name: Optional[str],
+    work_days: Tuple[int, ...],
+    holidays: Tuple[datetime.date, ...],
+) -> BusinessCalendar:
+    return BusinessCalendar(start_hour, end_hour, timezone_name, work_days, holidays)
+
+
+def get_business_calendar(
+    start_hour: int = 9,
+    end_hour: int = 17,
+    timezone_name: Optional[str] = None,
+    work_days: Iterable[int] = (1, 2, 3, 4, 5),
+    holidays: Iterable[DateLike] = (),
+) -> BusinessCalendar:
+    """Return the (shared) business calendar for this schedule."""
+    return _get_business_calendar(
+        start_hour,
+        end_hour,
+        timezone_name,
+        tuple(sorted(set(work_days))),
+        tuple(sorted({_as_date(holiday) for holiday in holidays})),
+    )
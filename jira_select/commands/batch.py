@@ -4,12 +4,14 @@ import sys
 from csv import DictReader
 from csv import DictWriter
 from typing import List
+from typing import Optional
 from typing import Tuple
 
 from yaml import safe_load
 
 from jira_select.exceptions import UserError
 
+from ..metrics import MetricsRegistry
 from ..plugin import BaseCommand
 from ..query import Executor
 from ..types import QueryDefinition
@@ -64,6 +66,20 @@ class Command(BaseCommand):
             help="Do not use cached data.",
             dest="cache",
         )
+        parser.add_argument(
+            "--metrics-file",
+            default=None,
+            help=(
+                "Path to file where metrics describing the queries' execution "
+                "will be written."
+            ),
+        )
+        parser.add_argument(
+            "--metrics-format",
+            choices=["prometheus", "json"],
+            default="prometheus",
+            help="Format in which to write metrics; default: 'prometheus'.",
+        )
         parser.add_argument(
             "--disable-progressbars",
             "-b",
@@ -109,6 +125,24 @@ class Command(BaseCommand):
         )
         writer.writeheader()
 
+        # Metrics are gathered across every query run by the batch
+        metrics: Optional[MetricsRegistry] = None
+        if self.options.metrics_file:
+            metrics = MetricsRegistry()
+
+        try:
+            self.run_batch(query_definition, reader, writer, metrics)
+        finally:
+            if metrics is not None:
+                metrics.write(self.options.metrics_file, self.options.metrics_format)
+
+    def run_batch(
+        self,
+        query_definition: QueryDefinition,
+        reader: DictReader,
+        writer: DictWriter,
+        metrics: Optional[MetricsRegistry],
+    ) -> None:
         for input_row in reader:
             params = copy.copy(input_row)
             params.update(dict(self.options.parameters or []))
@@ -123,6 +157,7 @@ class Command(BaseCommand):
                 ),
                 parameters=params,
                 enable_cache=self.options.cache,
+                profiler=metrics,
             )
             query_rows = list(query)
 
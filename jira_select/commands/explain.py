@@ -0,0 +1,122 @@
+import argparse
+import sys
+
+from jira.exceptions import JIRAError
+from rich.progress import TaskID
+from rich.table import Table
+from yaml import safe_load
+
+from ..plugin import BaseCommand
+from ..plugin import get_installed_sources
+from ..query import CounterChannel
+from ..query import Executor
+from ..types import QueryDefinition
+from .run import parameter_tuple
+
+
+class Command(BaseCommand):
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "query_file",
+            nargs="?",
+            type=argparse.FileType("r"),
+            default=sys.stdin,
+            help="Query definition file to explain",
+        )
+        parser.add_argument(
+            "--param",
+            "-p",
+            dest="parameters",
+            action="append",
+            type=parameter_tuple,
+        )
+        parser.add_argument(
+            "--no-cache",
+            "-c",
+            default=True,
+            action="store_false",
+            help="Describe the query as it would run without cached data.",
+            dest="cache",
+        )
+        parser.add_argument(
+            "--no-estimate",
+            default=True,
+            action="store_false",
+            help="Do not ask Jira how many rows the query will find.",
+            dest="estimate",
+        )
+
+    @classmethod
+    def get_help(cls) -> str:
+        return (
+            "Describes how a query definition specified in yaml format "
+            "would be executed without running it."
+        )
+
+    def handle(self) -> None:
+        query_definition = QueryDefinition.parse_obj(safe_load(self.options.query_file))
+
+        executor = Executor(
+            self.jira,
+            query_definition,
+            parameters=dict(self.options.parameters or []),
+            enable_cache=self.options.cache,
+        )
+        plan = executor.plan
+        query = executor.query
+
+        source = get_installed_sources()[query.from_](
+            executor, TaskID(0), CounterChannel()
+        )
+
+        table = Table(show_header=False)
+        table.add_column("Step")
+        table.add_column("Details")
+
+        table.add_row(
+            "Phases",
+            " → ".join([f"source ({query.from_})", *plan.get_phases(), "select"]),
+        )
+
+        get_jql = getattr(source, "_get_jql", None)
+        if get_jql is not None:
+            table.add_row("JQL", get_jql())
+            table.add_row("Fields", plan.get_fetched_fields())
+
+        for line in plan.explain():
+            table.add_row("Plan", line)
+
+        if not query.cache:
+            cache_status = "not cached"
+        elif not self.options.cache:
+            cache_status = "disabled by --no-cache"
+        elif executor.has_cached_results():
+            cache_status = "cached results will be used"
+        else:
+            cache_status = "no usable cached results; results will be fetched"
+        table.add_row("Cache", cache_status)
+
+        get_estimated_count = getattr(source, "get_estimated_count", None)
+        if self.options.estimate and get_estimated_count is not None:
+            try:
+                row_count = get_estimated_count()
+            except JIRAError as e:
+                table.add_row("Estimated rows", f"estimate unavailable ({e.text})")
+            else:
+                table.add_row("Estimated rows", str(row_count))
+                table.add_row(
+                    "Requests (at most)",
+                    ", ".join(
+                        f"{kind}: {count}"
+                        for kind, count in plan.get_estimated_requests(
+                            row_count
+                        ).items()
+                    )
+                    or "none",
+                )
+
+        for warning in plan.get_warnings():
+            table.add_row("[yellow]Warning[/yellow]", warning)
+
+        self.console.print(table)
@@ -1,17 +1,26 @@
 import argparse
+import json
 import subprocess
 import sys
+import time
+from typing import List
 from typing import Optional
 from typing import Tuple
 
+from rich.console import Console
 from yaml import safe_load
 
 from jira_select.exceptions import UserError
 from jira_select.utils import launch_default_viewer
 
 from ..constants import DEFAULT_INLINE_VIEWERS
+from ..metrics import MetricsRegistry
 from ..plugin import BaseCommand
 from ..plugin import get_installed_formatters
+from ..profiling import NullProfiler
+from ..profiling import Profiler
+from ..profiling import Tracer
+from ..profiling import get_profiler
 from ..query import Executor
 from ..types import QueryDefinition
 
@@ -80,6 +89,40 @@ class Command(BaseCommand):
             help="Do not use cached data.",
             dest="cache",
         )
+        parser.add_argument(
+            "--profile",
+            nargs="?",
+            const="table",
+            choices=["table", "json"],
+            default=None,
+            help=(
+                "After the query completes, report where its time was spent "
+                "(to stderr) as a table (default) or as JSON."
+            ),
+        )
+        parser.add_argument(
+            "--trace",
+            type=argparse.FileType("w"),
+            default=None,
+            help=(
+                "Path to file where a timeline of the query's execution will "
+                "be written in Trace Event Format (e.g. for viewing in Perfetto)."
+            ),
+        )
+        parser.add_argument(
+            "--metrics-file",
+            default=None,
+            help=(
+                "Path to file where metrics describing the query's execution "
+                "will be written."
+            ),
+        )
+        parser.add_argument(
+            "--metrics-format",
+            choices=["prometheus", "json"],
+            default="prometheus",
+            help="Format in which to write metrics; default: 'prometheus'.",
+        )
         parser.add_argument(
             "--disable-progressbars",
             "-b",
@@ -93,6 +136,14 @@ class Command(BaseCommand):
     def get_help(cls) -> str:
         return "Runs a query definition specified in yaml format."
 
+    def print_profile(self, profiler: Profiler) -> None:
+        console = Console(stderr=True, highlight=False)
+
+        if self.options.profile == "json":
+            console.print_json(json.dumps(profiler.as_dict()))
+        else:
+            console.print(profiler.as_table())
+
     def handle(self) -> None:
         if self.options.view and self.options.output is sys.stdout:
             raise UserError("Must specify --output to use --view.")
@@ -106,6 +157,17 @@ class Command(BaseCommand):
         query_definition: QueryDefinition
         query_definition = QueryDefinition.parse_obj(safe_load(self.options.query_file))
 
+        profilers: List[NullProfiler] = []
+        if self.options.profile:
+            profilers.append(Profiler())
+        if self.options.trace:
+            profilers.append(Tracer())
+        metrics: Optional[MetricsRegistry] = None
+        if self.options.metrics_file:
+            metrics = MetricsRegistry()
+            profilers.append(metrics)
+        profiler = get_profiler(profilers)
+
         query = Executor(
             self.jira,
             query_definition,
@@ -116,11 +178,30 @@ class Command(BaseCommand):
             ),
             parameters=dict(self.options.parameters or []),
             enable_cache=self.options.cache,
+            profiler=profiler,
         )
-        with formatter_cls(query, self.options.output) as formatter:
-            for row in query:
-                formatter.writerow(row)
-                self.options.output.flush()
+        try:
+            with formatter_cls(query, self.options.output) as formatter:
+                for row in query:
+                    started = time.perf_counter()
+                    formatter.writerow(row)
+                    self.options.output.flush()
+                    profiler.record_phase("formatter", time.perf_counter() - started)
+                # Formatters like `table` and `xlsx` write their output
+                # only once the block is exited; time that, too.
+                started = time.perf_counter()
+            profiler.record_phase("formatter", time.perf_counter() - started, rows=0)
+        finally:
+            if metrics is not None:
+                metrics.write(self.options.metrics_file, self.options.metrics_format)
+            for recorded in profilers:
+                if isinstance(recorded, Tracer):
+                    recorded.write(self.options.trace)
+                    self.options.trace.close()
+
+        for recorded in profilers:
+            if isinstance(recorded, Profiler):
+                self.print_profile(recorded)
 
         if self.options.view and self.options.launch_default_viewer:
             launch_default_viewer(self.options.output.name)
@@ -19,6 +19,7 @@ from yaml import safe_load
 from .. import __version__
 from ..constants import DEFAULT_INLINE_VIEWERS
 from ..exceptions import QueryError
+from ..metrics import MetricsRegistry
 from ..plugin import BaseCommand
 from ..plugin import BaseFormatter
 from ..plugin import get_installed_formatters
@@ -34,6 +35,9 @@ class QueryParseError(Exception):
 
 
 class Command(BaseCommand):
+    # Gathered across every query run in this shell
+    metrics: Optional[MetricsRegistry] = None
+
     @classmethod
     def get_help(cls) -> str:
         return (
@@ -89,6 +93,21 @@ class Command(BaseCommand):
             choices=get_installed_formatters().keys(),
             dest="format",
         )
+        parser.add_argument(
+            "--metrics-file",
+            default=None,
+            help=(
+                "Path to file where metrics describing the execution of "
+                "each query run in this shell will be written; the file is "
+                "rewritten after each query."
+            ),
+        )
+        parser.add_argument(
+            "--metrics-format",
+            choices=["prometheus", "json"],
+            default="prometheus",
+            help="Format in which to write metrics; default: 'prometheus'.",
+        )
 
     def _prompt_loop(
         self,
@@ -106,6 +125,7 @@ class Command(BaseCommand):
                 self.jira,
                 query_definition,
                 progress_bar=self.options.enable_progressbars,
+                profiler=self.metrics,
             )
         except Exception as e:
             raise QueryParseError(e)
@@ -113,10 +133,16 @@ class Command(BaseCommand):
         outf.seek(0)
         outf.truncate()
 
-        with formatter_cls(query, outf) as formatter:
-            for row in query:
-                formatter.writerow(row)
-                outf.flush()
+        try:
+            with formatter_cls(query, outf) as formatter:
+                for row in query:
+                    formatter.writerow(row)
+                    outf.flush()
+        finally:
+            if self.metrics is not None:
+                self.metrics.write(
+                    self.options.metrics_file, self.options.metrics_format
+                )
 
         if self.options.launch_default_viewer:
             launch_default_viewer(outf.name)
@@ -154,6 +180,9 @@ class Command(BaseCommand):
         return WordCompleter(sql_completions + function_completions + field_completions)
 
     def handle(self) -> None:
+        if self.options.metrics_file:
+            self.metrics = MetricsRegistry()
+
         self.console.print(
             f"[bold]Jira-select[/bold] Shell v{__version__}",
             style="dodger_blue1 blink",
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from jira_select.plugin import BaseFunction
+
+from ..business_calendar import BusinessCalendar
+from ..business_calendar import DateLike
+from ..business_calendar import get_business_calendar
+
+
+class Function(BaseFunction):
+    """Returns a calendar of business hours for use with interval functions."""
+
+    def __call__(  # type: ignore[override]
+        self,
+        start_hour: int = 9,
+        end_hour: int = 17,
+        timezone_name: str | None = None,
+        work_days: Iterable[int] = (1, 2, 3, 4, 5),
+        holidays: Iterable[DateLike] = (),
+    ) -> BusinessCalendar:
+        return get_business_calendar(
+            start_hour, end_hour, timezone_name, work_days, holidays
+        )
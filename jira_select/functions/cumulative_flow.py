@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import datetime
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from dateutil.tz import tzlocal
+from pytz import UTC
+
+from jira_select.exceptions import QueryError
+from jira_select.plugin import BaseFunction
+
+from .get_issue_snapshot_on_date import IssueTimeline
+
+# A change in the number of issues having a particular value
+FlowEvent = Tuple[datetime.datetime, Optional[str], int]
+
+
+def _as_datetime(value: datetime.date) -> datetime.datetime:
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tzlocal())
+
+    return value
+
+
+def get_flow_events(timelines: Iterable[IssueTimeline], field: str) -> List[FlowEvent]:
+    """Return, in order, each moment an issue entered or left a value."""
+    events: List[FlowEvent] = []
+
+    for timeline in timelines:
+        field_name = timeline.resolve_field(field)
+        times = timeline.times.get(field_name, [])
+        values = timeline.values.get(field_name, [timeline.current.get(field_name)])
+
+        events.append((timeline.created, values[0], 1))
+        for time, left, entered in zip(times, values, values[1:]):
+            events.append((time, left, -1))
+            events.append((time, entered, 1))
+
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def get_cumulative_flow(
+    timelines: Iterable[IssueTimeline],
+    start: datetime.datetime,
+    end: datetime.datetime,
+    bucket: datetime.timedelta,
+    field: str = "status",
+) -> List[Dict[str, Any]]:
+    """Count the issues having each value of `field` at each bucket.
+
+    Rather than reconstructing each issue at each bucket, every change
+    made to any of the issues is gathered and sorted, then swept
+    through once while sampling the running counts at each bucket.
+
+    """
+    if bucket <= datetime.timedelta(0):
+        raise QueryError(f"Cumulative flow buckets must be positive; got {bucket}.")
+
+    events = get_flow_events(timelines, field)
+
+    counts: Dict[Optional[str], int] = {}
+    buckets: List[Dict[str, Any]] = []
+    index = 0
+
+    when = start
+    while when <= end:
+        while index < len(events) and events[index][0] <= when:
+            _, value, change = events[index]
+            counts[value] = counts.get(value, 0) + change
+            index += 1
+
+        buckets.append(
+            {
+                "date": when,
+                "counts": {value: count for value, count in counts.items() if count},
+            }
+        )
+        when += bucket
+
+    return buckets
+
+
+class Function(BaseFunction):
+    """Count the issues in each state over time for a cumulative flow diagram.
+
+    Intended for use with grouped rows; e.g. with a `group_by` of
+    `True`, `cumulative_flow(issue)` counts across every issue.
+
+    """
+
+    def __call__(  # type: ignore[override]
+        self,
+        issues: Any,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+        bucket: datetime.timedelta = datetime.timedelta(days=1),
+        field: str = "status",
+    ) -> List[Dict[str, Any]]:
+        rows = getattr(issues, "rows", None)
+        if rows is None:
+            rows = issues if isinstance(issues, (list, tuple)) else [issues]
+
+        name_map = self.executor.field_name_map if self.executor else {}
+        timelines = [IssueTimeline.for_issue(row, name_map) for row in rows]
+        if not timelines:
+            return []
+
+        return get_cumulative_flow(
+            timelines,
+            (
+                _as_datetime(start)
+                if start is not None
+                else min(timeline.created for timeline in timelines)
+            ),
+            (
+                _as_datetime(end)
+                if end is not None
+                else datetime.datetime.utcnow().replace(tzinfo=UTC)
+            ),
+            bucket,
+            field,
+        )
@@ -1,17 +1,32 @@
+from __future__ import annotations
+
 import datetime
+import re
+import sys
 from dataclasses import dataclass
 from typing import Any
+from typing import Dict
 from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 from dateutil.parser import parse as parse_date
+from pytz import UTC
 
 from ..exceptions import UserError
 from ..plugin import BaseFunction
 
+# Timestamps as Jira formats them, e.g. `2015-10-11T07:39:40.063+0000`
+JIRA_TIMESTAMP = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?"
+    r"(Z|[+-]\d{2}:?\d{2})$"
+)
+
+_TIMEZONES: Dict[str, datetime.tzinfo] = {"Z": UTC, "+0000": UTC, "+00:00": UTC}
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChangelogEntry:
     author: str = ""
     created: datetime.datetime = datetime.datetime.utcnow()
@@ -24,24 +39,122 @@ class ChangelogEntry:
     toString: Optional[str] = None
 
 
+def _get_timezone(offset: str) -> datetime.tzinfo:
+    if offset not in _TIMEZONES:
+        sign = -1 if offset[0] == "-" else 1
+        digits = offset[1:].replace(":", "")
+        _TIMEZONES[offset] = datetime.timezone(
+            sign * datetime.timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+        )
+
+    return _TIMEZONES[offset]
+
+
+def parse_timestamp(value: str) -> datetime.datetime:
+    """Parse a timestamp returned by Jira.
+
+    Jira's own timestamp format is parsed directly; anything else is
+    handed to `dateutil`.
+
+    """
+    match = JIRA_TIMESTAMP.match(value)
+    if not match:
+        return parse_date(value)
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    return datetime.datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second),
+        int(fraction.ljust(6, "0")) if fraction else 0,
+        tzinfo=_get_timezone(offset),
+    )
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class FlattenedChangelog:
+    """The entries of a changelog, flattened once and kept for reuse.
+
+    Entries are held in changelog order in `entries`, and in the order
+    in which they happened in `chronological`.  Author names, field
+    names and values are interned, since the same few of them appear
+    over and over again.
+
+    """
+
+    __slots__ = ("entries", "chronological")
+
+    def __init__(self, entries: List[ChangelogEntry]):
+        self.entries: Tuple[ChangelogEntry, ...] = tuple(entries)
+        self.chronological: Tuple[ChangelogEntry, ...] = tuple(
+            sorted(entries, key=lambda entry: entry.created)
+        )
+
+    @classmethod
+    def from_changelog(cls, changelog: Any) -> FlattenedChangelog:
+        entries: List[ChangelogEntry] = []
+
+        for history in changelog.histories:
+            author = _intern(str(history.author))
+            created = parse_timestamp(history.created)
+            id = int(history.id)
+
+            for item in history.items:
+                entries.append(
+                    ChangelogEntry(
+                        author=author,
+                        created=created,
+                        id=id,
+                        field=_intern(item.field),
+                        fieldtype=_intern(item.fieldtype),
+                        fromValue=_intern(getattr(item, "from")),  # noqa
+                        fromString=_intern(item.fromString),
+                        toValue=_intern(getattr(item, "to")),  # noqa
+                        toString=_intern(item.toString),
+                    )
+                )
+
+        return cls(entries)
+
+    def __iter__(self) -> Iterator[ChangelogEntry]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def get_flattened_changelog(changelog: Any) -> FlattenedChangelog:
+    """Return the flattened entries of `changelog`.
+
+    The entries are flattened only the first time they are requested
+    for a particular changelog; they are kept on the changelog itself
+    until its histories change.
+
+    """
+    histories = changelog.histories
+    memo: Optional[Tuple[Any, int, FlattenedChangelog]] = getattr(
+        changelog, "_jira_select_flattened", None
+    )
+    if memo is not None and memo[0] is histories and memo[1] == len(histories):
+        return memo[2]
+
+    flattened = FlattenedChangelog.from_changelog(changelog)
+    try:
+        changelog._jira_select_flattened = (histories, len(histories), flattened)
+    except AttributeError:
+        pass
+
+    return flattened
+
+
 def flatten_changelog(changelog: Any) -> Iterator[ChangelogEntry]:
-    for entry in changelog.histories:
-        author = str(entry.author)
-        created = parse_date(entry.created)
-        id = int(entry.id)
-
-        for item in entry.items:
-            yield ChangelogEntry(
-                author=author,
-                created=created,
-                id=id,
-                field=item.field,
-                fieldtype=item.fieldtype,
-                fromValue=getattr(item, "from"),  # noqa
-                fromString=item.fromString,
-                toValue=getattr(item, "to"),  # noqa
-                toString=item.toString,
-            )
+    return iter(get_flattened_changelog(changelog))
 
 
 class Function(BaseFunction):
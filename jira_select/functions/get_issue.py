@@ -1,20 +1,106 @@
 from __future__ import annotations
 
+import re
+from logging import getLogger
+from typing import Any
+from typing import Dict
+from typing import List
 from typing import Optional
 
 import jira.resources
+from jira.exceptions import JIRAError
 
 from jira_select.plugin import BaseFunction
+from jira_select.plugin import BatchCall
+
+from ..paging import map_concurrently
+
+logger = getLogger(__name__)
+
+# Maximum number of keys requested by a single `key in (...)` search
+ISSUE_BATCH_SIZE = 100
+
+ISSUE_KEY = re.compile(r"^[A-Z][A-Z0-9_]*-\d+$", re.IGNORECASE)
 
 
 class Function(BaseFunction):
-    """Fetch a Jira issue by name."""
+    """Fetch a Jira issue by name.
+
+    Each issue is fetched at most once per query; when many rows need
+    issues, they are fetched together using `key in (...)` searches.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._issues: Dict[str, jira.resources.Issue] = {}
+
+    def fetch_issues(self, keys: List[str]) -> List[jira.resources.Issue]:
+        try:
+            return self.jira.search_issues(
+                "key in ({keys})".format(keys=", ".join(f'"{key}"' for key in keys)),
+                fields="*all",
+                maxResults=len(keys),
+                # Keys Jira doesn't know are warned about, not rejected
+                validate_query="warn",
+            )
+        except JIRAError as e:
+            if len(keys) == 1:
+                raise
+
+            # Jira may still reject the whole search because of a
+            # single key; each half is searched separately so that
+            # only the keys causing that are fetched individually.
+            logger.debug("Fetching %s issues in bulk failed: %s", len(keys), e)
+            middle = len(keys) // 2
+            issues: List[jira.resources.Issue] = []
+            for half in [keys[:middle], keys[middle:]]:
+                try:
+                    issues.extend(self.fetch_issues(half))
+                except JIRAError:
+                    continue
+
+            return issues
+
+    def call_batch(self, calls: List[BatchCall]) -> List[Any]:
+        keys: Dict[str, None] = {}
+        for args, kwargs in calls:
+            if len(args) != 1 or kwargs or not isinstance(args[0], str):
+                continue
+
+            key = args[0].upper()
+            if key not in self._issues and ISSUE_KEY.match(key):
+                keys[key] = None
+
+        key_list = list(keys)
+        chunks = [
+            key_list[offset : offset + ISSUE_BATCH_SIZE]
+            for offset in range(0, len(key_list), ISSUE_BATCH_SIZE)
+        ]
+        for future in map_concurrently(self.fetch_issues, chunks):
+            try:
+                issues = future.result()
+            except JIRAError as e:
+                # Keys that could not be found in bulk (e.g. because one
+                # of them no longer exists) are fetched individually.
+                logger.debug("Fetching issues in bulk failed: %s", e)
+                continue
+
+            for issue in issues:
+                self._issues[issue.key.upper()] = issue
+
+        return super().call_batch(calls)
 
     def __call__(  # type: ignore[override]
         self,
         ticket_number: str,
     ) -> Optional[jira.resources.Issue]:
-        if ticket_number:
-            return self.jira.issue(ticket_number)
+        if not ticket_number:
+            return None
+
+        key = str(ticket_number).upper()
+        if key not in self._issues:
+            self._issues[key] = self.jira.issue(ticket_number)
 
-        return None
+        return self._issues[key]
@@ -1,19 +1,48 @@
 from __future__ import annotations
 
-import copy
 import datetime
+from bisect import bisect_right
 from typing import Any
+from typing import Dict
+from typing import Iterable
 from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
 
+import portion
 from dateutil.parser import parse as parse_datetime
 from dotmap import DotMap
 from jira.resources import Issue
 from pytz import UTC
+from QueryableList.Base import FILTER_PARAM_RE
 
 from jira_select.plugin import BaseFunction
 
 from ..exceptions import QueryError
-from .flatten_changelog import flatten_changelog
+from ..intervals import IntervalSet
+from ..intervals import Segment
+from .flatten_changelog import ChangelogEntry
+from .flatten_changelog import get_flattened_changelog
+from .simple_filter import simple_filter
+
+NON_SNAPSHOTTABLE = frozenset(
+    [
+        "changelog",
+        "components",
+        "comment",
+        "expand",
+        "parent",
+        "raw",
+        "self",
+        "subtasks",
+        "timetracking",
+        "updated",
+        "votes",
+        "watches",
+        "worklog",
+    ]
+)
 
 
 class IssueSnapshotContainer(dict):
@@ -37,81 +66,209 @@ class IssueSnapshotContainer(dict):
         return super().__setitem__(item, value)
 
 
-def snapshot_iterator(issue: Issue, field_name_map: dict[str, str]) -> Iterator[DotMap]:
-    non_snapshottable = [
-        "changelog",
-        "components",
-        "comment",
-        "expand",
-        "parent",
-        "raw",
-        "self",
-        "subtasks",
-        "timetracking",
-        "updated",
-        "votes",
-        "watches",
-        "worklog",
-    ]
-    snapshot: dict[str, Any] = IssueSnapshotContainer(
-        {
-            k: (str(v) if v is not None else None)
-            for k, v in issue.as_dict().items()
-            if not callable(v) and k not in non_snapshottable
-        },
-        field_name_map,
-    )
-    snapshot_validity_end = datetime.datetime.utcnow().replace(tzinfo=UTC)
-
-    try:
-        flattened_changelog = sorted(
-            flatten_changelog(issue.changelog),
-            key=lambda row: row.created if row.created else datetime.date(1, 1, 1),
-            reverse=True,
+def _as_snapshot_value(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+class IssueTimeline:
+    """The value of each of an issue's fields over the issue's lifetime.
+
+    For each field changed by the changelog, the times at which it was
+    changed are kept in sorted order alongside the value the field held
+    after each change, so finding a field's value at any moment is a
+    single bisection.  `changes` are expected in chronological order.
+
+    """
+
+    def __init__(
+        self,
+        created: datetime.datetime,
+        current: Dict[str, Optional[str]],
+        changes: Iterable[ChangelogEntry],
+        name_map: Dict[str, str],
+    ):
+        self.created = created
+        self.name_map = name_map
+        self.current = IssueSnapshotContainer(current, name_map)
+
+        self.times: Dict[str, List[datetime.datetime]] = {}
+        self.values: Dict[str, List[Optional[str]]] = {}
+
+        fields: Dict[str, List[ChangelogEntry]] = {}
+        for entry in changes:
+            if entry.field in NON_SNAPSHOTTABLE:
+                continue
+
+            field = entry.field
+            if field not in self.current and field in name_map:
+                field = name_map[field]
+            fields.setdefault(field, []).append(entry)
+
+        for field, entries in fields.items():
+            self.current.setdefault(field, None)
+            self.times[field] = [entry.created for entry in entries]
+            # The changelog is replayed backward from the issue's
+            # current state, so each period's value is the `from` value
+            # of the change ending it.
+            self.values[field] = [
+                *(_as_snapshot_value(entry.fromString) for entry in entries),
+                self.current[field],
+            ]
+
+        self.change_points: List[datetime.datetime] = sorted(
+            {time for times in self.times.values() for time in times}
         )
-    except AttributeError as exc:
-        raise QueryError(
-            "'expand' option of 'changelog' is required for snapshot iteration; "
-        ) from exc
 
-    for entry in flattened_changelog:
-        if entry.field in non_snapshottable:
-            continue
+        self._value_intervals: Dict[str, Dict[Optional[str], IntervalSet]] = {}
+
+    @classmethod
+    def for_issue(cls, issue: Any, name_map: Dict[str, str]) -> IssueTimeline:
+        """Return the timeline of `issue`, building it only once per row."""
+        memo: Optional[Dict[str, Any]] = getattr(issue, "_memo", None)
+        if memo is not None and "issue_timeline" in memo:
+            return memo["issue_timeline"]
 
-        snapshot.update(
+        try:
+            changes = get_flattened_changelog(issue.changelog).chronological
+        except AttributeError as exc:
+            raise QueryError(
+                "'expand' option of 'changelog' is required for snapshot iteration; "
+            ) from exc
+
+        timeline = cls(
+            parse_datetime(issue.created),
             {
-                "validity_start": entry.created,
-                "validity_end": snapshot_validity_end,
-            }
+                k: _as_snapshot_value(v)
+                for k, v in issue.as_dict().items()
+                if not callable(v) and k not in NON_SNAPSHOTTABLE
+            },
+            changes,
+            name_map,
         )
+        if memo is not None:
+            memo["issue_timeline"] = timeline
+
+        return timeline
+
+    def resolve_field(self, field: str) -> str:
+        if field not in self.current and field in self.name_map:
+            return self.name_map[field]
+
+        return field
+
+    def value_at(self, field: str, when: datetime.datetime) -> Optional[str]:
+        field = self.resolve_field(field)
+
+        times = self.times.get(field)
+        if times is None:
+            return self.current.get(field)
 
-        yield DotMap(copy.deepcopy(snapshot))
+        return self.values[field][bisect_right(times, when)]
 
-        snapshot_validity_end = entry.created
-        snapshot[entry.field] = (
-            str(entry.fromString) if entry.fromString is not None else None
+    def get_validity(
+        self, when: datetime.datetime
+    ) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Return the period during which the issue was as it was at `when`."""
+        index = bisect_right(self.change_points, when)
+
+        return (
+            self.change_points[index - 1] if index else self.created,
+            (
+                self.change_points[index]
+                if index < len(self.change_points)
+                else datetime.datetime.utcnow().replace(tzinfo=UTC)
+            ),
         )
 
-    yield DotMap(copy.deepcopy(snapshot))
+    def get_value_intervals(self, field: str) -> Dict[Optional[str], IntervalSet]:
+        """Return the periods during which `field` held each of its values.
+
+        Periods ending at the same moment another begins never overlap.
+
+        """
+        field = self.resolve_field(field)
+        if field in self._value_intervals:
+            return self._value_intervals[field]
+
+        now = datetime.datetime.utcnow().replace(tzinfo=UTC)
+        boundaries = [self.created, *self.times.get(field, []), now]
+        values = self.values.get(field, [self.current.get(field)])
+
+        segments: Dict[Optional[str], List[Segment]] = {}
+        for index, value in enumerate(values):
+            segments.setdefault(value, []).append(
+                (boundaries[index], boundaries[index + 1])
+            )
+
+        intervals = {value: IntervalSet(periods) for value, periods in segments.items()}
+        self._value_intervals[field] = intervals
+        return intervals
+
+    def get_matching_interval(self, **filter_params: Any) -> Optional[portion.Interval]:
+        """Return the periods during which the issue matched `filter_params`.
+
+        Each parameter is checked once against each distinct value its
+        field ever held, and the periods having matching values are
+        then intersected across parameters.  Returns `None` if a
+        parameter refers to a field this timeline does not know.
+
+        """
+        matching = IntervalSet(
+            [(self.created, datetime.datetime.utcnow().replace(tzinfo=UTC))]
+        )
+        for param, expected in filter_params.items():
+            param_match = FILTER_PARAM_RE.match(param)
+            field = param_match.group("field") if param_match else param
+            if self.resolve_field(field) not in self.current:
+                return None
+
+            candidates: List[DotMap] = []
+            intervals: Dict[int, IntervalSet] = {}
+            for value, interval in self.get_value_intervals(field).items():
+                candidate = DotMap({field: value})
+                candidates.append(candidate)
+                intervals[id(candidate)] = interval
+
+            matching &= IntervalSet.union_all(
+                intervals[id(candidate)]
+                for candidate in simple_filter(candidates, **{param: expected})
+            )
+
+        return matching.to_portion()
+
+    def snapshot_at(self, when: datetime.datetime) -> DotMap:
+        validity_start, validity_end = self.get_validity(when)
+
+        return DotMap(
+            {
+                **{field: self.value_at(field, when) for field in self.current},
+                "validity_start": validity_start,
+                "validity_end": validity_end,
+            }
+        )
+
+    def __iter__(self) -> Iterator[DotMap]:
+        """Yield a snapshot for each period between changes, newest first."""
+        for when in reversed(self.change_points):
+            yield self.snapshot_at(when)
+
+        yield self.snapshot_at(self.created)
+
+
+def snapshot_iterator(issue: Issue, field_name_map: dict[str, str]) -> Iterator[DotMap]:
+    return iter(IssueTimeline.for_issue(issue, field_name_map))
 
 
 class Function(BaseFunction):
     """Returns an IssueSnapshot representing the Jira Issue's state on a particular date."""
 
-    _field_name_map = None
-
     def __call__(  # type: ignore[override]
         self, issue: Issue, date: datetime.datetime
     ) -> DotMap:
-        last_snapshot: DotMap = DotMap({})
-
-        if date > parse_datetime(issue.created):
-            for snapshot in snapshot_iterator(
-                issue, self.executor.field_name_map if self.executor else {}
-            ):
-                if parse_datetime(snapshot.created) < date:
-                    return last_snapshot
-
-                last_snapshot = snapshot
+        timeline = IssueTimeline.for_issue(
+            issue, self.executor.field_name_map if self.executor else {}
+        )
+        if date <= timeline.created:
+            return DotMap({})
 
-        return last_snapshot
+        return timeline.snapshot_at(date)
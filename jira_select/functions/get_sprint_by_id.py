@@ -1,26 +1,61 @@
-from typing import Dict
+from logging import getLogger
+from typing import Any
+from typing import List
 from typing import Optional
 
 from jira.resources import Sprint
 
+from ..paging import map_concurrently
 from ..plugin import BaseFunction
+from ..plugin import BatchCall
+from ..sprint_catalog import SprintCatalog
+from ..sprint_catalog import get_sprint_catalog
+
+logger = getLogger(__name__)
 
 
 class Function(BaseFunction):
     """Returns a `jira.resources.Sprint` object for a given sprint ID string."""
 
-    CACHE: Dict[int, Sprint] = {}
+    def get_catalog(self) -> SprintCatalog:
+        return get_sprint_catalog(
+            self.jira, persist=self.executor is None or self.executor.enable_cache
+        )
 
     def get_sprint_details(self, id: int) -> Sprint:
-        if id not in self.CACHE:
-            sprint = self.jira.sprint(id)
-            self.CACHE[id] = Sprint(
-                {"agile_rest_path": self.jira._options["agile_rest_path"]},
-                None,
-                sprint.raw,
-            )
-
-        return self.CACHE[id]
+        catalog = self.get_catalog()
+
+        sprint = catalog.get_sprint(int(id))
+        if sprint is None:
+            sprint = self.jira.sprint(id).raw
+            catalog.add_sprint(sprint, sprint_id=int(id))
+
+        return Sprint(
+            {"agile_rest_path": self.jira._options["agile_rest_path"]},
+            None,
+            sprint,
+        )
+
+    def call_batch(self, calls: List[BatchCall]) -> List[Any]:
+        ids = list(
+            {
+                args[0]: None
+                for args, kwargs in calls
+                if len(args) == 1 and not kwargs and args[0] is not None
+            }
+        )
+
+        # Sprints can only be fetched one at a time, but we can at
+        # least fetch several of them at once.
+        catalog = self.get_catalog()
+        for future in map_concurrently(
+            self.get_sprint_details,
+            [id for id in ids if catalog.get_sprint(int(id)) is None],
+        ):
+            if future.exception():
+                logger.debug("Fetching sprint failed: %s", future.exception())
+
+        return super().call_batch(calls)
 
     def __call__(self, id: Optional[int]) -> Optional[Sprint]:  # type: ignore[override]
         if id is None:
@@ -1,103 +1,67 @@
+from typing import Any
 from typing import Dict
-from typing import Hashable
-from typing import Iterator
+from typing import List
 from typing import Optional
 from typing import Union
 
-from jira.exceptions import JIRAError
 from jira.resources import Sprint
 
 from ..exceptions import UserError
 from ..plugin import BaseFunction
+from ..sprint_catalog import SprintCatalog
+from ..sprint_catalog import get_sprint_catalog
+
+# Minimum age (in seconds) of a board's sprints before a sprint missing
+# from them causes them to be gathered again
+SPRINT_CATALOG_REFRESH_AFTER = 60
 
 
 class Function(BaseFunction):
     """Returns a `jira.resources.Sprint` object for a given sprint ID string."""
 
-    CACHE: Dict[Hashable, Sprint] = {}
-
-    def get_sprint_iterator(
-        self, board_name_or_id: Union[str, int]
-    ) -> Iterator[Sprint]:
-        if isinstance(board_name_or_id, int):
-            is_last = False
-            start_at = 0
-
-            while not is_last:
-                try:
-                    sprints = self.jira.sprints(
-                        board_name_or_id, startAt=start_at, maxResults=50
-                    )
-                except JIRAError:
-                    break
-
-                is_last = sprints.isLast
-                for sprint in sprints:
-                    yield sprint
-                    start_at += 1
-        else:
-            board_start = 0
-            board_is_last = False
-
-            while not board_is_last:
-                boards = self.jira.boards(
-                    startAt=board_start, maxResults=50, name=board_name_or_id
-                )
-
-                board_is_last = boards.isLast
-                for board in boards:
-                    is_last = False
-                    start_at = 0
-
-                    while not is_last:
-                        try:
-                            sprints = self.jira.sprints(
-                                board.id, startAt=start_at, maxResults=50
-                            )
-                        except JIRAError:
-                            break
-
-                        is_last = sprints.isLast
-                        for sprint in sprints:
-                            yield sprint
-                            start_at += 1
-
-                    board_start += 1
+    def find_sprints(
+        self,
+        catalog: SprintCatalog,
+        board_name_or_id: Union[str, int],
+        sprint_name: str,
+    ) -> List[Dict[str, Any]]:
+        return catalog.find_sprints(catalog.find_boards(board_name_or_id), sprint_name)
 
     def get_sprint_details(
         self, board_name_or_id: Union[str, int], sprint_name: str
     ) -> Sprint:
-        cache_key = (
-            board_name_or_id,
-            sprint_name,
+        catalog = get_sprint_catalog(
+            self.jira,
+            complete=True,
+            persist=self.executor is None or self.executor.enable_cache,
         )
-
-        if cache_key not in self.CACHE:
-            sprints = list(
-                filter(
-                    lambda sprint: sprint_name.lower() in sprint.name.lower(),
-                    self.get_sprint_iterator(board_name_or_id),
-                )
+        sprints = self.find_sprints(catalog, board_name_or_id, sprint_name)
+
+        # The sprint may have been created after the catalog was built
+        if (
+            not sprints
+            and catalog.get_refreshed_age(board_name_or_id)
+            > SPRINT_CATALOG_REFRESH_AFTER
+        ):
+            catalog.refresh_boards(board_name_or_id)
+            sprints = self.find_sprints(catalog, board_name_or_id, sprint_name)
+
+        if len(sprints) == 0:
+            raise UserError(
+                f"No sprint found on board {board_name_or_id} named {sprint_name}."
             )
-
-            if len(sprints) == 0:
-                raise UserError(
-                    f"No sprint found on board {board_name_or_id} "
-                    f"named {sprint_name}."
-                )
-            elif len(sprints) > 1:
-                raise UserError(
-                    f"More than one sprint was found on {board_name_or_id} "
-                    f"having a name like {sprint_name}: {sprints}."
-                )
-
-            self.CACHE[cache_key] = Sprint(
-                {"agile_rest_path": self.jira._options["agile_rest_path"]},
-                None,
-                sprints[0].raw,
+        elif len(sprints) > 1:
+            raise UserError(
+                f"More than one sprint was found on {board_name_or_id} "
+                f"having a name like {sprint_name}: "
+                f"{[sprint.get('name') for sprint in sprints]}."
             )
 
-        return self.CACHE[cache_key]
+        return Sprint(
+            {"agile_rest_path": self.jira._options["agile_rest_path"]},
+            None,
+            sprints[0],
+        )
 
     def __call__(self, board_name_or_id: Union[str, int], sprint_name: str) -> Optional[Sprint]:  # type: ignore[override]
         if board_name_or_id is None or sprint_name is None:
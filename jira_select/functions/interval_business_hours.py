@@ -4,11 +4,13 @@ import datetime
 from typing import Iterable
 
 import portion
-from dateutil.tz import tzlocal
-from pytz import timezone
 
 from jira_select.plugin import BaseFunction
 
+from ..business_calendar import BusinessCalendar
+from ..business_calendar import DateLike
+from ..business_calendar import get_business_calendar
+
 
 def get_business_hours_intervals(
     start: datetime.date,
@@ -17,31 +19,11 @@ def get_business_hours_intervals(
     end_hour: int = 17,
     timezone_name: str | None = None,
     work_days: Iterable[int] = (1, 2, 3, 4, 5),
+    holidays: Iterable[DateLike] = (),
 ) -> portion.Interval:
-    business_hours = portion.empty()
-
-    tz = timezone(timezone_name) if timezone_name is not None else tzlocal()
-    cursor = start
-    while cursor < end:
-        if int(cursor.strftime("%w")) in work_days:
-            min_day_date = datetime.datetime(
-                year=cursor.year,
-                month=cursor.month,
-                day=cursor.day,
-                hour=start_hour,
-            ).replace(tzinfo=tz)
-            max_day_date = datetime.datetime(
-                year=cursor.year,
-                month=cursor.month,
-                day=cursor.day,
-                hour=end_hour,
-            ).replace(tzinfo=tz)
-
-            business_hours |= portion.closed(min_day_date, max_day_date)
-
-        cursor += datetime.timedelta(days=1)
-
-    return business_hours
+    return get_business_calendar(
+        start_hour, end_hour, timezone_name, work_days, holidays
+    ).get_intervals(start, end)
 
 
 class Function(BaseFunction):
@@ -53,17 +35,17 @@ class Function(BaseFunction):
         end_hour: int = 17,
         timezone_name: str | None = None,
         work_days: Iterable[int] = (1, 2, 3, 4, 5),
+        holidays: Iterable[DateLike] = (),
+        calendar: BusinessCalendar | None = None,
     ) -> portion.Interval:
         if min_date is None:
             min_date = datetime.datetime.now().date() - datetime.timedelta(days=365)
         if max_date is None:
             max_date = datetime.datetime.now().date() + datetime.timedelta(days=1)
 
-        return get_business_hours_intervals(
-            min_date,
-            max_date,
-            start_hour,
-            end_hour,
-            timezone_name,
-            work_days,
-        )
+        if calendar is None:
+            calendar = get_business_calendar(
+                start_hour, end_hour, timezone_name, work_days, holidays
+            )
+
+        return calendar.get_intervals(min_date, max_date)
@@ -7,6 +7,7 @@ from jira.resources import Issue
 
 from jira_select.plugin import BaseFunction
 
+from .get_issue_snapshot_on_date import IssueTimeline
 from .get_issue_snapshot_on_date import snapshot_iterator
 from .simple_filter import simple_filter
 
@@ -15,14 +16,18 @@ class Function(BaseFunction):
     def __call__(  # type: ignore[override]
         self, issue: Issue, **filter_params: dict[str, Any]
     ) -> portion.Interval:
+        name_map = self.executor.field_name_map if self.executor else {}
+
+        interval = IssueTimeline.for_issue(issue, name_map).get_matching_interval(
+            **filter_params
+        )
+        if interval is not None:
+            return interval
+
         interval = portion.empty()
 
         matching_snapshots = simple_filter(
-            list(
-                snapshot_iterator(
-                    issue, self.executor.field_name_map if self.executor else {}
-                )
-            ),
+            list(snapshot_iterator(issue, name_map)),
             **filter_params,
         )
 
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import portion
+
+from jira_select.plugin import BaseFunction
+
+from ..intervals import IntervalSet
+
+
+class Function(BaseFunction):
+    """Returns an `IntervalSet` holding the same periods as an interval."""
+
+    def __call__(  # type: ignore[override]
+        self, interval: portion.Interval | IntervalSet
+    ) -> IntervalSet:
+        if isinstance(interval, IntervalSet):
+            return interval
+
+        return IntervalSet.from_portion(interval)
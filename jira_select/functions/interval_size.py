@@ -7,15 +7,28 @@ import portion
 
 from jira_select.plugin import BaseFunction
 
+from ..business_calendar import BusinessCalendar
+from ..intervals import IntervalSet
+from ..intervals import iter_segments
+
 
 class Function(BaseFunction):
     def __call__(  # type: ignore[override]
-        self, interval: portion.Interval, default=datetime.timedelta(seconds=0)
+        self,
+        interval: portion.Interval | IntervalSet,
+        default=datetime.timedelta(seconds=0),
+        calendar: BusinessCalendar | None = None,
     ) -> portion.Interval:
         total: Any = default
 
-        for subinterval in interval:
-            result = subinterval.upper - subinterval.lower
+        if isinstance(interval, IntervalSet) and calendar is None and interval:
+            return interval.size() if total is None else total + interval.size()
+
+        for lower, upper in iter_segments(interval):
+            if calendar is not None:
+                result = calendar.get_business_time(lower, upper)
+            else:
+                result = upper - lower
             if total is None:
                 total = result
             else:
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import ast
+import json
+from concurrent.futures import Future
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..utils import JiraSelectJsonEncoder
+from ..utils import normalize_value
+from .subquery import SubqueryFunction
+from .subquery import get_memo_key
+
+# Column added to the subquery for holding each row's index key;
+# removed before results are returned.
+KEY_COLUMN = "__lookup_key__"
+
+
+def get_index_key(value: Any) -> Optional[Hashable]:
+    value = normalize_value(value)
+
+    if value is None:
+        return None
+    elif isinstance(value, (dict, list, set)):
+        return json.dumps(value, cls=JiraSelectJsonEncoder, sort_keys=True)
+
+    return value
+
+
+class Function(SubqueryFunction):
+    """Returns the subquery row having a `key_expression` matching `value`.
+
+    The named subquery is run only once per query; its rows are indexed
+    by `key_expression` so that finding the row for `value` is a
+    single dictionary lookup.  Returns `None` if no row matches.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._indexes: Dict[Hashable, Future] = {}
+
+    def get_index(
+        self, subquery_name: str, key_expression: str, params: Dict[str, Any]
+    ) -> Dict[Hashable, Any]:
+        def build_index() -> Dict[Hashable, Any]:
+            index: Dict[Hashable, Any] = {}
+
+            for extra, row in self.iter_rows(
+                self.get_definition(subquery_name),
+                params,
+                {KEY_COLUMN: key_expression},
+            ):
+                row_key = get_index_key(extra[KEY_COLUMN])
+                # Like a SQL join on a non-unique key, the first row wins
+                if row_key is not None and row_key not in index:
+                    index[row_key] = row
+
+            return index
+
+        return self.memoize(
+            self._indexes,
+            (get_memo_key(subquery_name, params), key_expression),
+            build_index,
+        )
+
+    def get_prepared_arguments(
+        self, call: ast.Call
+    ) -> Tuple[List[ast.expr], Dict[str, ast.expr]]:
+        # Only the value being looked up varies from row to row; the
+        # index itself can be built before any row arrives.
+        args, kwargs = super().get_prepared_arguments(call)
+        kwargs.pop("value", None)
+
+        return args[:2], kwargs
+
+    def prepare(  # type: ignore[override]
+        self,
+        subquery_name: str,
+        key_expression: str,
+        value: Any = None,
+        **params: Any,
+    ) -> None:
+        self.get_index(subquery_name, key_expression, params)
+
+    def __call__(  # type: ignore[override]
+        self,
+        subquery_name: str,
+        key_expression: str,
+        value: Any,
+        **params: Any,
+    ) -> Optional[Any]:
+        index = self.get_index(subquery_name, key_expression, params)
+
+        probe = get_index_key(value)
+        if probe is None:
+            return None
+
+        return index.get(probe)
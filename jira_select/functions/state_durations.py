@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import datetime
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from pytz import UTC
+
+from jira_select.plugin import BaseFunction
+
+from ..business_calendar import BusinessCalendar
+from .flatten_changelog import get_flattened_changelog
+
+
+def get_state_durations(
+    changelog: Any,
+    field: str = "status",
+    calendar: Optional[BusinessCalendar] = None,
+    min_date: Optional[datetime.date] = None,
+    max_date: Optional[datetime.date] = None,
+) -> Dict[str, datetime.timedelta]:
+    """Return how long `field` held each value it was changed to.
+
+    The changelog is walked once in chronological order; each period
+    begins when `field` is changed to a value and ends when `field` is
+    next changed (or now).  If a `calendar` is provided, only business
+    time is counted.  Periods are limited to the days from `min_date`
+    up to (but excluding) `max_date`, local to the calendar's timezone
+    if there is one.
+
+    """
+    durations: Dict[str, datetime.timedelta] = {}
+
+    def add_period(
+        state: str, start: datetime.datetime, end: datetime.datetime
+    ) -> None:
+        if calendar is not None:
+            start = calendar.localize(start)
+            end = calendar.localize(end)
+        tz = start.tzinfo
+
+        if min_date is not None and start.date() < min_date:
+            start = datetime.datetime.combine(min_date, datetime.time())
+            start = calendar.localize(start) if calendar else start.replace(tzinfo=tz)
+        if max_date is not None and end.date() >= max_date:
+            end = datetime.datetime.combine(max_date, datetime.time())
+            end = calendar.localize(end) if calendar else end.replace(tzinfo=tz)
+
+        duration = (
+            calendar.get_business_time(start, end)
+            if calendar is not None
+            else max(end - start, datetime.timedelta())
+        )
+        durations[state] = durations.get(state, datetime.timedelta()) + duration
+
+    state: Optional[str] = None
+    state_start: Optional[datetime.datetime] = None
+    for entry in get_flattened_changelog(changelog).chronological:
+        if entry.field != field:
+            continue
+
+        if state is not None and state_start is not None:
+            add_period(state, state_start, entry.created)
+
+        state = entry.toString
+        state_start = entry.created
+
+    if state is not None and state_start is not None:
+        add_period(state, state_start, datetime.datetime.utcnow().replace(tzinfo=UTC))
+
+    return durations
+
+
+class Function(BaseFunction):
+    """Returns how long an issue spent in each state it was moved into."""
+
+    def __call__(  # type: ignore[override]
+        self,
+        changelog: Any,
+        field: str = "status",
+        calendar: BusinessCalendar | None = None,
+    ) -> Dict[str, datetime.timedelta]:
+        return get_state_durations(changelog, field, calendar)
@@ -1,24 +1,151 @@
 from __future__ import annotations
 
+import ast
+import re
+import threading
+from abc import abstractmethod
+from concurrent.futures import Future
+from dataclasses import dataclass
 from logging import getLogger
 from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import TypeVar
+from typing import cast
+
+from jira.exceptions import JIRAError
 
 from jira_select.plugin import BaseFunction
+from jira_select.plugin import BatchCall
 
 from ..exceptions import JiraSelectError
 from ..exceptions import QueryError
 from ..query import Executor
+from ..query import Query
+from ..types import QueryDefinition
+from ..types import SelectFieldDefinition
+from ..utils import find_used_parameters
 
 logger = getLogger(__name__)
 
+T = TypeVar("T")
 
-class Function(BaseFunction):
-    def __call__(  # type: ignore[override]
-        self, subquery_name: str, **params: dict[str, Any]
-    ) -> list[Any]:
-        params = params if params is not None else {}
-        results: list[Any] = []
+# Maximum number of values fused into a single `IN (...)` clause
+SUBQUERY_BATCH_SIZE = 100
+
+# Column added to fused subqueries for routing rows back to the
+# parameter value that requested them; removed before results are returned.
+PARTITION_COLUMN = "__subquery_partition__"
+
+EQUALITY_CLAUSE = re.compile(
+    r"^\s*(?P<field>\"[^\"]+\"|'[^']+'|[\w.\[\]]+)\s*=\s*"
+    r"(?P<quote>[\"']?)\{params\.(?P<param>\w+)\}(?P=quote)\s*$"
+)
+CUSTOM_FIELD_REFERENCE = re.compile(r"^cf\[(?P<id>\d+)\]$", re.IGNORECASE)
+UNQUOTED_VALUE = re.compile(r"^[\w.\-]+$")
+
+# Keys of a normalized Jira resource that a JQL equality might match against
+MATCHABLE_KEYS = ("key", "id", "name", "value", "accountId", "displayName")
+
+
+@dataclass
+class BatchableClause:
+    index: int
+    field: str
+    field_id: str
+    quote: str
+    param: str
+
+
+def get_memo_key(subquery_name: str, params: Dict[str, Any]) -> Hashable:
+    # Parameters reach the subquery only via string interpolation,
+    # so their string representation fully determines the result.
+    return (
+        subquery_name,
+        tuple(sorted((name, str(value)) for name, value in params.items())),
+    )
+
+
+def get_match_candidates(value: Any) -> Set[str]:
+    candidates: Set[str] = set()
+
+    if value is None:
+        return candidates
+    elif isinstance(value, dict):
+        for key in MATCHABLE_KEYS:
+            if value.get(key) is not None:
+                candidates.add(str(value[key]).casefold())
+    elif isinstance(value, list):
+        for item in value:
+            candidates |= get_match_candidates(item)
+    else:
+        candidates.add(str(value).casefold())
+
+    return candidates
+
+
+class SubqueryFunction(BaseFunction):
+    """Shared machinery for functions running one of the query's subqueries."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
 
+        self._lock = threading.Lock()
+
+    def memoize(
+        self, store: Dict[Hashable, Future], key: Hashable, compute: Callable[[], T]
+    ) -> T:
+        """Return the memoized value for `key`, computing it at most once.
+
+        Subqueries may be prepared on a background thread while rows are
+        being processed; callers arriving while that is still underway
+        wait for its result rather than running the subquery again.
+
+        """
+        with self._lock:
+            future = store.get(key)
+            is_owner = future is None
+            if future is None:
+                future = store[key] = Future()
+
+        if is_owner:
+            try:
+                future.set_result(compute())
+            except BaseException as e:
+                with self._lock:
+                    del store[key]
+                future.set_exception(e)
+                raise
+
+        return future.result()
+
+    def store(self, store: Dict[Hashable, Future], key: Hashable, value: Any) -> None:
+        with self._lock:
+            if key not in store:
+                future: Future = Future()
+                future.set_result(value)
+                store[key] = future
+
+    def get_prepared_arguments(
+        self, call: ast.Call
+    ) -> Tuple[List[ast.expr], Dict[str, ast.expr]]:
+        """Return the argument nodes determining which subquery `call` runs."""
+        return list(call.args), {
+            cast(str, keyword.arg): keyword.value for keyword in call.keywords
+        }
+
+    @abstractmethod
+    def prepare(self, *args, **kwargs) -> None:
+        """Run (and memoize) the subquery a call with these arguments needs."""
+        ...
+
+    def get_definition(self, subquery_name: str) -> QueryDefinition:
         if not self.query:
             raise JiraSelectError("Parent query unexpectedly unavailable to subquery.")
 
@@ -34,18 +161,263 @@ class Function(BaseFunction):
         if query_definition.cache is None and self.query.cache:
             query_definition.cache = self.query.cache
 
-        query = Executor(
+        return query_definition
+
+    def get_executor(
+        self, query_definition: QueryDefinition, params: Dict[str, Any]
+    ) -> Executor:
+        return Executor(
             self.jira,
             query_definition,
             progress_bar=False,
             parameters=params,
             schema=self.executor.schema if self.executor else None,
+            errors=self.executor.errors if self.executor else None,
+            known_names=self.executor.known_names if self.executor else None,
+        )
+
+    def shape_row(self, query_definition: QueryDefinition, row: Dict[str, Any]) -> Any:
+        row_values = list(row.values())
+        if len(query_definition.select) == 1:
+            return row_values[0]
+        return row_values
+
+    def iter_rows(
+        self,
+        query_definition: QueryDefinition,
+        params: Dict[str, Any],
+        extra_columns: Optional[Dict[str, str]] = None,
+    ) -> Iterator[Tuple[Dict[str, Any], Any]]:
+        """Yield each subquery row alongside the values of `extra_columns`.
+
+        Extra columns are evaluated against the subquery's own rows, but
+        are not included in the shaped result.
+
+        """
+        executed_definition = query_definition
+        if extra_columns:
+            select: List[Any] = list(Query(self.jira, query_definition).select)
+            select.extend(
+                SelectFieldDefinition(expression=expression, column=column)
+                for column, expression in extra_columns.items()
+            )
+            executed_definition = query_definition.copy(update={"select": select})
+
+        for row in self.get_executor(executed_definition, params):
+            extra = {column: row.pop(column) for column in extra_columns or {}}
+            yield extra, self.shape_row(query_definition, row)
+
+
+class Function(SubqueryFunction):
+    """Runs a subquery by name with the provided parameters.
+
+    Results are memoized for the duration of the parent query; when the
+    subquery's `where` compares a field to a single parameter, calls for
+    many rows are fused into a handful of `IN (...)` searches.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._results: Dict[Hashable, Future] = {}
+        self._batchable_clauses: Dict[str, Optional[BatchableClause]] = {}
+
+    def get_field_id(self, field: str) -> Optional[str]:
+        field = field.strip("\"'")
+
+        if custom_field_match := CUSTOM_FIELD_REFERENCE.match(field):
+            return f"customfield_{custom_field_match.group('id')}"
+
+        schema = self.executor.get_source_schema() if self.executor else []
+        for schema_row in schema:
+            if schema_row.id == field:
+                return schema_row.id
+        for schema_row in schema:
+            if field.casefold() in (
+                schema_row.id.casefold(),
+                (schema_row.description or "").casefold(),
+            ):
+                return schema_row.id
+
+        return field if field.isidentifier() else None
+
+    def get_batchable_clause(self, subquery_name: str) -> Optional[BatchableClause]:
+        if subquery_name in self._batchable_clauses:
+            return self._batchable_clauses[subquery_name]
+
+        query_definition = self.get_definition(subquery_name)
+        clause: Optional[BatchableClause] = None
+
+        # Rows of a fused search can only be routed back to the call
+        # that requested them when nothing merges or truncates them.
+        if (
+            query_definition.from_ == "issues"
+            and isinstance(query_definition.where, list)
+            and not query_definition.group_by
+            and not query_definition.having
+            and query_definition.limit is None
+            and query_definition.cap is None
+        ):
+            for index, where in enumerate(query_definition.where):
+                match = EQUALITY_CLAUSE.match(str(where))
+                if not match:
+                    continue
+
+                param = match.group("param")
+                field_id = self.get_field_id(match.group("field"))
+                local_expressions = " ".join(
+                    str(expression)
+                    for expression in [
+                        *(
+                            query_definition.select
+                            if isinstance(query_definition.select, list)
+                            else query_definition.select.values()
+                        ),
+                        *query_definition.calculate.values(),
+                        *query_definition.filter_,
+                        *query_definition.sort_by,
+                    ]
+                )
+                if field_id is None or param in find_used_parameters(local_expressions):
+                    continue
+
+                clause = BatchableClause(
+                    index=index,
+                    field=match.group("field"),
+                    field_id=field_id,
+                    quote=match.group("quote"),
+                    param=param,
+                )
+                break
+
+        self._batchable_clauses[subquery_name] = clause
+        return clause
+
+    def format_value(self, clause: BatchableClause, value: Any) -> Optional[str]:
+        value_str = str(value)
+
+        if clause.quote:
+            if clause.quote in value_str or "\\" in value_str:
+                return None
+        elif not UNQUOTED_VALUE.match(value_str):
+            return None
+
+        # The fused JQL is interpolated once more by the subquery executor
+        value_str = value_str.replace("{", "{{").replace("}", "}}")
+        return f"{clause.quote}{value_str}{clause.quote}"
+
+    def run_fused(
+        self,
+        subquery_name: str,
+        clause: BatchableClause,
+        params: Dict[str, Any],
+        values: Dict[str, str],
+    ) -> None:
+        query_definition = self.get_definition(subquery_name)
+        assert isinstance(query_definition.where, list)
+
+        where = list(query_definition.where)
+        where[clause.index] = "{field} in ({values})".format(
+            field=clause.field, values=", ".join(values.values())
+        )
+        fused_definition = query_definition.copy(update={"where": where})
+
+        partitions: Dict[str, List[Any]] = {value: [] for value in values}
+        lookup = {value.casefold(): value for value in values}
+        try:
+            for extra, row in self.iter_rows(
+                fused_definition, params, {PARTITION_COLUMN: clause.field_id}
+            ):
+                partition_value = extra[PARTITION_COLUMN]
+                matched = [
+                    lookup[candidate]
+                    for candidate in get_match_candidates(partition_value)
+                    if candidate in lookup
+                ]
+                if not matched:
+                    logger.debug(
+                        "Could not route fused subquery row to a parameter value "
+                        "(%s); falling back to individual subqueries.",
+                        partition_value,
+                    )
+                    return
+
+                for value in matched:
+                    partitions[value].append(row)
+        except JIRAError as e:
+            logger.debug(
+                "Fused subquery failed (%s); falling back to individual subqueries.",
+                e,
+            )
+            return
+
+        for value, rows in partitions.items():
+            self.store(
+                self._results,
+                get_memo_key(subquery_name, {**params, clause.param: value}),
+                rows,
+            )
+
+    def call_batch(self, calls: List[BatchCall]) -> List[Any]:
+        groups: Dict[
+            Hashable, Tuple[str, BatchableClause, Dict[str, Any], Dict[str, str]]
+        ] = {}
+
+        for args, params in calls:
+            if len(args) != 1 or not isinstance(args[0], str):
+                continue
+            subquery_name = args[0]
+
+            if get_memo_key(subquery_name, params) in self._results:
+                continue
+
+            clause = self.get_batchable_clause(subquery_name)
+            if clause is None or clause.param not in params:
+                continue
+
+            formatted = self.format_value(clause, params[clause.param])
+            if formatted is None:
+                continue
+
+            shared_params = {
+                name: value for name, value in params.items() if name != clause.param
+            }
+            _, _, _, values = groups.setdefault(
+                get_memo_key(subquery_name, shared_params),
+                (subquery_name, clause, shared_params, {}),
+            )
+            values[str(params[clause.param])] = formatted
+
+        for subquery_name, clause, shared_params, values in groups.values():
+            value_list = list(values.items())
+            for offset in range(0, len(value_list), SUBQUERY_BATCH_SIZE):
+                self.run_fused(
+                    subquery_name,
+                    clause,
+                    shared_params,
+                    dict(value_list[offset : offset + SUBQUERY_BATCH_SIZE]),
+                )
+
+        return super().call_batch(calls)
+
+    def __call__(  # type: ignore[override]
+        self, subquery_name: str, **params: dict[str, Any]
+    ) -> list[Any]:
+        params = params if params is not None else {}
+
+        return list(
+            self.memoize(
+                self._results,
+                get_memo_key(subquery_name, params),
+                lambda: [
+                    row
+                    for _, row in self.iter_rows(
+                        self.get_definition(subquery_name), params
+                    )
+                ],
+            )
         )
-        for row in query:
-            row_values = list(row.values())
-            if len(query_definition.select) == 1:
-                results.append(row_values[0])
-            else:
-                results.append(row_values)
-
-        return results
+
+    def prepare(self, subquery_name: str, **params: Any) -> None:  # type: ignore[override]
+        self(subquery_name, **params)
@@ -2,14 +2,28 @@ from __future__ import annotations
 
 import operator
 from functools import reduce
+from typing import Any
 from typing import Iterable
+from typing import List
 from typing import TypeVar
 
+import portion
+
 from jira_select.plugin import BaseFunction
 
+from ..intervals import IntervalSet
+
 X = TypeVar("X")
 
 
 class Function(BaseFunction):
     def __call__(self, iterable: Iterable[X]) -> X:  # type: ignore[override]
-        return reduce(operator.or_, iterable)
+        items: List[Any] = list(iterable)
+
+        # Intervals are merged all at once rather than one at a time
+        if items and all(isinstance(item, IntervalSet) for item in items):
+            return IntervalSet.union_all(items)  # type: ignore[return-value]
+        elif items and all(isinstance(item, portion.Interval) for item in items):
+            return portion.Interval(*items)
+
+        return reduce(operator.or_, items)
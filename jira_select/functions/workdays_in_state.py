@@ -4,13 +4,10 @@ from typing import Iterable
 from typing import Optional
 from warnings import warn
 
-from dateutil.tz import tzlocal
-from pytz import UTC
-from pytz import timezone
-
 from jira_select.plugin import BaseFunction
 
-from .flatten_changelog import flatten_changelog
+from ..business_calendar import get_business_calendar
+from .state_durations import get_state_durations
 
 
 class Function(BaseFunction):
@@ -33,59 +30,16 @@ class Function(BaseFunction):
             stacklevel=2,
         )
 
-        tz = timezone(timezone_name) if timezone_name is not None else tzlocal()
-
-        flattened_changelog = sorted(
-            flatten_changelog(changelog),
-            key=lambda row: row.created if row.created else datetime.date(1, 1, 1),
-        )
-
-        total_time = datetime.timedelta()
-
-        cursor = min_date
-        while cursor < max_date:
-            if int(cursor.strftime("%w")) in work_days:
-                min_day_date = datetime.datetime(
-                    year=cursor.year,
-                    month=cursor.month,
-                    day=cursor.day,
-                    hour=start_hour if start_hour is not None else 0,
-                ).replace(tzinfo=tz)
-                max_day_date = (
-                    datetime.datetime(
-                        year=cursor.year,
-                        month=cursor.month,
-                        day=cursor.day,
-                        hour=end_hour,
-                    ).replace(tzinfo=tz)
-                    if end_hour is not None
-                    else min_day_date + datetime.timedelta(days=1)
-                )
-
-                state_start: datetime.datetime | None = None
-                for entry in flattened_changelog:
-                    if entry.field != "status":
-                        continue
-
-                    if state_start is not None and entry.created:
-                        valid_state_start = max(state_start, min_day_date)
-                        valid_state_end = min(entry.created, max_day_date)
-                        if valid_state_start < valid_state_end:
-                            total_time += valid_state_end - valid_state_start
-                        state_start = None
-                    if entry.toString == state:
-                        state_start = entry.created
-
-                if state_start is not None:
-                    valid_state_start = max(state_start, min_day_date)
-                    valid_state_end = min(
-                        max_day_date,
-                        UTC.localize(datetime.datetime.utcnow()),
-                    )
-                    if valid_state_start < valid_state_end:
-                        total_time += valid_state_end - valid_state_start
+        day_start = start_hour if start_hour is not None else 0
+        day_end = end_hour if end_hour is not None else day_start + 24
+        calendar = get_business_calendar(day_start, day_end, timezone_name, work_days)
 
-            cursor += datetime.timedelta(days=1)
+        total_time = get_state_durations(
+            changelog,
+            calendar=calendar,
+            min_date=min_date,
+            max_date=max_date,
+        ).get(state, datetime.timedelta())
 
         divisor = 1
         if end_hour is not None and start_hour is not None:
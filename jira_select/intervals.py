@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Tuple
+from typing import Union
+
+import portion
+from pytz import UTC
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=UTC)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+Segment = Tuple[datetime.datetime, datetime.datetime]
+
+
+def to_microseconds(value: datetime.datetime) -> int:
+    """Return `value` as microseconds since the epoch.
+
+    Naive datetimes are considered to be in UTC.
+
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+
+    return (value - EPOCH) // MICROSECOND
+
+
+def from_microseconds(value: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=value)
+
+
+def _normalize(segments: Iterable[Tuple[int, int]]) -> array:
+    bounds = array("q")
+
+    for lower, upper in sorted(segments):
+        if upper <= lower:
+            continue
+
+        if bounds and lower <= bounds[-1]:
+            bounds[-1] = max(bounds[-1], upper)
+        else:
+            bounds.append(lower)
+            bounds.append(upper)
+
+    return bounds
+
+
+def _combine(left: array, right: array, keep: Callable[[bool, bool], bool]) -> array:
+    """Combine two sets of bounds in a single pass over both.
+
+    `keep` is given whether a moment is within `left` and within
+    `right`, and returns whether it should be within the result.
+
+    """
+    bounds = array("q")
+    inside = False
+    i = j = 0
+    left_length = len(left)
+    right_length = len(right)
+
+    while i < left_length or j < right_length:
+        if j >= right_length or (i < left_length and left[i] <= right[j]):
+            moment = left[i]
+        else:
+            moment = right[j]
+
+        if i < left_length and left[i] == moment:
+            i += 1
+        if j < right_length and right[j] == moment:
+            j += 1
+
+        now_inside = keep(i % 2 == 1, j % 2 == 1)
+        if now_inside != inside:
+            bounds.append(moment)
+            inside = now_inside
+
+    return bounds
+
+
+class IntervalSet:
+    """A set of periods of time stored as a flat array of epoch bounds.
+
+    Bounds are microseconds since the epoch, sorted and never
+    overlapping, so union, intersection and difference are each a
+    single pass over both operands.  Periods sharing an end are merged
+    and periods having no duration are dropped; otherwise, this
+    behaves like a `portion.Interval` of datetimes and can be combined
+    with one.
+
+    """
+
+    __slots__ = ("bounds",)
+
+    def __init__(self, segments: Iterable[Segment] = ()):
+        self.bounds = _normalize(
+            (to_microseconds(lower), to_microseconds(upper))
+            for lower, upper in segments
+        )
+
+    @classmethod
+    def from_bounds(cls, bounds: array) -> IntervalSet:
+        interval_set = cls()
+        interval_set.bounds = bounds
+
+        return interval_set
+
+    @classmethod
+    def from_portion(cls, interval: portion.Interval) -> IntervalSet:
+        for segment in interval:
+            if segment.lower == -portion.inf or segment.upper == portion.inf:
+                raise ValueError(
+                    "Unbounded intervals cannot be converted into interval sets."
+                )
+
+        return cls(
+            (segment.lower, segment.upper) for segment in interval if not segment.empty
+        )
+
+    @classmethod
+    def union_all(cls, interval_sets: Iterable[IntervalSet]) -> IntervalSet:
+        return cls.from_bounds(
+            _normalize(
+                (interval_set.bounds[index], interval_set.bounds[index + 1])
+                for interval_set in interval_sets
+                for index in range(0, len(interval_set.bounds), 2)
+            )
+        )
+
+    def to_portion(self) -> portion.Interval:
+        return portion.Interval(
+            *(portion.closed(lower, upper) for lower, upper in self)
+        )
+
+    @property
+    def empty(self) -> bool:
+        return not self.bounds
+
+    @property
+    def lower(self) -> datetime.datetime:
+        return from_microseconds(self.bounds[0])
+
+    @property
+    def upper(self) -> datetime.datetime:
+        return from_microseconds(self.bounds[-1])
+
+    def size(self) -> datetime.timedelta:
+        bounds = self.bounds
+        return datetime.timedelta(microseconds=sum(bounds[1::2]) - sum(bounds[0::2]))
+
+    def union(self, other: IntervalSet) -> IntervalSet:
+        return IntervalSet.from_bounds(
+            _combine(self.bounds, other.bounds, lambda left, right: left or right)
+        )
+
+    def intersection(self, other: IntervalSet) -> IntervalSet:
+        return IntervalSet.from_bounds(
+            _combine(self.bounds, other.bounds, lambda left, right: left and right)
+        )
+
+    def difference(self, other: IntervalSet) -> IntervalSet:
+        return IntervalSet.from_bounds(
+            _combine(self.bounds, other.bounds, lambda left, right: left and not right)
+        )
+
+    @staticmethod
+    def _coerce(other: Any) -> Union[IntervalSet, None]:
+        if isinstance(other, IntervalSet):
+            return other
+        elif isinstance(other, portion.Interval):
+            return IntervalSet.from_portion(other)
+
+        return None
+
+    def __or__(self, other: Any) -> IntervalSet:
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        return self.union(coerced)
+
+    def __and__(self, other: Any) -> IntervalSet:
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        return self.intersection(coerced)
+
+    def __sub__(self, other: Any) -> IntervalSet:
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        return self.difference(coerced)
+
+    def __rsub__(self, other: Any) -> IntervalSet:
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        return coerced.difference(self)
+
+    __ror__ = __or__
+    __rand__ = __and__
+
+    def __eq__(self, other: Any) -> bool:
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        return self.bounds == coerced.bounds
+
+    def __iter__(self) -> Iterator[Segment]:
+        for index in range(0, len(self.bounds), 2):
+            yield (
+                from_microseconds(self.bounds[index]),
+                from_microseconds(self.bounds[index + 1]),
+            )
+
+    def __len__(self) -> int:
+        return len(self.bounds) // 2
+
+    def __bool__(self) -> bool:
+        return bool(self.bounds)
+
+    def __repr__(self) -> str:
+        return " | ".join(f"[{lower},{upper}]" for lower, upper in self) or "()"
+
+
+def iter_segments(interval: Union[IntervalSet, portion.Interval]) -> Iterator[Segment]:
+    """Yield the start and end of each of the periods within `interval`."""
+    if isinstance(interval, IntervalSet):
+        yield from interval
+        return
+
+    for segment in interval:
+        if not segment.empty:
+            yield (segment.lower, segment.upper)
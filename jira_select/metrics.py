@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from functools import wraps
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import TypeVar
+
+from jira import JIRA
+from requests import Response
+
+from .profiling import NullProfiler
+
+T = TypeVar("T")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+METRIC_PREFIX = "jira_select"
+
+# Upper bounds (in seconds) of the buckets durations are counted in
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Statuses Jira's client retries the request after receiving
+RETRIED_STATUS_CODES = {429, 503}
+
+METRIC_HELP = {
+    "queries_total": "Queries executed.",
+    "query_duration_seconds": "Time taken to execute each query.",
+    "rows_total": "Rows produced by each phase of query execution.",
+    "source_rows_expected": "Rows the most recent query's source reported finding.",
+    "http_requests_total": "Requests made to Jira, by response status.",
+    "http_retries_total": "Responses from Jira that caused the request to be retried.",
+    "http_response_bytes_total": "Bytes received from Jira.",
+    "http_request_duration_seconds": "Time taken by each request made to Jira.",
+    "expression_errors_total": "Rows for which evaluating each expression failed.",
+    "function_calls_total": "Calls made to each function.",
+    "function_duration_seconds": "Time taken by each call to a function.",
+    "cache_hits_total": "Queries whose results were read from the cache.",
+    "cache_misses_total": "Queries whose results could not be read from the cache.",
+}
+
+
+def _get_labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [*labels, *([extra] if extra else [])]
+    if not pairs:
+        return ""
+
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+        self.count += 1
+        self.sum += value
+
+    def get_cumulative_counts(self) -> List[Tuple[float, int]]:
+        cumulative: List[Tuple[float, int]] = []
+
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            cumulative.append((bound, total))
+        cumulative.append((float("inf"), self.count))
+
+        return cumulative
+
+
+class MetricsRegistry(NullProfiler):
+    """Counters, gauges and histograms describing the queries executed.
+
+    A single registry can be shared by every query a process executes;
+    queries record to it through the same hooks as a `Profiler`.  Its
+    contents can be written out in Prometheus' text exposition format
+    or as JSON.
+
+    """
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+
+    def increment(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """Add `amount` to the counter `name` (suffixed with `_total`)."""
+        key = _get_labels(labels)
+
+        with self._lock:
+            counter = self.counters.setdefault(f"{name}_total", {})
+            counter[key] = counter.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, {})[_get_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self.histograms.setdefault(name, {}).setdefault(
+                _get_labels(labels), Histogram()
+            ).observe(value)
+
+    def iter_phase(self, name: str, iterator: Iterator[T]) -> Iterator[T]:
+        def counted() -> Iterator[T]:
+            rows = 0
+            try:
+                for row in iterator:
+                    rows += 1
+                    yield row
+            finally:
+                self.increment("rows", rows, phase=name)
+
+        return counted()
+
+    def record_phase(self, name: str, seconds: float, rows: int = 1) -> None:
+        self.increment("rows", rows, phase=name)
+
+    def record_expression_errors(self, expression: str, count: int) -> None:
+        self.increment("expression_errors", count, expression=expression)
+
+    def wrap_function(self, name: str, function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.increment("function_calls", function=name)
+                self.observe(
+                    "function_duration_seconds",
+                    time.perf_counter() - started,
+                    function=name,
+                )
+
+        return wrapper
+
+    def record_response(self, response: Response, *args, **kwargs) -> None:
+        self.increment("http_requests", status=response.status_code)
+        if response.status_code in RETRIED_STATUS_CODES:
+            self.increment("http_retries")
+        self.increment("http_response_bytes", len(response.content or b""))
+        self.observe("http_request_duration_seconds", response.elapsed.total_seconds())
+
+    def attach(self, jira: JIRA) -> None:
+        self._started = time.perf_counter()
+        jira._session.hooks["response"].append(self.record_response)
+
+    def detach(self, jira: JIRA) -> None:
+        hooks = jira._session.hooks["response"]
+        if self.record_response in hooks:
+            hooks.remove(self.record_response)
+
+        self.increment("queries")
+        if self._started is not None:
+            self.observe("query_duration_seconds", time.perf_counter() - self._started)
+            self._started = None
+
+    def as_prometheus(self) -> str:
+        lines: List[str] = []
+
+        with self._lock:
+            for kind, metrics in [("counter", self.counters), ("gauge", self.gauges)]:
+                for name, values in sorted(metrics.items()):
+                    full_name = f"{METRIC_PREFIX}_{name}"
+                    if name in METRIC_HELP:
+                        lines.append(f"# HELP {full_name} {METRIC_HELP[name]}")
+                    lines.append(f"# TYPE {full_name} {kind}")
+                    for labels, value in sorted(values.items()):
+                        lines.append(
+                            f"{full_name}{_format_labels(labels)} {_format_value(value)}"
+                        )
+
+            for name, histograms in sorted(self.histograms.items()):
+                full_name = f"{METRIC_PREFIX}_{name}"
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {full_name} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for labels, histogram in sorted(histograms.items()):
+                    for bound, count in histogram.get_cumulative_counts():
+                        lines.append(
+                            "{name}_bucket{labels} {count}".format(
+                                name=full_name,
+                                labels=_format_labels(
+                                    labels, ("le", _format_value(bound))
+                                ),
+                                count=count,
+                            )
+                        )
+                    lines.append(
+                        f"{full_name}_sum{_format_labels(labels)} "
+                        f"{_format_value(histogram.sum)}"
+                    )
+                    lines.append(
+                        f"{full_name}_count{_format_labels(labels)} {histogram.count}"
+                    )
+
+        return "\n".join(lines) + "\n"
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": {
+                    name: [
+                        {"labels": dict(labels), "value": value}
+                        for labels, value in sorted(values.items())
+                    ]
+                    for name, values in sorted(self.counters.items())
+                },
+                "gauges": {
+                    name: [
+                        {"labels": dict(labels), "value": value}
+                        for labels, value in sorted(values.items())
+                    ]
+                    for name, values in sorted(self.gauges.items())
+                },
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(labels),
+                            "buckets": {
+                                _format_value(bound): count
+                                for bound, count in histogram.get_cumulative_counts()
+                            },
+                            "sum": histogram.sum,
+                            "count": histogram.count,
+                        }
+                        for labels, histogram in sorted(histograms.items())
+                    ]
+                    for name, histograms in sorted(self.histograms.items())
+                },
+            }
+
+    def write(self, path: str, format: str = "prometheus") -> None:
+        """Replace the file at `path` with the current metrics."""
+        with open(path, "w") as output:
+            if format == "json":
+                json.dump(self.as_dict(), output, indent=2)
+            else:
+                output.write(self.as_prometheus())
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from typing import Deque
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Maximum number of requests made to Jira at once
+MAX_CONCURRENT_REQUESTS = 4
+
+
+def map_concurrently(
+    function: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = MAX_CONCURRENT_REQUESTS,
+) -> Iterator[Future[R]]:
+    """Run `function` over `items` concurrently, in order.
+
+    Yields a completed future for each item in the order `items`
+    were provided; callers decide how each failure is handled.  At
+    most `max_workers` requests are ahead of the consumer at any
+    moment, and requests not yet started when the consumer stops
+    early are never sent.
+
+    """
+    pool = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="jira-select-pager"
+    )
+    pending: Deque[Future[R]] = deque()
+
+    try:
+        for item in items:
+            pending.append(pool.submit(function, item))
+
+            if len(pending) >= max_workers:
+                future = pending.popleft()
+                future.exception()
+                yield future
+
+        while pending:
+            future = pending.popleft()
+            future.exception()
+            yield future
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def paginate(
+    fetch_page: Callable[[int, int], Sequence[T]],
+    page_size: int,
+    limit: Optional[int] = None,
+    on_total: Optional[Callable[[int], None]] = None,
+    max_workers: int = MAX_CONCURRENT_REQUESTS,
+) -> Iterator[T]:
+    """Yield the items of a paginated Jira resource, in order.
+
+    `fetch_page` is called with a start offset and page size, and
+    should return a `jira.client.ResultList`.  The first page reveals
+    how many items there are in total; the remaining pages are then
+    fetched concurrently.
+
+    """
+    first_page = fetch_page(0, page_size if limit is None else min(page_size, limit))
+
+    total = getattr(first_page, "total", None)
+    if total is None or getattr(first_page, "isLast", False):
+        total = len(first_page)
+    if limit is not None:
+        total = min(total, limit)
+    if on_total is not None:
+        on_total(total)
+
+    yield from first_page[:total]
+    if not len(first_page):
+        return
+
+    # Jira may return fewer items per page than were requested; the
+    # remaining pages are requested using the size it actually used.
+    actual_page_size = len(first_page)
+    returned = min(actual_page_size, total)
+    for future in map_concurrently(
+        lambda start_at: fetch_page(start_at, actual_page_size),
+        range(actual_page_size, total, actual_page_size),
+        max_workers=max_workers,
+    ):
+        page = future.result()
+        yield from page[: total - returned]
+        returned += len(page)
+
+
+def paginate_by_token(
+    fetch_page: Callable[[Optional[str], int], Sequence[T]],
+    page_size: int,
+    limit: Optional[int] = None,
+) -> Iterator[T]:
+    """Yield the items of a Jira resource paginated by `nextPageToken`.
+
+    `fetch_page` is called with the token returned alongside the
+    previous page (`None` for the first) and a page size, and should
+    return a `jira.client.ResultList`.  Jira Cloud's searches can only
+    be paged this way; since each page's token arrives with the page
+    before it, pages are fetched one at a time.
+
+    """
+    token: Optional[str] = None
+    returned = 0
+
+    while limit is None or returned < limit:
+        page = fetch_page(
+            token, page_size if limit is None else min(page_size, limit - returned)
+        )
+        yield from page
+        returned += len(page)
+
+        token = getattr(page, "nextPageToken", None)
+        if not token or not len(page):
+            return
@@ -0,0 +1,793 @@
+from __future__ import annotations
+
+import ast
+import datetime
+from dataclasses import dataclass
+from dataclasses import field
+from logging import getLogger
+from math import ceil
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from dateutil.parser import parse as parse_date
+from jira.exceptions import JIRAError
+
+from .types import Expression
+from .types import SchemaRow
+from .utils import evaluate_node
+from .utils import get_function_calls
+from .utils import get_referenced_names
+from .utils import parse_expression
+
+if TYPE_CHECKING:
+    from .functions.subquery import SubqueryFunction
+    from .query import Executor
+
+
+logger = getLogger(__name__)
+
+# Names giving an expression access to the whole row, or to data that
+# only exists on a row once it has been fully fetched.
+WHOLE_ROW_NAMES = {"_", "issue", "fields", "raw"}
+
+# Schema types of fields JQL compares by name, and the attribute of the
+# field's value holding that name
+NAMED_FIELD_TYPES = {
+    "status": "name",
+    "priority": "name",
+    "issuetype": "name",
+    "resolution": "name",
+    "option": "value",
+    "project": "key",
+}
+# Schema types of fields compared by name, and the method listing every
+# value of that type Jira knows about; JQL naming any other value is
+# rejected by Jira.
+NAMED_VALUE_LISTS = {
+    "status": "statuses",
+    "priority": "priorities",
+    "issuetype": "issue_types",
+    "resolution": "resolutions",
+    "project": "projects",
+}
+# Schema types of fields whose value is displayed as their name
+STR_NAMED_FIELD_TYPES = {"status", "priority", "issuetype", "resolution", "option"}
+NUMBER_FIELD_TYPES = {"number"}
+# Number fields holding seconds, but that JQL compares as durations
+DURATION_FIELDS = {
+    "timeoriginalestimate",
+    "timeestimate",
+    "timespent",
+    "aggregatetimeoriginalestimate",
+    "aggregatetimeestimate",
+    "aggregatetimespent",
+}
+DATE_FIELD_TYPES = {"date", "datetime"}
+DATE_PARSING_FUNCTIONS = {"parse_datetime", "parse_date"}
+# Fields Jira orders the same way they would be sorted locally
+ORDERABLE_FIELDS = {"created", "updated"}
+
+COMPARISON_OPERATORS: Dict[type, str] = {
+    ast.Eq: "=",
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+}
+# The operator to use when a comparison's operands are swapped
+SWAPPED_OPERATORS: Dict[type, type] = {
+    ast.Eq: ast.Eq,
+    ast.Lt: ast.Gt,
+    ast.LtE: ast.GtE,
+    ast.Gt: ast.Lt,
+    ast.GtE: ast.LtE,
+}
+
+
+@dataclass
+class PreparedCall:
+    """A subquery call whose arguments are known before any row arrives."""
+
+    function: SubqueryFunction
+    name: str
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def run(self) -> None:
+        try:
+            self.function.prepare(*self.args, **self.kwargs)
+        except Exception as e:
+            # Whatever went wrong will happen again (and be reported
+            # properly) when the row needing this subquery evaluates it.
+            logger.debug("Preparing %s%s failed: %s", self.name, self.args, e)
+
+
+@dataclass
+class PushedFilter:
+    """A `filter` expression (or part of one) also expressed as JQL.
+
+    If `exact`, Jira will select exactly the rows the expression would
+    have, and the expression no longer needs to be evaluated locally.
+
+    """
+
+    expression: Expression
+    jql: str
+    exact: bool
+
+
+@dataclass
+class FilterPushdown:
+    pushed: List[PushedFilter] = field(default_factory=list)
+    local: List[Expression] = field(default_factory=list)
+
+    @property
+    def where(self) -> List[str]:
+        return [pushed.jql for pushed in self.pushed]
+
+
+def quote_jql(value: Any) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+class QueryPlan:
+    """Static analysis of the expressions an executor will evaluate."""
+
+    def __init__(self, executor: Executor):
+        self._executor = executor
+        self._filter_pushdown: Optional[FilterPushdown] = None
+        self._sort_pushdown: Optional[List[str]] = None
+        self._schema_rows: Optional[Dict[str, SchemaRow]] = None
+
+    @property
+    def executor(self) -> Executor:
+        return self._executor
+
+    def get_row_expressions(self) -> List[Expression]:
+        query = self.executor.query
+
+        expressions: List[Expression] = [
+            definition.expression for definition in query.calculate
+        ]
+        expressions.extend(query.filter)
+        expressions.extend(query.group_by)
+        expressions.extend(query.having)
+        expressions.extend(expression for expression, _ in query.sort_by)
+        expressions.extend(definition.expression for definition in query.select)
+
+        return expressions
+
+    def get_phases(self) -> List[str]:
+        """Return the phases rows pass through between the source and select."""
+        query = self.executor.query
+
+        phases: List[str] = []
+        if query.calculate:
+            phases.append("calculate")
+        # Filters Jira evaluates for us need not be evaluated again, and
+        # when rows are fetched in two phases, the source has already
+        # filtered them
+        if self.get_filter_pushdown().local and self.get_prefilter_fields() is None:
+            phases.append("filter")
+        if query.group_by:
+            phases.append("group_by")
+        if query.having:
+            phases.append("having")
+        # Jira returns rows already sorted when it can sort them for us
+        if query.sort_by and not self.get_sort_pushdown():
+            phases.append("sort_by")
+
+        return phases
+
+    def get_subquery_functions(self) -> Dict[str, SubqueryFunction]:
+        from .functions.subquery import SubqueryFunction
+
+        return {
+            name: function
+            for name, function in self.executor.functions.items()
+            if isinstance(function, SubqueryFunction)
+        }
+
+    def get_independent_subqueries(
+        self, static_results: Dict[str, Any]
+    ) -> List[PreparedCall]:
+        """Return subquery calls whose arguments do not depend upon the row.
+
+        Arguments may only use constants and `static` columns; such
+        subqueries can be run alongside the main search rather than
+        when the first row needing them is evaluated.
+
+        """
+        functions = self.get_subquery_functions()
+        if not functions:
+            return []
+
+        prepared: Dict[str, PreparedCall] = {}
+        for expression in self.get_row_expressions():
+            for call in get_function_calls(
+                expression, functions.keys(), self.executor.analysis_field_name_map
+            ):
+                assert isinstance(call.func, ast.Name)
+                function = functions[call.func.id]
+
+                if any(isinstance(arg, ast.Starred) for arg in call.args) or any(
+                    keyword.arg is None for keyword in call.keywords
+                ):
+                    continue
+
+                arg_nodes, kwarg_nodes = function.get_prepared_arguments(call)
+                nodes = [*arg_nodes, *kwarg_nodes.values()]
+                if any(
+                    not get_referenced_names(node) <= static_results.keys()
+                    for node in nodes
+                ):
+                    continue
+
+                try:
+                    args = tuple(
+                        evaluate_node(node, static_results, self.executor.functions)
+                        for node in arg_nodes
+                    )
+                    kwargs = {
+                        name: evaluate_node(
+                            node, static_results, self.executor.functions
+                        )
+                        for name, node in kwarg_nodes.items()
+                    }
+                except Exception:
+                    continue
+
+                prepared.setdefault(
+                    " ".join(
+                        [
+                            call.func.id,
+                            *(ast.unparse(node) for node in arg_nodes),
+                            *(
+                                f"{name}={ast.unparse(node)}"
+                                for name, node in sorted(kwarg_nodes.items())
+                            ),
+                        ]
+                    ),
+                    PreparedCall(
+                        function=function,
+                        name=call.func.id,
+                        args=args,
+                        kwargs=kwargs,
+                    ),
+                )
+
+        return list(prepared.values())
+
+    def get_prefilter_fields(self) -> Optional[Set[str]]:
+        """Return the fields `filter` needs if it can run before expansion.
+
+        When a query expands data (e.g. ``changelog``) but also has a
+        `filter` using none of that data, rows can be filtered using
+        only the few fields the filter reads.  The remaining data then
+        needs to be fetched only for rows surviving the filter.
+
+        Returns `None` if the query cannot be executed that way.
+
+        """
+        query = self.executor.query
+        local_filter = self.get_filter_pushdown().local
+        if query.from_ != "issues" or not query.expand or not local_filter:
+            return None
+
+        unavailable = {
+            *WHOLE_ROW_NAMES,
+            *query.expand,
+            *(definition.column for definition in query.calculate),
+        }
+
+        fields: Set[str] = set()
+        for expression in local_filter:
+            tree = parse_expression(expression, self.executor.analysis_field_name_map)
+            if tree is None:
+                return None
+
+            names = get_referenced_names(tree)
+            if names & unavailable:
+                return None
+
+            fields |= names
+
+        return fields
+
+    def _get_field(self, node: ast.AST) -> Optional[Tuple[SchemaRow, str]]:
+        """Return the field `node` reads and how its value is accessed.
+
+        Values may be accessed directly (`value`), as the field's name
+        (`name`), or parsed as a date (`date`).
+
+        """
+        if isinstance(node, ast.Name):
+            schema_row = self._get_schema_row(node.id)
+            if schema_row is None:
+                return None
+            return schema_row, "value"
+
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            schema_row = self._get_schema_row(node.value.id)
+            if (
+                schema_row is None
+                or NAMED_FIELD_TYPES.get(schema_row.type) != node.attr
+            ):
+                return None
+            return schema_row, "name"
+
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and len(node.args) == 1
+            and not node.keywords
+            and isinstance(node.args[0], ast.Name)
+        ):
+            schema_row = self._get_schema_row(node.args[0].id)
+            if schema_row is None:
+                return None
+            if node.func.id == "str" and schema_row.type in STR_NAMED_FIELD_TYPES:
+                return schema_row, "name"
+            if (
+                node.func.id in DATE_PARSING_FUNCTIONS
+                and schema_row.type in DATE_FIELD_TYPES
+            ):
+                return schema_row, "date"
+
+        return None
+
+    def _get_schema_row(self, name: str) -> Optional[SchemaRow]:
+        if self._schema_rows is None:
+            query = self.executor.query
+            calculated = {
+                definition.column for definition in [*query.calculate, *query.static]
+            }
+            self._schema_rows = {
+                schema_row.id: schema_row
+                for schema_row in self.executor.get_source_schema()
+                if schema_row.id not in calculated
+            }
+
+        return self._schema_rows.get(name)
+
+    def _get_constant(self, node: ast.AST) -> Tuple[bool, Any]:
+        """Return whether `node` is a constant, and if so, its value."""
+        if get_referenced_names(node):
+            return False, None
+
+        try:
+            return True, evaluate_node(node, {}, self.executor.functions)
+        except Exception:
+            return False, None
+
+    def _get_known_names(self, schema_type: str) -> Optional[Set[str]]:
+        """Return the names Jira accepts for fields of `schema_type`.
+
+        Names are case-folded, as Jira compares them without regard to
+        case.  Returns `None` if the names cannot be listed.
+
+        """
+        known_names = self.executor.known_names
+        if schema_type not in known_names:
+            names: Optional[Set[str]] = None
+            if schema_type in NAMED_VALUE_LISTS:
+                try:
+                    names = {
+                        str(getattr(value, NAMED_FIELD_TYPES[schema_type])).casefold()
+                        for value in getattr(
+                            self.executor.jira, NAMED_VALUE_LISTS[schema_type]
+                        )()
+                    }
+                except JIRAError as e:
+                    logger.debug("Listing %s values failed: %s", schema_type, e)
+            known_names[schema_type] = names
+
+        return known_names[schema_type]
+
+    def _get_jql_field_name(self, schema_row: SchemaRow) -> Optional[str]:
+        """Return the name JQL uses for this field, if JQL can search it."""
+        raw = schema_row.raw
+        clause_names = getattr(raw, "clauseNames", None)
+        if getattr(raw, "searchable", None) is not True or not (
+            isinstance(clause_names, list) and clause_names
+        ):
+            return None
+
+        return str(clause_names[0])
+
+    def _translate_comparison(self, node: ast.Compare) -> Optional[Tuple[str, bool]]:
+        if len(node.ops) != 1:
+            return None
+
+        operator = type(node.ops[0])
+        left, right = node.left, node.comparators[0]
+        if self._get_field(left) is None and operator in SWAPPED_OPERATORS:
+            left, right = right, left
+            operator = SWAPPED_OPERATORS[operator]
+
+        field_reference = self._get_field(left)
+        is_constant, value = self._get_constant(right)
+        if field_reference is None or not is_constant:
+            return None
+
+        schema_row, access = field_reference
+        jql_field = self._get_jql_field_name(schema_row)
+        if jql_field is None or schema_row.id in DURATION_FIELDS:
+            return None
+
+        if operator is ast.In:
+            if not isinstance(value, (list, tuple, set)) or not value:
+                return None
+            values = sorted(value, key=str) if isinstance(value, set) else value
+            if access == "name" and all(isinstance(v, str) for v in values):
+                # Names Jira doesn't know can't match any row, but would
+                # cause Jira to reject the search
+                known_names = self._get_known_names(schema_row.type)
+                if known_names is None:
+                    return None
+                values = [v for v in values if v.casefold() in known_names]
+                if not values:
+                    return None
+                exact = False
+            elif (
+                access == "value"
+                and schema_row.type in NUMBER_FIELD_TYPES
+                and all(
+                    isinstance(v, (int, float)) and not isinstance(v, bool)
+                    for v in values
+                )
+            ):
+                exact = True
+            else:
+                return None
+
+            return (
+                f"{jql_field} in ({', '.join(quote_jql(v) for v in values)})",
+                exact,
+            )
+
+        if operator not in COMPARISON_OPERATORS:
+            return None
+
+        if access == "name":
+            if operator is not ast.Eq or not isinstance(value, str):
+                return None
+            known_names = self._get_known_names(schema_row.type)
+            if known_names is None or value.casefold() not in known_names:
+                return None
+            # Jira compares names without regard to case
+            return f"{jql_field} = {quote_jql(value)}", False
+
+        if access == "value" and schema_row.type in NUMBER_FIELD_TYPES:
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return None
+            return f"{jql_field} {COMPARISON_OPERATORS[operator]} {value}", True
+
+        if schema_row.type in DATE_FIELD_TYPES and operator is not ast.Eq:
+            if access == "value" and isinstance(value, str):
+                try:
+                    value = parse_date(value)
+                except (ValueError, OverflowError):
+                    return None
+            if not isinstance(value, datetime.date):
+                return None
+            if isinstance(value, datetime.datetime):
+                value = value.date()
+
+            # Jira compares dates in the user's own timezone, so a day
+            # is added on either side to be sure of selecting a superset.
+            if operator in (ast.Gt, ast.GtE):
+                bound = value - datetime.timedelta(days=1)
+                return f'{jql_field} >= "{bound.isoformat()}"', False
+            bound = value + datetime.timedelta(days=2)
+            return f'{jql_field} < "{bound.isoformat()}"', False
+
+        return None
+
+    def _translate(self, node: ast.AST) -> Optional[Tuple[str, bool]]:
+        """Return JQL selecting (at least) the rows `node` would match.
+
+        Also returns whether the JQL selects exactly those rows.
+
+        """
+        if isinstance(node, ast.BoolOp):
+            translated = [self._translate(value) for value in node.values]
+
+            if isinstance(node.op, ast.And):
+                parts = [part for part in translated if part is not None]
+                if not parts:
+                    return None
+                return (
+                    " AND ".join(jql for jql, _ in parts),
+                    len(parts) == len(translated) and all(exact for _, exact in parts),
+                )
+
+            if any(part is None for part in translated):
+                return None
+            return (
+                "({})".format(" OR ".join(jql for jql, _ in translated)),  # type: ignore[misc]
+                all(exact for _, exact in translated),  # type: ignore[misc]
+            )
+
+        if isinstance(node, ast.Compare):
+            return self._translate_comparison(node)
+
+        return None
+
+    def get_filter_pushdown(self) -> FilterPushdown:
+        """Return the `filter` expressions Jira can evaluate for us.
+
+        Only simple comparisons of fields Jira knows about against
+        constants are translated into JQL.  Unless the JQL is certain
+        to select exactly the same rows, the expression is still
+        evaluated locally, too.
+
+        """
+        if self._filter_pushdown is not None:
+            return self._filter_pushdown
+
+        query = self.executor.query
+        pushdown = FilterPushdown(local=list(query.filter))
+        self._filter_pushdown = pushdown
+
+        # Limits are applied by Jira, so filtering rows before applying
+        # a limit would change which rows the limit selects; and cached
+        # results are kept for changes to `filter` to be tried quickly.
+        if (
+            query.from_ != "issues"
+            or not isinstance(query.where, list)
+            or query.limit is not None
+            or query.cache is not None
+            or not query.filter
+        ):
+            return pushdown
+
+        local: List[Expression] = []
+        for expression in query.filter:
+            tree = parse_expression(expression, self.executor.analysis_field_name_map)
+            translated = self._translate(tree.body) if tree is not None else None
+            if translated is None:
+                local.append(expression)
+                continue
+
+            jql, exact = translated
+            pushdown.pushed.append(
+                PushedFilter(
+                    expression=expression,
+                    # The where clause is interpolated again later
+                    jql=jql.replace("{", "{{").replace("}", "}}"),
+                    exact=exact,
+                )
+            )
+            if not exact:
+                local.append(expression)
+
+        pushdown.local = local
+        return pushdown
+
+    def _translate_sort(self, expression: Expression, reverse: bool) -> Optional[str]:
+        tree = parse_expression(expression, self.executor.analysis_field_name_map)
+        if tree is None:
+            return None
+
+        node = tree.body
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id == "parse_datetime"
+            and len(node.args) == 1
+            and not node.keywords
+        ):
+            node = node.args[0]
+
+        if (
+            not isinstance(node, ast.Name)
+            or node.id not in ORDERABLE_FIELDS
+            or self._get_schema_row(node.id) is None
+        ):
+            return None
+
+        return f"{node.id} {'DESC' if reverse else 'ASC'}"
+
+    def get_sort_pushdown(self) -> List[str]:
+        """Return `sort_by` as JQL `ORDER BY` fields, if Jira can sort for us.
+
+        Only sorting by when issues were created or updated is pushed
+        down; Jira orders other fields (e.g. priorities) differently
+        than they'd be sorted locally.  Returns an empty list unless
+        every `sort_by` expression can be pushed down.
+
+        """
+        if self._sort_pushdown is not None:
+            return self._sort_pushdown
+
+        query = self.executor.query
+        self._sort_pushdown = []
+
+        # Grouping changes the order of rows, and limits are applied by
+        # Jira, so sorting before applying one would change which rows
+        # it selects.
+        if (
+            query.from_ != "issues"
+            or query.group_by
+            or query.limit is not None
+            or not query.sort_by
+        ):
+            return self._sort_pushdown
+
+        order_by: List[str] = []
+        for expression, reverse in query.sort_by:
+            translated = self._translate_sort(expression, reverse)
+            if translated is None:
+                return self._sort_pushdown
+            order_by.append(translated)
+
+        self._sort_pushdown = order_by
+        return self._sort_pushdown
+
+    def can_stop_early(self) -> bool:
+        """Whether the source can stop fetching once `cap` rows are found.
+
+        This is possible only when each row fetched either becomes a
+        row of the output or is filtered out, in the order fetched.
+        Cached queries always fetch every row so that the complete
+        result can be stored.
+
+        """
+        query = self.executor.query
+
+        return (
+            query.from_ == "issues"
+            and query.cap is not None
+            and not query.cache
+            and not query.group_by
+            and not query.having
+            and (not query.sort_by or bool(self.get_sort_pushdown()))
+        )
+
+    def get_fetch_limit(self) -> Optional[int]:
+        """Return the most rows the source needs to fetch, if limited."""
+        query = self.executor.query
+
+        if (
+            self.can_stop_early()
+            and not self.get_filter_pushdown().local
+            and query.cap is not None
+        ):
+            return min(query.cap, query.limit) if query.limit else query.cap
+
+        return query.limit
+
+    def get_fetched_fields(self) -> str:
+        """Return the `fields` requested by the source's first search."""
+        prefilter_fields = self.get_prefilter_fields()
+        if prefilter_fields is not None:
+            return ",".join(sorted(prefilter_fields)) or "key"
+
+        return "*all"
+
+    def get_estimated_requests(self, row_count: int) -> Dict[str, int]:
+        """Estimate the searches needed to fetch `row_count` matching issues.
+
+        Requests made by functions and for completing long changelogs
+        depend upon the data, so are not included.
+
+        """
+        from .sources.issues import EXPANDED_BATCH_SIZE
+        from .sources.issues import ISSUE_PAGE_SIZE
+
+        query = self.executor.query
+        fetch_limit = self.get_fetch_limit()
+        if fetch_limit is not None:
+            row_count = min(row_count, fetch_limit)
+
+        requests = {"search": max(ceil(row_count / ISSUE_PAGE_SIZE), 1)}
+        if self.get_prefilter_fields() is not None:
+            # At most; only issues surviving the filter are expanded
+            expanded = row_count
+            if self.can_stop_early() and query.cap is not None:
+                expanded = min(expanded, query.cap)
+            requests["expand"] = ceil(expanded / EXPANDED_BATCH_SIZE)
+        if query.cache and self.executor.has_cached_results():
+            requests = {}
+
+        return requests
+
+    def get_warnings(self) -> List[str]:
+        """Describe parts of the query that are known to be slow."""
+        query = self.executor.query
+        warnings: List[str] = []
+
+        row_dependent_functions = {
+            "get_issue",
+            *self.get_subquery_functions().keys(),
+        }
+        static_columns = {definition.column for definition in query.static}
+        for expression in self.get_row_expressions():
+            for call in get_function_calls(
+                expression,
+                row_dependent_functions,
+                self.executor.analysis_field_name_map,
+            ):
+                assert isinstance(call.func, ast.Name)
+                if get_referenced_names(call) <= static_columns:
+                    continue
+
+                warnings.append(
+                    f"{ast.unparse(call)} may make a request to Jira for each "
+                    "row; consider whether a single search could gather "
+                    "the same data"
+                )
+
+        if "sort_by" in self.get_phases() and not query.limit:
+            warnings.append(
+                "sort_by is evaluated locally, so every matching row is "
+                "fetched and held in memory before any row is returned "
+                "(even when using `cap`); sorting only by `created` or "
+                "`updated` lets Jira sort instead"
+            )
+
+        if (
+            query.from_ == "issues"
+            and "changelog" in query.expand
+            and "filter" in self.get_phases()
+        ):
+            warnings.append(
+                "each issue's changelog is fetched before `filter` is "
+                "evaluated, including for issues the filter discards; "
+                "expressions that use neither the changelog nor the whole "
+                "issue can be evaluated before the changelog is fetched"
+            )
+
+        return warnings
+
+    def explain(self) -> List[str]:
+        """Describe how the query will be executed."""
+        lines: List[str] = []
+
+        pushdown = self.get_filter_pushdown()
+        for pushed in pushdown.pushed:
+            lines.append(
+                "filter {expression!r} added to where as {jql!r}{kept}".format(
+                    expression=str(pushed.expression),
+                    jql=pushed.jql,
+                    kept="" if pushed.exact else " (still checked locally)",
+                )
+            )
+
+        sort_pushdown = self.get_sort_pushdown()
+        if sort_pushdown:
+            lines.append(
+                "sort_by replaced by ORDER BY {order_by}".format(
+                    order_by=", ".join(sort_pushdown)
+                )
+            )
+
+        if self.can_stop_early():
+            lines.append(
+                "issues fetched page by page until cap is reached{limit}".format(
+                    limit=(
+                        f" (at most {self.get_fetch_limit()})"
+                        if self.get_fetch_limit() is not None
+                        else ""
+                    )
+                )
+            )
+
+        prefilter_fields = self.get_prefilter_fields()
+        if prefilter_fields is not None:
+            lines.append(
+                "filter evaluated using only {fields} before fetching "
+                "expanded data".format(fields=", ".join(sorted(prefilter_fields)))
+            )
+
+        return lines
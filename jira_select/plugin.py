@@ -15,10 +15,13 @@ from typing import TYPE_CHECKING
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Iterable
 from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Type
+from typing import TypeVar
 from weakref import proxy
 
 import keyring
@@ -50,6 +53,8 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 BUILTIN_FUNCTIONS: Dict[str, Callable] = {
     # Built-ins
@@ -115,6 +120,9 @@ BUILTIN_FUNCTIONS: Dict[str, Callable] = {
 }
 REGISTERED_FUNCTIONS: Dict[str, Callable] = {}
 
+# The positional and keyword arguments of a single function call
+BatchCall = Tuple[Tuple[Any, ...], Dict[str, Any]]
+
 
 class BaseCommand(SafdieBaseCommand):
     _jira: Optional[JIRA] = None
@@ -294,6 +302,23 @@ class BaseFunction(metaclass=ABCMeta):
 
         return self._jira
 
+    @property
+    def supports_batch(self) -> bool:
+        """Whether this function provides its own `call_batch`."""
+        return type(self).call_batch is not BaseFunction.call_batch
+
+    def call_batch(self, calls: List[BatchCall]) -> List[Any]:
+        """Return the results of many calls to this function at once.
+
+        Each entry of `calls` is an ``(args, kwargs)`` tuple; a result
+        must be returned for each of them, in the same order.  Override
+        this if your function can handle many calls more cheaply than
+        one at a time -- for example, by fetching the data for many
+        rows using a single request.
+
+        """
+        return [self(*args, **kwargs) for args, kwargs in calls]
+
     @abstractmethod
     def __call__(self, *args, **kwargs) -> Optional[Any]: ...
 
@@ -336,8 +361,13 @@ class BaseSource(metaclass=ABCMeta):
     def update_progress(self, *args, **kwargs):
         self._executor.progress.update(self._task, *args, **kwargs)
 
+    def track_progress(self, rows: Iterable[T]) -> Iterator[T]:
+        """Yield `rows`, advancing this source's progress for each."""
+        return self._executor.track_progress(rows, self._task)
+
     def update_count(self, value: int):
         self._out_channel.set(value)
+        self._executor.profiler.set_gauge("source_rows_expected", value)
 
     @property
     def query(self) -> Query:
@@ -0,0 +1,472 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack
+from contextlib import contextmanager
+from contextlib import nullcontext
+from dataclasses import asdict
+from dataclasses import dataclass
+from functools import wraps
+from typing import IO
+from typing import Any
+from typing import Callable
+from typing import ContextManager
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TypeVar
+from urllib.parse import urlparse
+
+from jira import JIRA
+from requests import Response
+from rich.console import Group
+from rich.table import Table
+
+T = TypeVar("T")
+
+# Percentiles of request latency included in reports
+LATENCY_PERCENTILES = (50, 90, 99)
+
+# Spans shorter than this many seconds are omitted from traces
+TRACE_MIN_DURATION = 0.0001
+
+
+@dataclass
+class Timing:
+    calls: int = 0
+    seconds: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.seconds += seconds
+
+
+@dataclass
+class PhaseTiming:
+    rows: int = 0
+    seconds: float = 0.0
+    # Whether this phase pulls its rows from the phase before it, in
+    # which case `seconds` includes the time spent in earlier phases
+    chained: bool = False
+
+
+def get_percentile(values: List[float], percentile: float) -> float:
+    """Return the `percentile`th percentile of `values` (nearest rank)."""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = max(int(round(percentile / 100 * len(ordered))) - 1, 0)
+
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class NullProfiler:
+    """Profiler used when profiling is disabled; records nothing."""
+
+    # Whether each evaluation of an expression should be timed
+    enabled = False
+
+    def span(self, name: str, category: str) -> ContextManager[Any]:
+        return nullcontext()
+
+    def iter_phase(self, name: str, iterator: Iterator[T]) -> Iterator[T]:
+        return iterator
+
+    def record_phase(self, name: str, seconds: float, rows: int = 1) -> None:
+        pass
+
+    def record_expression(self, expression: str, seconds: float) -> None:
+        pass
+
+    def record_expression_errors(self, expression: str, count: int) -> None:
+        pass
+
+    def wrap_function(self, name: str, function: Callable) -> Callable:
+        return function
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        pass
+
+    def set_gauge(self, name: str, value: float) -> None:
+        pass
+
+    def attach(self, jira: JIRA) -> None:
+        pass
+
+    def detach(self, jira: JIRA) -> None:
+        pass
+
+
+class Profiler(NullProfiler):
+    """Gathers where a query spends its time.
+
+    Phases are timed by measuring how long each phase takes to produce
+    each of its rows; since each phase pulls rows from the one before
+    it, the time a phase spends on its own work is found by
+    subtracting the time of the phase before it.
+
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, PhaseTiming] = {}
+        self.expressions: Dict[str, Timing] = {}
+        self.expression_errors: Dict[str, int] = {}
+        self.functions: Dict[str, Timing] = {}
+        self.counters: Dict[str, int] = {}
+        self.request_latencies: List[float] = []
+        self.request_bytes: int = 0
+
+    def iter_phase(self, name: str, iterator: Iterator[T]) -> Iterator[T]:
+        # Phases are registered as the pipeline is built (rather than
+        # when each first produces a row) so they're reported in order
+        phase = self.phases.setdefault(name, PhaseTiming(chained=True))
+
+        def timed() -> Iterator[T]:
+            while True:
+                started = time.perf_counter()
+                try:
+                    row = next(iterator)
+                except StopIteration:
+                    phase.seconds += time.perf_counter() - started
+                    return
+                phase.seconds += time.perf_counter() - started
+                phase.rows += 1
+
+                yield row
+
+        return timed()
+
+    def record_phase(self, name: str, seconds: float, rows: int = 1) -> None:
+        phase = self.phases.setdefault(name, PhaseTiming())
+        phase.rows += rows
+        phase.seconds += seconds
+
+    def record_expression(self, expression: str, seconds: float) -> None:
+        self.expressions.setdefault(expression, Timing()).add(seconds)
+
+    def record_expression_errors(self, expression: str, count: int) -> None:
+        self.expression_errors[expression] = (
+            self.expression_errors.get(expression, 0) + count
+        )
+
+    def wrap_function(self, name: str, function: Callable) -> Callable:
+        timing = self.functions.setdefault(name, Timing())
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timing.add(time.perf_counter() - started)
+
+        return wrapper
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_response(self, response: Response, *args, **kwargs) -> None:
+        self.request_latencies.append(response.elapsed.total_seconds())
+        self.request_bytes += len(response.content or b"")
+
+    def attach(self, jira: JIRA) -> None:
+        """Begin recording each request made to Jira."""
+        jira._session.hooks["response"].append(self.record_response)
+
+    def detach(self, jira: JIRA) -> None:
+        hooks = jira._session.hooks["response"]
+        if self.record_response in hooks:
+            hooks.remove(self.record_response)
+
+    def get_phase_report(self) -> Dict[str, Dict[str, Any]]:
+        report: Dict[str, Dict[str, Any]] = {}
+
+        upstream_seconds = 0.0
+        for name, phase in self.phases.items():
+            seconds = phase.seconds
+            if phase.chained:
+                seconds = max(phase.seconds - upstream_seconds, 0.0)
+                upstream_seconds = phase.seconds
+
+            report[name] = {"rows": phase.rows, "seconds": seconds}
+
+        return report
+
+    def get_request_report(self) -> Dict[str, Any]:
+        return {
+            "count": len(self.request_latencies),
+            "bytes": self.request_bytes,
+            "seconds": sum(self.request_latencies, 0.0),
+            **{
+                f"p{percentile}_seconds": get_percentile(
+                    self.request_latencies, percentile
+                )
+                for percentile in LATENCY_PERCENTILES
+            },
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "phases": self.get_phase_report(),
+            "expressions": {
+                expression: {
+                    **asdict(self.expressions.get(expression, Timing())),
+                    "errors": self.expression_errors.get(expression, 0),
+                }
+                for expression in {**self.expressions, **self.expression_errors}
+            },
+            "functions": {
+                name: asdict(timing)
+                for name, timing in self.functions.items()
+                if timing.calls
+            },
+            "requests": self.get_request_report(),
+            "counters": dict(self.counters),
+        }
+
+    def as_table(self) -> Group:
+        report = self.as_dict()
+
+        phases = Table("Phase", "Rows", "Seconds", title="Phases")
+        for name, phase in report["phases"].items():
+            phases.add_row(name, str(phase["rows"]), f"{phase['seconds']:.3f}")
+
+        expressions = Table(
+            "Expression", "Calls", "Errors", "Seconds", title="Expressions"
+        )
+        for name, timing in sorted(
+            report["expressions"].items(),
+            key=lambda item: item[1]["seconds"],
+            reverse=True,
+        ):
+            expressions.add_row(
+                name,
+                str(timing["calls"]),
+                str(timing["errors"]),
+                f"{timing['seconds']:.3f}",
+            )
+
+        functions = Table("Function", "Calls", "Seconds", title="Functions")
+        for name, timing in sorted(
+            report["functions"].items(),
+            key=lambda item: item[1]["seconds"],
+            reverse=True,
+        ):
+            functions.add_row(name, str(timing["calls"]), f"{timing['seconds']:.3f}")
+
+        other = Table("Measure", "Value", title="Requests")
+        for name, value in report["requests"].items():
+            other.add_row(
+                f"requests {name}",
+                f"{value:.3f}" if isinstance(value, float) else str(value),
+            )
+        for name, count in sorted(report["counters"].items()):
+            other.add_row(name, str(count))
+
+        return Group(phases, expressions, functions, other)
+
+
+class Tracer(NullProfiler):
+    """Records a timeline of a query's execution in Trace Event Format.
+
+    The resulting file can be opened in Perfetto (or `chrome://tracing`)
+    to see where fetching rows and evaluating them overlap or stall.
+    Each span is recorded on the thread it occurred on; spans shorter
+    than `min_duration` seconds are omitted so that a query over many
+    rows still produces a readable trace.
+
+    """
+
+    def __init__(self, min_duration: float = TRACE_MIN_DURATION) -> None:
+        self.min_duration = min_duration
+        self.events: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+        self._pid = os.getpid()
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def add_span(
+        self,
+        name: str,
+        category: str,
+        started: float,
+        seconds: float,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record a span that began at `started` (a `perf_counter` value)."""
+        if seconds < self.min_duration:
+            return
+
+        thread = threading.current_thread()
+        event: Dict[str, Any] = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (started - self._started) * 1e6,
+            "dur": seconds * 1e6,
+            "pid": self._pid,
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+
+        with self._lock:
+            self._threads.setdefault(thread.ident or 0, thread.name)
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, started, time.perf_counter() - started)
+
+    def iter_phase(self, name: str, iterator: Iterator[T]) -> Iterator[T]:
+        def traced() -> Iterator[T]:
+            while True:
+                started = time.perf_counter()
+                try:
+                    row = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.add_span(name, "phase", started, time.perf_counter() - started)
+
+                yield row
+
+        return traced()
+
+    def record_phase(self, name: str, seconds: float, rows: int = 1) -> None:
+        self.add_span(name, "phase", time.perf_counter() - seconds, seconds)
+
+    def wrap_function(self, name: str, function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add_span(name, "function", started, time.perf_counter() - started)
+
+        return wrapper
+
+    def record_response(self, response: Response, *args, **kwargs) -> None:
+        seconds = response.elapsed.total_seconds()
+        url = urlparse(response.url)
+
+        self.add_span(
+            f"{response.request.method} {url.path}",
+            "http",
+            time.perf_counter() - seconds,
+            seconds,
+            {
+                "query": url.query,
+                "status": response.status_code,
+                "bytes": len(response.content or b""),
+            },
+        )
+
+    def attach(self, jira: JIRA) -> None:
+        jira._session.hooks["response"].append(self.record_response)
+
+    def detach(self, jira: JIRA) -> None:
+        hooks = jira._session.hooks["response"]
+        if self.record_response in hooks:
+            hooks.remove(self.record_response)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "traceEvents": [
+                    *(
+                        {
+                            "name": "thread_name",
+                            "ph": "M",
+                            "pid": self._pid,
+                            "tid": tid,
+                            "args": {"name": name},
+                        }
+                        for tid, name in self._threads.items()
+                    ),
+                    *self.events,
+                ],
+                "displayTimeUnit": "ms",
+            }
+
+    def write(self, output: IO[str]) -> None:
+        json.dump(self.as_dict(), output)
+
+
+class ProfilerGroup(NullProfiler):
+    """Records everything recorded by each of `profilers`."""
+
+    def __init__(self, profilers: Iterable[NullProfiler]) -> None:
+        self.profilers = list(profilers)
+        self.enabled = any(profiler.enabled for profiler in self.profilers)
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[None]:
+        with ExitStack() as stack:
+            for profiler in self.profilers:
+                stack.enter_context(profiler.span(name, category))
+
+            yield
+
+    def iter_phase(self, name: str, iterator: Iterator[T]) -> Iterator[T]:
+        for profiler in self.profilers:
+            iterator = profiler.iter_phase(name, iterator)
+
+        return iterator
+
+    def record_phase(self, name: str, seconds: float, rows: int = 1) -> None:
+        for profiler in self.profilers:
+            profiler.record_phase(name, seconds, rows)
+
+    def record_expression(self, expression: str, seconds: float) -> None:
+        for profiler in self.profilers:
+            profiler.record_expression(expression, seconds)
+
+    def record_expression_errors(self, expression: str, count: int) -> None:
+        for profiler in self.profilers:
+            profiler.record_expression_errors(expression, count)
+
+    def wrap_function(self, name: str, function: Callable) -> Callable:
+        for profiler in self.profilers:
+            function = profiler.wrap_function(name, function)
+
+        return function
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        for profiler in self.profilers:
+            profiler.increment(name, amount)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        for profiler in self.profilers:
+            profiler.set_gauge(name, value)
+
+    def attach(self, jira: JIRA) -> None:
+        for profiler in self.profilers:
+            profiler.attach(jira)
+
+    def detach(self, jira: JIRA) -> None:
+        for profiler in self.profilers:
+            profiler.detach(jira)
+
+
+def get_profiler(profilers: List[NullProfiler]) -> NullProfiler:
+    """Return a profiler recording to each of `profilers` (if any)."""
+    if not profilers:
+        return NullProfiler()
+    elif len(profilers) == 1:
+        return profilers[0]
+
+    return ProfilerGroup(profilers)
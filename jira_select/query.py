@@ -1,19 +1,26 @@
 from __future__ import annotations
 
+import ast
+import time
 from abc import ABCMeta
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from functools import total_ordering
+from logging import getLogger
 from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import Generator
+from typing import Hashable
 from typing import Iterable
 from typing import Iterator
 from typing import List
 from typing import Mapping
 from typing import Optional
+from typing import Set
 from typing import Tuple
 from typing import Type
+from typing import TypeVar
 from typing import Union
 from typing import cast
 
@@ -28,9 +35,13 @@ from rich.progress import TimeRemainingColumn
 from . import __version__
 from .cache import MinimumRecencyCache
 from .exceptions import ExpressionParameterMissing
+from .planner import QueryPlan
+from .plugin import BaseFunction
 from .plugin import BaseSource
+from .plugin import BatchCall
 from .plugin import get_installed_functions
 from .plugin import get_installed_sources
+from .profiling import NullProfiler
 from .types import Expression
 from .types import ExpressionList
 from .types import Field
@@ -39,18 +50,34 @@ from .types import QueryDefinition
 from .types import SchemaRow
 from .types import SelectFieldDefinition
 from .types import WhereParamDict
+from .utils import ExpressionErrors
 from .utils import calculate_result_hash
 from .utils import evaluate_expression
+from .utils import evaluate_node
 from .utils import expression_includes_group_by
 from .utils import find_missing_parameters
 from .utils import find_used_parameters
 from .utils import get_cache_path
+from .utils import get_call_key
+from .utils import get_expression_names
 from .utils import get_field_data
+from .utils import get_function_calls
 from .utils import get_row_dict
 from .utils import normalize_value
 from .utils import parse_select_definition
 from .utils import parse_sort_by_definition
 
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+# Number of rows gathered before asking batch-capable functions
+# to produce, in bulk, the results those rows will need.
+BATCH_WINDOW_SIZE = 500
+
+# Number of independent subqueries run alongside the main search
+SUBQUERY_PREFETCH_WORKERS = 4
+
 
 @total_ordering
 class NullAcceptableSort:
@@ -81,6 +108,9 @@ class NullAcceptableSort:
 class Result(metaclass=ABCMeta):
     def __init__(self) -> None:
         self._overlay: dict[str, Any] = {}
+        # Data derived from this row by functions (e.g. an issue's
+        # changelog timeline) that is expensive enough to keep around
+        self._memo: dict[str, Any] = {}
 
     def __getattr__(self, name) -> Any:
         result = self.as_dict()
@@ -102,6 +132,7 @@ class Result(metaclass=ABCMeta):
         group_by: Optional[ExpressionList] = None,
         field_name_map: Optional[Dict[str, Any]] = None,
         functions: Optional[Dict[str, Callable]] = None,
+        errors: Optional[ExpressionErrors] = None,
     ):
         params: Dict[str, str] = cast(
             Dict[str, str],
@@ -131,6 +162,7 @@ class Result(metaclass=ABCMeta):
             expression,
             functions=functions,
             interpolations=field_name_map,
+            errors=errors,
         )
 
     def __setitem__(self, name, value):
@@ -333,6 +365,10 @@ class Query:
         return value
 
 
+# Minimum number of seconds between updates to each progress bar
+PROGRESS_INTERVAL = 0.1
+
+
 class NullProgressbar:
     def __init__(self, *args, **kwargs):
         pass
@@ -353,6 +389,48 @@ class NullProgressbar:
         pass
 
 
+class ProgressTracker:
+    """Forwards a task's progress to the progress bar in batches.
+
+    Updating a `rich` progress bar for every row is expensive, so rows
+    are counted here and reported at most once every `interval`
+    seconds, along with the task's latest `total` (if known).
+
+    """
+
+    def __init__(
+        self,
+        progress: Union[Progress, NullProgressbar],
+        task: TaskID,
+        total: Optional[Callable[[], int]] = None,
+        interval: float = PROGRESS_INTERVAL,
+    ):
+        self.progress = progress
+        self.task = task
+        self.total = total
+        self.interval = interval
+
+        self.pending = 0
+        self.next_update = 0.0
+
+    def advance(self, amount: int = 1) -> None:
+        self.pending += amount
+
+        if time.monotonic() >= self.next_update:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.total is not None:
+            self.progress.update(
+                self.task, advance=self.pending, total=self.total(), visible=True
+            )
+        else:
+            self.progress.update(self.task, advance=self.pending)
+
+        self.pending = 0
+        self.next_update = time.monotonic() + self.interval
+
+
 class CounterChannel:
     def __init__(self) -> None:
         self._counter: int = 2**32
@@ -370,6 +448,26 @@ class CounterChannel:
         return self._counter
 
 
+class BatchedFunction:
+    """Serves results a batch-capable function produced ahead of time.
+
+    Calls whose arguments weren't part of any batch are passed through
+    to the function itself.
+
+    """
+
+    def __init__(self, function: BaseFunction):
+        self.function = function
+        self.results: Dict[Hashable, Any] = {}
+
+    def __call__(self, *args, **kwargs) -> Any:
+        call_key = get_call_key(args, kwargs)
+        if call_key is not None and call_key in self.results:
+            return self.results[call_key]
+
+        return self.function(*args, **kwargs)
+
+
 class FieldNameMap(dict):
     def __missing__(self, key):
         return key
@@ -384,18 +482,49 @@ class Executor:
         progress_bar: bool = False,
         parameters: Optional[Dict[str, Any]] = None,
         schema: Optional[List[SchemaRow]] = None,
+        profiler: Optional[NullProfiler] = None,
+        errors: Optional[ExpressionErrors] = None,
+        known_names: Optional[Dict[str, Optional[Set[str]]]] = None,
     ):
         self._query: Query = Query(jira, definition)
+        self._profiler: NullProfiler = (
+            profiler if profiler is not None else NullProfiler()
+        )
+        # Executors sharing another's collector (e.g. subqueries') leave
+        # reporting their errors to the executor that created it
+        self._errors = errors if errors is not None else ExpressionErrors()
+        self._reports_errors = errors is None
         self._jira: JIRA = jira
         self._functions: Dict[str, Callable] = get_installed_functions(jira, self)
+        self._batched_functions: Dict[str, BatchedFunction] = {
+            name: BatchedFunction(function)
+            for name, function in self._functions.items()
+            if isinstance(function, BaseFunction) and function.supports_batch
+        }
+        self._batched_functions_by_instance: Dict[BaseFunction, BatchedFunction] = {
+            batched.function: batched for batched in self._batched_functions.values()
+        }
+        evaluation_functions: Dict[str, Callable] = {
+            **self._functions,
+            **self._batched_functions,
+        }
+        self._evaluation_functions: Dict[str, Callable] = {
+            name: self._profiler.wrap_function(name, function)
+            for name, function in evaluation_functions.items()
+        }
         self._progress_bar_enabled = progress_bar
 
         self._enable_cache = enable_cache
         self._cache = MinimumRecencyCache(get_cache_path())
         self._source_schema: List[SchemaRow] = schema if schema is not None else []
+        self._known_names: Dict[str, Optional[Set[str]]] = (
+            known_names if known_names is not None else {}
+        )
         self._field_name_map: Dict[str, str] = FieldNameMap()
 
         self._parameters: Dict[str, Any] = parameters or {}
+        self._plan: Optional[QueryPlan] = None
+        self._background: Optional[ThreadPoolExecutor] = None
 
     @property
     def jira(self) -> JIRA:
@@ -405,6 +534,11 @@ class Executor:
     def schema(self) -> List[SchemaRow]:
         return self._source_schema
 
+    @property
+    def known_names(self) -> Dict[str, Optional[Set[str]]]:
+        """Names Jira knows for each type of field, as listed by the planner."""
+        return self._known_names
+
     @property
     def cache(self) -> MinimumRecencyCache:
         return self._cache
@@ -421,6 +555,36 @@ class Executor:
     def parameters(self) -> Dict[str, Any]:
         return self._parameters
 
+    @property
+    def evaluation_functions(self) -> Dict[str, Callable]:
+        """Functions used when evaluating expressions against rows.
+
+        Batch-capable functions are replaced with wrappers serving the
+        results of earlier batch calls.
+
+        """
+        return self._evaluation_functions
+
+    @property
+    def enable_cache(self) -> bool:
+        """Whether data may be read from and written to the cache."""
+        return self._enable_cache
+
+    @property
+    def profiler(self) -> NullProfiler:
+        return self._profiler
+
+    @property
+    def errors(self) -> ExpressionErrors:
+        return self._errors
+
+    @property
+    def plan(self) -> QueryPlan:
+        if self._plan is None:
+            self._plan = QueryPlan(self)
+
+        return self._plan
+
     def get_source_schema(self) -> List[SchemaRow]:
         if not self._source_schema:
             sources = get_installed_sources()
@@ -443,14 +607,30 @@ class Executor:
 
         return self._field_name_map
 
-    def _get_cached(self, source: BaseSource) -> Iterator[Result]:
+    @property
+    def analysis_field_name_map(self) -> Dict[str, Any]:
+        """Field name map safe for interpolating expressions ahead of time.
+
+        Parameters are provided via a non-dynamic ``DotMap`` so that
+        merely inspecting an expression referencing a missing parameter
+        does not define that parameter.
+
+        """
+        field_name_map = FieldNameMap(self.field_name_map)
+        field_name_map["params"] = DotMap(self._parameters, _dynamic=False)
+
+        return field_name_map
+
+    def _get_cache_key(self) -> str:
         cache_key = ":".join(
             [
                 __version__,
                 str(self.jira.client_info()),
                 str(self.query.from_),
                 str(self.query.where),
+                str(self.plan.get_filter_pushdown().where),
                 str(self.query.order_by),
+                str(self.plan.get_sort_pushdown()),
                 str(self.query.limit),
                 str(self.query.expand),
                 str(
@@ -462,17 +642,53 @@ class Executor:
                 ),
             ]
         )
+        # Rows fetched in two phases have already been filtered
+        if self.plan.get_prefilter_fields() is not None:
+            filter_parameters = find_used_parameters(
+                " ".join(str(expression) for expression in self.query.filter)
+            )
+            cache_key = ":".join(
+                [
+                    cache_key,
+                    str(self.query.filter),
+                    str(
+                        {
+                            key: value
+                            for key, value in self.parameters.items()
+                            if key in filter_parameters
+                        }
+                    ),
+                ]
+            )
+
+        return cache_key
+
+    def _get_cached_results(self) -> Optional[Dict[str, Any]]:
+        if not self.query.cache or not self._enable_cache:
+            return None
+
+        min_recency, _ = self.query.cache
+        if min_recency is None:
+            return None
+
+        with self._profiler.span("cache read", "cache"):
+            return self.cache.get(self._get_cache_key(), min_recency=min_recency)
+
+    def has_cached_results(self) -> bool:
+        """Whether running this query will use previously-cached results."""
+        return bool(self._get_cached_results())
+
+    def _get_cached(self, source: BaseSource) -> Iterator[Result]:
+        cache_key = self._get_cache_key()
 
         if self.query.cache and self._enable_cache:
             try:
-                min_recency, _ = self.query.cache
-                if min_recency is None:
-                    raise KeyError(cache_key)
-                cached_results_raw = self.cache.get(cache_key, min_recency=min_recency)
+                cached_results_raw = self._get_cached_results()
                 if not cached_results_raw:
                     raise KeyError(cache_key)
 
                 cached_results = CachedResults.parse_obj(cached_results_raw)
+                self._profiler.increment("cache_hits")
 
                 self._source_schema = cached_results.source_schema
 
@@ -482,7 +698,7 @@ class Executor:
                     yield SingleResult(source.rehydrate(result))
                 return
             except KeyError:
-                pass
+                self._profiler.increment("cache_misses")
 
         cached_rows = []
         cached_schema = self.get_source_schema()
@@ -494,11 +710,14 @@ class Executor:
         if self.query.cache:
             _, max_store = self.query.cache
             if max_store is not None:
-                self.cache.set(
-                    cache_key,
-                    CachedResults(source_schema=cached_schema, rows=cached_rows).dict(),
-                    expire=max_store,
-                )
+                with self._profiler.span("cache write", "cache"):
+                    self.cache.set(
+                        cache_key,
+                        CachedResults(
+                            source_schema=cached_schema, rows=cached_rows
+                        ).dict(),
+                        expire=max_store,
+                    )
 
     def _get_static_results(
         self,
@@ -525,6 +744,205 @@ class Executor:
 
         return shared
 
+    def _start_independent_subqueries(self, static_results: Dict[str, Any]) -> None:
+        calls = self.plan.get_independent_subqueries(static_results)
+        if not calls:
+            return
+
+        self._background = ThreadPoolExecutor(
+            max_workers=min(SUBQUERY_PREFETCH_WORKERS, len(calls)),
+            thread_name_prefix="jira-select-subquery",
+        )
+        for call in calls:
+            self._background.submit(call.run)
+
+    def _stop_independent_subqueries(self) -> None:
+        if self._background is not None:
+            self._background.shutdown(wait=False, cancel_futures=True)
+            self._background = None
+
+    def _get_batch_calls(
+        self, expressions: Iterable[Expression]
+    ) -> List[List[Tuple[BaseFunction, ast.Call]]]:
+        """Return the batchable calls in `expressions`, in rounds.
+
+        A call whose arguments themselves make batchable calls is placed
+        in a later round than those calls, so their results are served
+        from the earlier round's batch when its arguments are evaluated.
+
+        """
+        if not self._batched_functions:
+            return []
+
+        calls: List[Tuple[BaseFunction, ast.Call]] = []
+        for expression in expressions:
+            # Only calls every row makes are gathered; calls a row might
+            # not make (e.g. in one branch of a conditional) are left to
+            # be evaluated normally, so no call is made that otherwise
+            # wouldn't have been
+            for call in get_function_calls(
+                expression,
+                self._batched_functions.keys(),
+                self.analysis_field_name_map,
+                unconditional=True,
+            ):
+                assert isinstance(call.func, ast.Name)
+
+                # Calls using `*args` or `**kwargs` can't be reproduced
+                # reliably; those are left to be evaluated normally
+                if any(isinstance(arg, ast.Starred) for arg in call.args) or any(
+                    keyword.arg is None for keyword in call.keywords
+                ):
+                    continue
+
+                calls.append((self._batched_functions[call.func.id].function, call))
+
+        gathered = {id(call): call for _, call in calls}
+        depths: Dict[int, int] = {}
+
+        def get_depth(call: ast.Call) -> int:
+            if id(call) not in depths:
+                depths[id(call)] = max(
+                    (
+                        get_depth(gathered[id(node)]) + 1
+                        for node in ast.walk(call)
+                        if node is not call and id(node) in gathered
+                    ),
+                    default=0,
+                )
+
+            return depths[id(call)]
+
+        rounds: List[List[Tuple[BaseFunction, ast.Call]]] = []
+        for function, call in calls:
+            depth = get_depth(call)
+            while len(rounds) <= depth:
+                rounds.append([])
+            rounds[depth].append((function, call))
+
+        return rounds
+
+    def _call_batches(
+        self,
+        rows: List[Result],
+        rounds: List[List[Tuple[BaseFunction, ast.Call]]],
+    ) -> None:
+        for calls in rounds:
+            self._call_batch(rows, calls)
+
+    def _call_batch(
+        self,
+        rows: List[Result],
+        calls: List[Tuple[BaseFunction, ast.Call]],
+    ) -> None:
+        gathered: Dict[BaseFunction, Dict[Hashable, BatchCall]] = {}
+
+        for row in rows:
+            names = get_expression_names(row)
+
+            for function, call in calls:
+                try:
+                    args = tuple(
+                        evaluate_node(arg, names, self.evaluation_functions)
+                        for arg in call.args
+                    )
+                    kwargs = {
+                        cast(str, keyword.arg): evaluate_node(
+                            keyword.value, names, self.evaluation_functions
+                        )
+                        for keyword in call.keywords
+                    }
+                except Exception:
+                    # Arguments may depend upon values that do not exist
+                    # for this row; the call will simply be evaluated
+                    # normally later.
+                    continue
+
+                call_key = get_call_key(args, kwargs)
+                if call_key is None:
+                    continue
+
+                gathered.setdefault(function, {})[call_key] = (args, kwargs)
+
+        for function, function_calls in gathered.items():
+            batched = self._batched_functions_by_instance[function]
+            pending = {
+                call_key: call
+                for call_key, call in function_calls.items()
+                if call_key not in batched.results
+            }
+            if not pending:
+                continue
+
+            try:
+                results = function.call_batch(list(pending.values()))
+            except Exception as e:
+                # Each call will be evaluated one at a time instead, and
+                # any error will be reported for the row that caused it.
+                logger.debug("Batch call to %s failed: %s", function, e)
+                continue
+
+            batched.results.update(zip(pending.keys(), results))
+
+    def _iter_batched(
+        self, iterator: Iterator[Result], expressions: Iterable[Expression]
+    ) -> Iterator[Result]:
+        """Yield rows after calling batch-capable functions for them in bulk.
+
+        Rows are gathered into windows so that the calls each window's
+        rows will make to batch-capable functions in `expressions` can
+        be dispatched together before the rows are evaluated.
+
+        """
+        rounds = self._get_batch_calls(expressions)
+        if not rounds:
+            yield from iterator
+            return
+
+        # When the source stops fetching once `cap` rows are found,
+        # gathering more rows than that before yielding any would fetch
+        # (and make calls for) rows the query won't output
+        window_size = BATCH_WINDOW_SIZE
+        if self.plan.can_stop_early() and self.query.cap is not None:
+            window_size = max(min(window_size, self.query.cap), 1)
+
+        window: List[Result] = []
+        for row in iterator:
+            window.append(row)
+            if len(window) >= window_size:
+                self._call_batches(window, rounds)
+                yield from window
+                window = []
+
+        if window:
+            self._call_batches(window, rounds)
+            yield from window
+
+    def track_progress(
+        self,
+        rows: Iterable[T],
+        task: TaskID,
+        total: Optional[Callable[[], int]] = None,
+    ) -> Iterator[T]:
+        """Yield `rows`, advancing `task`'s progress for each.
+
+        When progress bars are disabled, `rows` is returned unchanged
+        so that no work at all is done per row.
+
+        """
+        if isinstance(self.progress, NullProgressbar):
+            return iter(rows)
+
+        return self._iter_tracked(rows, ProgressTracker(self.progress, task, total))
+
+    def _iter_tracked(self, rows: Iterable[T], tracker: ProgressTracker) -> Iterator[T]:
+        try:
+            for row in rows:
+                tracker.advance()
+                yield row
+        finally:
+            tracker.flush()
+
     def _process_calculate(
         self,
         iterator: Iterator[Result],
@@ -532,9 +950,11 @@ class Executor:
         input_channel: CounterChannel,
         output_channel: CounterChannel,
     ) -> Iterator[Result]:
-        for row in iterator:
+        for row in self._iter_batched(
+            self.track_progress(iterator, task, input_channel.get),
+            [definition.expression for definition in self.query.calculate],
+        ):
             output_channel.set(input_channel.get())
-            self.progress.update(task, total=input_channel.get(), visible=True)
 
             for definition in self.query.calculate:
                 row[definition.column] = self.evaluate_expression(
@@ -543,8 +963,6 @@ class Executor:
 
             yield row
 
-            self.progress.update(task, advance=1)
-
     def _process_filter(
         self,
         iterator: Iterator[Result],
@@ -554,11 +972,15 @@ class Executor:
     ) -> Iterator[Result]:
         output_channel.zero()
 
-        for row in iterator:
-            self.progress.update(task, total=input_channel.get(), visible=True)
+        local_filter = self.plan.get_filter_pushdown().local
 
+        # Filters after the first are evaluated only for rows the
+        # earlier filters included, so only the first's calls are batched
+        for row in self._iter_batched(
+            self.track_progress(iterator, task, input_channel.get), local_filter[:1]
+        ):
             include_row = True
-            for filter_expression in self.query.filter:
+            for filter_expression in local_filter:
                 if not self.evaluate_expression(row, filter_expression):
                     include_row = False
                     break
@@ -567,8 +989,6 @@ class Executor:
                 output_channel.increment()
                 yield row
 
-            self.progress.update(task, advance=1)
-
     def _process_group_by(
         self,
         iterator: Iterator[Result],
@@ -580,13 +1000,12 @@ class Executor:
 
         output_channel.zero()
 
-        for row in iterator:
-            self.progress.update(task, total=input_channel.get(), visible=True)
-
+        for row in self.track_progress(iterator, task, input_channel.get):
             row_hash = calculate_result_hash(
                 row,
                 self.query.group_by,
-                self.functions,
+                self.evaluation_functions,
+                errors=self._errors,
             )
             if row_hash not in groups:
                 output_channel.increment()
@@ -594,8 +1013,6 @@ class Executor:
 
             groups[row_hash].add(row)
 
-            self.progress.update(task, advance=1)
-
         for _, value in groups.items():
             yield value
 
@@ -608,9 +1025,7 @@ class Executor:
     ) -> Iterator[Result]:
         output_channel.zero()
 
-        for row in iterator:
-            self.progress.update(task, total=input_channel.get(), visible=True)
-
+        for row in self.track_progress(iterator, task, input_channel.get):
             include_row = True
             for having in self.query.having:
                 if not self.evaluate_expression(row, having):
@@ -621,8 +1036,6 @@ class Executor:
                 output_channel.increment()
                 yield row
 
-            self.progress.update(task, advance=1)
-
     def _process_sort_by(
         self,
         iterator: Iterator[Result],
@@ -631,21 +1044,36 @@ class Executor:
         output_channel: CounterChannel,
     ) -> Iterator[Result]:
         # First, materialize our list
-        rows = list(iterator)
+        if self.query.group_by:
+            rows = list(iterator)
+        else:
+            rows = list(
+                self._iter_batched(
+                    iterator, [expression for expression, _ in self.query.sort_by]
+                )
+            )
         output_channel.set(len(rows))
         self.progress.update(task, total=len(rows), visible=True)
 
+        tracker: Optional[ProgressTracker] = None
+        if not isinstance(self.progress, NullProgressbar):
+            tracker = ProgressTracker(self.progress, task)
+
         # Now, sort by each of the ordering expressions in reverse order
         for sort_expression, reverse in reversed(self.query.sort_by):
 
             def sort_key(row):
                 result = self.evaluate_expression(row, sort_expression)
-                self.progress.update(task, advance=1)
+                if tracker is not None:
+                    tracker.advance()
 
                 return NullAcceptableSort(result)
 
             rows = sorted(rows, key=sort_key, reverse=reverse)
 
+        if tracker is not None:
+            tracker.flush()
+
         yield from rows
 
     def _generate_row_dict(self, row: Result) -> Dict[str, Any]:
@@ -671,10 +1099,18 @@ class Executor:
                 f"No search for source {self.query.from_} implemented."
             )
 
+        for line in self.plan.explain():
+            logger.debug("Query plan: %s", line)
+
+        # Subqueries not depending upon any row can run while we wait
+        # for the main search's results to arrive
+        self._start_independent_subqueries(static_results)
+
         # Do not show the counters until we know how many rows they have waiting
         iterator_task = self.progress.add_task("jira", total=0, visible=False)
         phases: List[
             Tuple[
+                str,
                 Callable[
                     [
                         Iterator[Result],
@@ -687,72 +1123,94 @@ class Executor:
                 TaskID,
             ]
         ] = []
-        if self.query.calculate:
-            calculate_task = self.progress.add_task("calculate", total=0, visible=False)
-            phases.append((self._process_calculate, calculate_task))
-        if self.query.filter:
-            filter_task = self.progress.add_task("filter", total=0, visible=False)
-            phases.append(
-                (
-                    self._process_filter,
-                    filter_task,
-                ),
-            )
-        if self.query.group_by:
-            group_by_task = self.progress.add_task("group_by", total=0, visible=False)
-            phases.append(
-                (
-                    self._process_group_by,
-                    group_by_task,
-                ),
-            )
-        if self.query.having:
-            having_task = self.progress.add_task("having", total=0, visible=False)
-            phases.append(
-                (
-                    self._process_having,
-                    having_task,
-                ),
-            )
-        if self.query.sort_by:
-            sort_by_task = self.progress.add_task("sort_by", total=0, visible=False)
+        processors = {
+            "calculate": self._process_calculate,
+            "filter": self._process_filter,
+            "group_by": self._process_group_by,
+            "having": self._process_having,
+            "sort_by": self._process_sort_by,
+        }
+        for name in self.plan.get_phases():
             phases.append(
                 (
-                    self._process_sort_by,
-                    sort_by_task,
-                ),
+                    name,
+                    processors[name],
+                    self.progress.add_task(name, total=0, visible=False),
+                )
             )
         select_task = self.progress.add_task("select", total=0, visible=False)
 
         # Link up each generator with its source; these will vary
         # depending on what query feature are in use
         channel = CounterChannel()
-        cursor: Iterator = self._get_cached(iterator(self, iterator_task, channel))
-        for phase, task_id in phases:
+        cursor: Iterator = self._profiler.iter_phase(
+            "source", self._get_cached(iterator(self, iterator_task, channel))
+        )
+        for name, phase, task_id in phases:
             output_channel = CounterChannel()
-            cursor = phase(cursor, task_id, channel, output_channel)
+            cursor = self._profiler.iter_phase(
+                name, phase(cursor, task_id, channel, output_channel)
+            )
             channel = output_channel
 
-        for row in cursor:
-            self.progress.update(select_task, total=channel.get(), visible=True)
+        def with_static_results(rows: Iterator[Result]) -> Iterator[Result]:
+            for row in rows:
+                for shared_result_name, shared_result_value in static_results.items():
+                    row[shared_result_name] = shared_result_value
 
-            for shared_result_name, shared_result_value in static_results.items():
-                row[shared_result_name] = shared_result_value
+                yield row
+
+        cursor = with_static_results(cursor)
+        # Once rows are grouped, arguments no longer evaluate to the
+        # values they would have for an individual source row
+        if not self.query.group_by:
+            cursor = self._iter_batched(
+                cursor, [definition.expression for definition in self.query.select]
+            )
 
-            yield self._generate_row_dict(row)
-            self.progress.update(select_task, advance=1)
+        def select(rows: Iterator[Result]) -> Iterator[Dict[str, Any]]:
+            for row in self.track_progress(rows, select_task, channel.get):
+                yield self._generate_row_dict(row)
+
+        yield from self._profiler.iter_phase("select", select(cursor))
 
     @property
     def progress(self) -> Union[Progress, NullProgressbar]:
         return self._progress_bar
 
     def evaluate_expression(self, row: Result, expression: Expression) -> Any:
-        return row.evaluate_expression(
-            expression,
-            self.query.group_by,
-            functions=self.functions,
-            field_name_map=self.field_name_map,
-        )
+        if not self._profiler.enabled:
+            return row.evaluate_expression(
+                expression,
+                self.query.group_by,
+                functions=self.evaluation_functions,
+                field_name_map=self.field_name_map,
+                errors=self._errors,
+            )
+
+        started = time.perf_counter()
+        try:
+            return row.evaluate_expression(
+                expression,
+                self.query.group_by,
+                functions=self.evaluation_functions,
+                field_name_map=self.field_name_map,
+                errors=self._errors,
+            )
+        finally:
+            self._profiler.record_expression(
+                str(expression), time.perf_counter() - started
+            )
+
+    def _report_errors(self) -> None:
+        """Summarize the errors raised while evaluating this query's expressions."""
+        if not self._reports_errors:
+            return
+
+        for expression, count in self._errors.get_counts().items():
+            self._profiler.record_expression_errors(expression, count)
+
+        self._errors.log_summary()
 
     def __iter__(self) -> Generator[Dict[str, Any], None, None]:
         progress_bar_cls: Union[Type[Progress], Type[NullProgressbar]] = NullProgressbar
@@ -768,10 +1226,17 @@ class Executor:
         ) as progress:
             self._progress_bar = progress
 
-            row_count = 0
-            for row in self._get_iterator():
-                yield row
+            self._profiler.attach(self.jira)
 
-                row_count += 1
-                if self.query.cap is not None and row_count >= self.query.cap:
-                    break
+            row_count = 0
+            try:
+                for row in self._get_iterator():
+                    yield row
+
+                    row_count += 1
+                    if self.query.cap is not None and row_count >= self.query.cap:
+                        break
+            finally:
+                self._stop_independent_subqueries()
+                self._report_errors()
+                self._profiler.detach(self.jira)
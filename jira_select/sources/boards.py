@@ -5,9 +5,12 @@ from typing import List
 from jira.resources import Board
 
 from ..exceptions import QueryError
+from ..paging import paginate
 from ..plugin import BaseSource
 from ..types import SchemaRow
 
+BOARD_PAGE_SIZE = 100
+
 
 class Source(BaseSource):
     SCHEMA: List[SchemaRow] = [
@@ -17,10 +20,6 @@ class Source(BaseSource):
     ]
 
     def __iter__(self) -> Iterator[Dict]:
-        start_at = 0
-        max_results = 2**32
-        result_limit = self.query.limit or 2**32
-
         if self.query.order_by:
             raise QueryError(
                 "Board query 'order_by' expressions are not supported. "
@@ -43,28 +42,25 @@ class Source(BaseSource):
             raise QueryError(f"Unexpected 'where' parameters: {where}.")
 
         self.update_progress(completed=0, total=1, visible=True)
-        while start_at < min(max_results, result_limit):
-            results = self.jira.boards(
-                startAt=start_at,
-                maxResults=min(result_limit, 100),
-                type=param_type,
-                name=param_name,
-            )
-
-            max_results = results.total
-            count = min([results.total, result_limit])
-            self.update_count(count)
 
-            for result in results:
-                self.update_progress(advance=1, total=count, visible=True)
-
-                yield result.raw
-
-                start_at += 1
-
-                # Return early if our result limit has been reached
-                if start_at >= result_limit:
-                    break
+        def update_total(total: int) -> None:
+            self.update_count(total)
+            self.update_progress(total=total, visible=True)
+
+        for result in self.track_progress(
+            paginate(
+                lambda start_at, max_results: self.jira.boards(
+                    startAt=start_at,
+                    maxResults=max_results,
+                    type=param_type,
+                    name=param_name,
+                ),
+                page_size=BOARD_PAGE_SIZE,
+                limit=self.query.limit,
+                on_total=update_total,
+            )
+        ):
+            yield result.raw
 
     def rehydrate(self, value: Dict) -> Board:
         return Board(
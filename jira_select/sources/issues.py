@@ -2,24 +2,43 @@ import logging
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Iterable
 from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Set
 
 from dotmap import DotMap
 from jira import JIRA
+from jira.exceptions import JIRAError
 from jira.resources import Issue
 from simpleeval import NameNotDefined
 
 from ..exceptions import ExpressionParameterMissing
 from ..exceptions import QueryError
+from ..paging import map_concurrently
+from ..paging import paginate
+from ..paging import paginate_by_token
 from ..plugin import BaseSource
 from ..plugin import get_installed_functions
+from ..query import SingleResult
 from ..types import SchemaRow
 from ..utils import evaluate_expression
 from ..utils import find_missing_parameters
 
 logger = logging.getLogger(__name__)
 
+CHANGELOG_PAGE_SIZE = 100
+
+# Number of issues whose truncated changelogs are completed together
+CHANGELOG_WINDOW_SIZE = 100
+
+# Maximum number of filtered issues expanded by a single search
+EXPANDED_BATCH_SIZE = 100
+
+# Number of issues requested per page when fetching page by page
+ISSUE_PAGE_SIZE = 100
+
 
 class Source(BaseSource):
     SCHEMA: List[SchemaRow] = [
@@ -69,7 +88,13 @@ class Source(BaseSource):
 
         assert isinstance(self.query.where, list)
 
-        query = " AND ".join(f"({q})" for q in self.query.where)
+        query = " AND ".join(
+            f"({q})"
+            for q in [
+                *self.query.where,
+                *self._executor.plan.get_filter_pushdown().where,
+            ]
+        )
 
         if missing := find_missing_parameters(
             query, list(self._executor.parameters.keys())
@@ -81,7 +106,11 @@ class Source(BaseSource):
 
         query = query.format(params=DotMap(self._executor.parameters))
 
-        order_by_fields = ", ".join(self.query.order_by)
+        # Sorting pushed down from `sort_by` takes precedence; `order_by`
+        # only breaks ties, as it would have when sorting locally.
+        order_by_fields = ", ".join(
+            [*self._executor.plan.get_sort_pushdown(), *self.query.order_by]
+        )
 
         if order_by_fields:
             query = f"{query} ORDER BY {order_by_fields}"
@@ -90,6 +119,176 @@ class Source(BaseSource):
 
         return query
 
+    def get_estimated_count(self) -> int:
+        """Return how many issues the search will find without fetching them."""
+        if self.jira._is_cloud:
+            return self.jira.approximate_issue_count(self._get_jql())
+
+        return self.jira.search_issues(
+            self._get_jql(), maxResults=1, fields="key"
+        ).total
+
+    def _fetch_changelog(self, key: str, total: int) -> List[Dict[str, Any]]:
+        histories: List[Dict[str, Any]] = []
+
+        try:
+            while len(histories) < total:
+                page = self.jira._get_json(
+                    f"issue/{key}/changelog",
+                    params={
+                        "startAt": len(histories),
+                        "maxResults": CHANGELOG_PAGE_SIZE,
+                    },
+                )
+                histories.extend(page.get("values", []))
+                if page.get("isLast") or not page.get("values"):
+                    break
+        except JIRAError as e:
+            # The changelog endpoint isn't available on older Jira
+            # versions; the issue itself includes the whole changelog.
+            logger.debug("Fetching changelog for %s failed (%s); retrying.", key, e)
+            histories = self.jira.issue(key, expand="changelog").raw["changelog"][
+                "histories"
+            ]
+
+        return histories
+
+    def _complete_changelog(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace a truncated inline changelog with the complete one."""
+        changelog = raw["changelog"]
+        histories = changelog.get("histories", [])
+
+        merged = {
+            history["id"]: history
+            for history in [
+                *histories,
+                *self._fetch_changelog(raw["key"], changelog["total"]),
+            ]
+        }
+        ordered = sorted(
+            merged.values(),
+            key=lambda history: (
+                int(history["id"]) if str(history["id"]).isdigit() else 0
+            ),
+        )
+
+        raw["changelog"] = {
+            **changelog,
+            "startAt": 0,
+            "maxResults": len(ordered),
+            "total": len(ordered),
+            "histories": ordered,
+        }
+        return raw
+
+    def _is_changelog_truncated(self, raw: Dict[str, Any]) -> bool:
+        changelog = raw.get("changelog")
+        if not isinstance(changelog, dict):
+            return False
+
+        return changelog.get("total", 0) > len(changelog.get("histories", []))
+
+    def _with_complete_changelogs(
+        self, raw_issues: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        truncated = [raw for raw in raw_issues if self._is_changelog_truncated(raw)]
+
+        for future in map_concurrently(self._complete_changelog, truncated):
+            future.result()
+
+        return raw_issues
+
+    def _matches_filter(self, raw: Dict[str, Any]) -> bool:
+        row = SingleResult(self.rehydrate(raw))
+
+        return all(
+            self._executor.evaluate_expression(row, expression)
+            for expression in self._executor.plan.get_filter_pushdown().local
+        )
+
+    def _fetch_expanded(self, keys: List[str]) -> List[Dict[str, Any]]:
+        by_key: Dict[str, Dict[str, Any]] = {}
+
+        # Jira may return fewer issues per search than were requested;
+        # issues not yet returned are searched for again until no more
+        # of them are found.
+        remaining = keys
+        while remaining:
+            results = self.jira.search_issues(
+                "key in ({keys})".format(
+                    keys=", ".join(f'"{key}"' for key in remaining)
+                ),
+                expand=",".join(self.query.expand),
+                fields="*all",
+                maxResults=len(remaining),
+            )
+            found = {result.raw["key"]: result.raw for result in results}
+            if not any(key in found for key in remaining):
+                break
+
+            by_key.update(found)
+            remaining = [key for key in remaining if key not in by_key]
+
+        if remaining:
+            logger.warning(
+                "%s issue(s) matching the query could not be fetched "
+                "(deleted, moved, or no longer visible) and were omitted: %s",
+                len(remaining),
+                ", ".join(remaining),
+            )
+
+        raw_issues = [by_key[key] for key in keys if key in by_key]
+        if "changelog" in self.query.expand:
+            raw_issues = self._with_complete_changelogs(raw_issues)
+
+        return raw_issues
+
+    def _iter_prefiltered(self, jql: str, fields: Set[str]) -> Iterator[Dict]:
+        """Filter rows using only `fields`, then expand the survivors.
+
+        If the query can stop once `cap` rows are found, rows are
+        fetched a page at a time and only until `cap` rows survive.
+
+        """
+        result_limit = self.query.limit or 0
+        cap: Optional[int] = None
+
+        results: Iterable[Issue]
+        if self._executor.plan.can_stop_early():
+            cap = self.query.cap
+            results = self._search_page_by_page(
+                jql,
+                fields=",".join(sorted(fields)) or "key",
+                limit=result_limit or None,
+                on_total=lambda total: self.update_progress(total=total, visible=True),
+            )
+        else:
+            results = self.jira.search_issues(
+                jql,
+                fields=",".join(sorted(fields)) or "key",
+                maxResults=max(result_limit, 0),
+            )
+            self.update_progress(total=results.total, visible=True)
+
+        keys: List[str] = []
+        for result in self.track_progress(results):
+            if self._matches_filter(result.raw):
+                keys.append(result.raw["key"])
+                if cap is not None and len(keys) >= cap:
+                    break
+
+        self.update_count(len(keys))
+        self.update_progress(completed=0, total=len(keys), visible=True)
+
+        for future in map_concurrently(
+            self._fetch_expanded,
+            [
+                keys[offset : offset + EXPANDED_BATCH_SIZE]
+                for offset in range(0, len(keys), EXPANDED_BATCH_SIZE)
+            ],
+        ):
+            yield from self.track_progress(future.result())
+
     def __iter__(self) -> Iterator[Dict]:
         start_at = 0
         result_limit = self.query.limit or 0
@@ -97,6 +296,16 @@ class Source(BaseSource):
         jql = self._get_jql()
 
         self.update_progress(completed=0, total=1, visible=True)
+
+        prefilter_fields = self._executor.plan.get_prefilter_fields()
+        if prefilter_fields is not None:
+            yield from self._iter_prefiltered(jql, prefilter_fields)
+            return
+
+        if self._executor.plan.can_stop_early():
+            yield from self._iter_lazily(jql)
+            return
+
         results = self.jira.search_issues(
             jql,
             startAt=start_at,
@@ -106,11 +315,95 @@ class Source(BaseSource):
         )
 
         self.update_count(results.total)
+        self.update_progress(total=results.total, visible=True)
+
+        yield from self._iter_windows(results)
+
+    def _search_page_by_page(
+        self,
+        jql: str,
+        fields: str,
+        limit: Optional[int],
+        on_total: Callable[[int], None],
+        expand: str = "",
+    ) -> Iterable[Issue]:
+        """Return the issues `jql` finds, requesting a page at a time."""
+        if self.jira._is_cloud:
+            # Jira Cloud refuses searches starting anywhere but the
+            # first issue, and doesn't report how many issues matched
+            # alongside each page; it's asked for an estimate instead.
+            total = self.jira.approximate_issue_count(jql)
+            on_total(total if limit is None else min(total, limit))
+            return paginate_by_token(
+                lambda token, max_results: self.jira.enhanced_search_issues(
+                    jql,
+                    nextPageToken=token,
+                    expand=expand,
+                    fields=fields,
+                    maxResults=max_results,
+                ),
+                page_size=ISSUE_PAGE_SIZE,
+                limit=limit,
+            )
+
+        return paginate(
+            lambda start_at, max_results: self.jira.search_issues(
+                jql,
+                startAt=start_at,
+                expand=expand,
+                fields=fields,
+                maxResults=max_results,
+            ),
+            page_size=ISSUE_PAGE_SIZE,
+            limit=limit,
+            on_total=on_total,
+        )
+
+    def _iter_lazily(self, jql: str) -> Iterator[Dict]:
+        """Fetch issues a page at a time for only as long as they're needed.
 
+        Once the query's `cap` is reached, the executor stops consuming
+        rows, and pages that haven't yet been requested never are.
+
+        """
+
+        def on_total(total: int) -> None:
+            self.update_count(total)
+            self.update_progress(total=total, visible=True)
+
+        yield from self._iter_windows(
+            self._search_page_by_page(
+                jql,
+                fields="*all",
+                limit=self._executor.plan.get_fetch_limit(),
+                on_total=on_total,
+                expand=",".join(self.query.expand),
+            ),
+            # Rows are released a page at a time so that the executor
+            # can stop us before further pages are requested
+            window_size=ISSUE_PAGE_SIZE,
+        )
+
+    def _iter_windows(
+        self, results: Iterable[Issue], window_size: int = CHANGELOG_WINDOW_SIZE
+    ) -> Iterator[Dict]:
+        # Jira includes only the first page of each issue's changelog;
+        # the rest of any longer changelog is gathered window by window.
+        window: List[Dict[str, Any]] = []
         for result in results:
-            self.update_progress(advance=1, total=results.total, visible=True)
+            window.append(result.raw)
+            if len(window) >= window_size:
+                yield from self._complete_window(window)
+                window = []
+
+        if window:
+            yield from self._complete_window(window)
+
+    def _complete_window(self, window: List[Dict[str, Any]]) -> Iterator[Dict]:
+        if "changelog" in self.query.expand:
+            window = self._with_complete_changelogs(window)
 
-            yield result.raw
+        yield from self.track_progress(window)
 
     def rehydrate(self, value: Dict) -> Issue:
         return Issue({}, None, value)
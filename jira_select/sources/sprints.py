@@ -3,12 +3,18 @@ from typing import Iterator
 from typing import List
 
 from jira.exceptions import JIRAError
+from jira.resources import Board
 from jira.resources import Sprint
 
 from ..exceptions import QueryError
+from ..paging import map_concurrently
+from ..paging import paginate
 from ..plugin import BaseSource
 from ..types import SchemaRow
 
+BOARD_PAGE_SIZE = 100
+SPRINT_PAGE_SIZE = 50
+
 
 class Source(BaseSource):
     SCHEMA: List[SchemaRow] = [
@@ -22,8 +28,6 @@ class Source(BaseSource):
     ]
 
     def __iter__(self) -> Iterator[Dict]:
-        start_at = 0
-        max_results = 2**32
         result_limit = self.query.limit or 2**32
 
         if self.query.order_by:
@@ -49,56 +53,64 @@ class Source(BaseSource):
         if where:
             raise QueryError(f"Unexpected 'where' parameters: {where}.")
 
-        count = 0
+        def update_total(total: int) -> None:
+            self.update_progress(total=total, visible=True)
 
-        already_returned = set()
-
-        self.update_progress(completed=0, total=1, visible=True)
-        while start_at < min(max_results, result_limit):
-            results = self.jira.boards(
+        boards = paginate(
+            lambda start_at, max_results: self.jira.boards(
                 startAt=start_at,
-                maxResults=min(result_limit, 100),
+                maxResults=max_results,
                 type=param_board_type,
                 name=param_board_name,
-            )
+            ),
+            page_size=BOARD_PAGE_SIZE,
+            on_total=update_total,
+        )
 
-            max_results = results.total
+        def get_board_sprints(board: Board) -> List[Sprint]:
+            sprints: List[Sprint] = []
 
-            for result in results:
-                self.update_progress(advance=1, total=results.total, visible=True)
+            is_last = False
+            while not is_last:
+                try:
+                    page = self.jira.sprints(
+                        board.id,
+                        startAt=len(sprints),
+                        maxResults=SPRINT_PAGE_SIZE,
+                        state=param_state,
+                    )
+                except JIRAError:
+                    # Boards not supporting sprints (e.g. kanban boards)
+                    # respond with an error
+                    break
 
-                sprint_start_at = 0
-                is_last = False
-                while not is_last:
-                    try:
-                        sprints = self.jira.sprints(
-                            result.id,
-                            startAt=sprint_start_at,
-                            maxResults=50,
-                            state=param_state,
-                        )
-                    except JIRAError:
-                        break
+                sprints.extend(page)
+                is_last = page.isLast or not len(page)
 
-                    is_last = sprints.isLast
-                    for sprint in sprints:
-                        sprint_start_at += 1
+            return sprints
 
-                        if sprint.id in already_returned:
-                            continue
+        count = 0
+        already_returned = set()
 
-                        count += 1
-                        self.update_count(count)
+        self.update_progress(completed=0, total=1, visible=True)
+        # Sprints are often shared between boards, but there's no way of
+        # knowing which boards share a sprint without asking each of them.
+        for future in map_concurrently(get_board_sprints, boards):
+            self.update_progress(advance=1)
 
-                        yield sprint.raw
+            for sprint in future.result():
+                if sprint.id in already_returned:
+                    continue
+                already_returned.add(sprint.id)
 
-                        already_returned.add(sprint.id)
+                count += 1
+                self.update_count(count)
 
-                        # Return early if our result limit has been reached
-                        if count >= result_limit:
-                            break
+                yield sprint.raw
 
-                start_at += 1
+                # Return early if our result limit has been reached
+                if count >= result_limit:
+                    return
 
     def rehydrate(self, value: Dict) -> Sprint:
         return Sprint(
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import threading
+import time
+from logging import getLogger
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+from jira import JIRA
+from jira.exceptions import JIRAError
+
+from . import __version__
+from .cache import MinimumRecencyCache
+from .paging import map_concurrently
+from .paging import paginate
+from .utils import get_cache_path
+
+logger = getLogger(__name__)
+
+# Number of seconds a catalog is used for; sprints' states and dates
+# change, so this is kept short
+SPRINT_CATALOG_TTL = 60 * 5
+
+BOARD_PAGE_SIZE = 50
+SPRINT_PAGE_SIZE = 50
+
+_CATALOGS: Dict[Tuple[str, bool], SprintCatalog] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def get_trigrams(value: str) -> Set[str]:
+    return {value[index : index + 3] for index in range(len(value) - 2)}
+
+
+class SprintCatalog:
+    """Index of an instance's boards and sprints.
+
+    Sprints are indexed by id, by the boards they appear on, and by
+    the trigrams of their (case-folded) names so that finding sprints
+    having a name containing a particular string is cheap.
+
+    """
+
+    def __init__(
+        self, jira: JIRA, built_at: Optional[float] = None, persist: bool = True
+    ):
+        self._jira = jira
+        self._lock = threading.RLock()
+
+        self.persist = persist
+        self.built_at = built_at
+        self.created_at = built_at if built_at is not None else time.time()
+        self.refreshed_at: Dict[Union[str, int], float] = {}
+        self.sprints: Dict[int, Dict[str, Any]] = {}
+        self.boards: Dict[int, Dict[str, Any]] = {}
+        self.board_sprints: Dict[int, List[int]] = {}
+        self.trigrams: Dict[str, Set[int]] = {}
+
+    @property
+    def jira(self) -> JIRA:
+        return self._jira
+
+    @property
+    def complete(self) -> bool:
+        """Whether every board and sprint has been gathered."""
+        return self.built_at is not None
+
+    @property
+    def expired(self) -> bool:
+        return time.time() - self.created_at > SPRINT_CATALOG_TTL
+
+    @classmethod
+    def get_cache(cls) -> MinimumRecencyCache:
+        return MinimumRecencyCache(get_cache_path("sprints"))
+
+    @classmethod
+    def get_cache_key(cls, jira: JIRA) -> str:
+        return ":".join([__version__, "sprint-catalog", str(jira.client_info())])
+
+    def add_sprint(
+        self,
+        sprint: Dict[str, Any],
+        board_id: Optional[int] = None,
+        sprint_id: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            sprint_id = sprint["id"] if sprint_id is None else sprint_id
+            if sprint_id not in self.sprints:
+                for trigram in get_trigrams(str(sprint.get("name", "")).casefold()):
+                    self.trigrams.setdefault(trigram, set()).add(sprint_id)
+            self.sprints[sprint_id] = sprint
+
+            if board_id is not None:
+                board_sprints = self.board_sprints.setdefault(board_id, [])
+                if sprint_id not in board_sprints:
+                    board_sprints.append(sprint_id)
+
+    def add_board(self, board: Dict[str, Any], sprints: Iterable[Dict[str, Any]]):
+        with self._lock:
+            self.boards[board["id"]] = board
+            self.board_sprints[board["id"]] = []
+            for sprint in sprints:
+                self.add_sprint(sprint, board_id=board["id"])
+
+    def get_sprint(self, sprint_id: int) -> Optional[Dict[str, Any]]:
+        return self.sprints.get(sprint_id)
+
+    def find_boards(self, board_name_or_id: Union[str, int]) -> List[int]:
+        """Return the boards having this id or a name containing this name."""
+        if isinstance(board_name_or_id, int):
+            return [board_name_or_id] if board_name_or_id in self.boards else []
+
+        name = board_name_or_id.casefold()
+        return [
+            board_id
+            for board_id, board in self.boards.items()
+            if name in str(board.get("name", "")).casefold()
+        ]
+
+    def find_sprints(self, board_ids: List[int], name: str) -> List[Dict[str, Any]]:
+        """Return sprints on these boards having a name containing `name`."""
+        name = name.casefold()
+        candidates: Optional[Set[int]] = None
+        for trigram in get_trigrams(name):
+            candidates = (
+                self.trigrams.get(trigram, set())
+                if candidates is None
+                else candidates & self.trigrams.get(trigram, set())
+            )
+
+        found: Dict[int, Dict[str, Any]] = {}
+        for board_id in board_ids:
+            for sprint_id in self.board_sprints.get(board_id, []):
+                if candidates is not None and sprint_id not in candidates:
+                    continue
+
+                sprint = self.sprints[sprint_id]
+                if name in str(sprint.get("name", "")).casefold():
+                    found[sprint_id] = sprint
+
+        return list(found.values())
+
+    def fetch_boards(self, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [
+            board.raw
+            for board in paginate(
+                lambda start_at, max_results: self.jira.boards(
+                    startAt=start_at, maxResults=max_results, name=name
+                ),
+                page_size=BOARD_PAGE_SIZE,
+            )
+        ]
+
+    def fetch_sprints(self, board_id: int) -> List[Dict[str, Any]]:
+        sprints: List[Dict[str, Any]] = []
+
+        is_last = False
+        while not is_last:
+            try:
+                page = self.jira.sprints(
+                    board_id, startAt=len(sprints), maxResults=SPRINT_PAGE_SIZE
+                )
+            except JIRAError:
+                # Boards not supporting sprints (e.g. kanban boards)
+                # respond with an error
+                break
+
+            sprints.extend(sprint.raw for sprint in page)
+            is_last = page.isLast or not len(page)
+
+        return sprints
+
+    def build(self) -> None:
+        """Gather every board and every board's sprints."""
+        boards = self.fetch_boards()
+
+        for board, future in zip(
+            boards,
+            map_concurrently(self.fetch_sprints, [board["id"] for board in boards]),
+        ):
+            self.add_board(board, future.result())
+
+        self.built_at = time.time()
+        self.save()
+
+    def refresh_boards(self, board_name_or_id: Union[str, int]) -> None:
+        """Gather the sprints of the boards matching `board_name_or_id` again.
+
+        Boards are matched as by `find_boards`; only those boards (and
+        not every board on the instance) are requested.
+
+        """
+        if isinstance(board_name_or_id, int):
+            boards = [self.boards.get(board_name_or_id, {"id": board_name_or_id})]
+        else:
+            boards = self.fetch_boards(name=board_name_or_id)
+
+        for board, future in zip(
+            boards,
+            map_concurrently(self.fetch_sprints, [board["id"] for board in boards]),
+        ):
+            sprints = future.result()
+            # Requesting the sprints of an id that isn't a board fails
+            # just as it does for boards not supporting sprints; boards
+            # not found by name are only added if they have sprints.
+            if sprints or board["id"] in self.boards or "name" in board:
+                self.add_board(board, sprints)
+
+        self.refreshed_at[board_name_or_id] = time.time()
+        self.save()
+
+    def get_refreshed_age(self, board_name_or_id: Union[str, int]) -> float:
+        """Return the age of the sprints gathered for `board_name_or_id`."""
+        return time.time() - self.refreshed_at.get(board_name_or_id, self.built_at or 0)
+
+    def save(self) -> None:
+        # Refreshing boards doesn't extend the catalog's lifetime
+        remaining = SPRINT_CATALOG_TTL - (time.time() - self.created_at)
+        if not self.persist or remaining <= 0:
+            return
+
+        self.get_cache().set(
+            self.get_cache_key(self.jira),
+            {
+                "built_at": self.built_at,
+                "boards": self.boards,
+                "sprints": self.sprints,
+                "board_sprints": self.board_sprints,
+            },
+            expire=remaining,
+        )
+
+    @classmethod
+    def load(cls, jira: JIRA) -> Optional[SprintCatalog]:
+        stored = cls.get_cache().get(cls.get_cache_key(jira))
+        if not stored:
+            return None
+
+        catalog = cls(jira, built_at=stored["built_at"])
+        catalog.boards = stored["boards"]
+        catalog.board_sprints = stored["board_sprints"]
+        for sprint_id, sprint in stored["sprints"].items():
+            catalog.add_sprint(sprint, sprint_id=sprint_id)
+
+        return catalog
+
+
+def get_sprint_catalog(
+    jira: JIRA, complete: bool = False, persist: bool = True
+) -> SprintCatalog:
+    """Return the sprint catalog for this Jira instance.
+
+    The catalog is shared by every query run by this process for
+    `SPRINT_CATALOG_TTL` seconds and, if `persist` is set, stored in
+    the cache for as long.  Unless `complete` is set, the catalog
+    returned may not yet have gathered every sprint.
+
+    """
+    key = (str(jira.client_info()), persist)
+
+    with _CATALOGS_LOCK:
+        if key not in _CATALOGS or _CATALOGS[key].expired:
+            _CATALOGS[key] = (
+                SprintCatalog.load(jira) if persist else None
+            ) or SprintCatalog(jira, persist=persist)
+
+        catalog = _CATALOGS[key]
+
+        if complete and not catalog.complete:
+            catalog.build()
+
+    return catalog
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import ast
 import datetime
 import hashlib
 import json
@@ -8,11 +9,15 @@ import os
 import re
 import subprocess
 import sys
+import threading
 from types import ModuleType
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Mapping
 from typing import Optional
@@ -49,6 +54,9 @@ PARAM_FINDER = re.compile(r"{params\.([^}.]+)(?:.[^}.]+)?}")
 
 ISO_FORMAT = "%Y-%m-%d %H:%M:%SZ"
 
+# Number of row keys kept as examples of each expression's errors
+ERROR_SAMPLE_SIZE = 3
+
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +64,7 @@ logger = logging.getLogger(__name__)
 class JiraSelectJsonEncoder(json.JSONEncoder):
     def default(self, obj: Any) -> Any:
         from .functions.flatten_changelog import ChangelogEntry
+        from .intervals import IntervalSet
 
         if isinstance(obj, datetime.datetime):
             return UTC.normalize(obj).strftime(ISO_FORMAT)
@@ -76,6 +85,8 @@ class JiraSelectJsonEncoder(json.JSONEncoder):
             }
         elif isinstance(obj, set):
             return list(obj)
+        elif isinstance(obj, IntervalSet):
+            return list(obj)
         elif isinstance(obj, Interval):
             interval_list = []
             for interval in list(obj):
@@ -193,9 +204,11 @@ def calculate_result_hash(
     row: Result,
     group_fields: ExpressionList,
     functions: Dict[str, Callable],
+    errors: Optional[ExpressionErrors] = None,
 ) -> int:
     params = [
-        str(get_field_data(row, group_field, functions)) for group_field in group_fields
+        str(get_field_data(row, group_field, functions, errors=errors))
+        for group_field in group_fields
     ]
 
     return int(hashlib.sha1(":".join(params).encode("UTF-8")).hexdigest(), 16)
@@ -281,12 +294,209 @@ def normalize_value(value: Any) -> Any:
     return value
 
 
+def get_expression_names(row: Result) -> Dict[str, Any]:
+    return {
+        "_": row,  # Pre 3.0 queries
+        "issue": row,  # Post-3.0 queries
+        **row.as_dict(),
+    }
+
+
+def parse_expression(
+    expression: Expression,
+    interpolations: Optional[Mapping[str, Any]] = None,
+) -> Optional[ast.Expression]:
+    """Return the syntax tree of `expression`, if it can be parsed.
+
+    Expressions that cannot be interpolated or parsed return `None`;
+    they'll produce a proper error once they are actually evaluated.
+
+    """
+    try:
+        formatted_expression = str(expression).format_map(interpolations or {})
+        return ast.parse(formatted_expression.strip(), mode="eval")
+    except (KeyError, IndexError, AttributeError, ValueError, SyntaxError):
+        return None
+
+
+def _walk_unconditional(node: ast.AST) -> Iterator[ast.AST]:
+    """Yield `node` and each node within it evaluated whenever it is."""
+    yield node
+
+    children: List[ast.AST]
+    if isinstance(node, ast.IfExp):
+        children = [node.test]
+    elif isinstance(node, ast.BoolOp):
+        children = [*node.values[:1]]
+    elif isinstance(node, ast.Compare):
+        # `a < b < c` evaluates `c` only if `a < b`
+        children = [node.left, node.comparators[0]]
+    elif isinstance(node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+        children = [node.generators[0].iter]
+    elif isinstance(node, ast.Lambda):
+        children = [
+            *node.args.defaults,
+            *(default for default in node.args.kw_defaults if default is not None),
+        ]
+    else:
+        children = list(ast.iter_child_nodes(node))
+
+    for child in children:
+        yield from _walk_unconditional(child)
+
+
+def get_function_calls(
+    expression: Expression,
+    function_names: Iterable[str],
+    interpolations: Optional[Mapping[str, Any]] = None,
+    unconditional: bool = False,
+) -> List[ast.Call]:
+    """Return every call to one of `function_names` within `expression`.
+
+    If `unconditional`, only calls made whenever `expression` is
+    evaluated are returned; calls within either branch of a
+    conditional expression, after the first operand of `and` or `or`,
+    or within a comprehension's or lambda's body are omitted.
+
+    Expressions that cannot be interpolated or parsed are treated as
+    containing no calls.
+
+    """
+    names = set(function_names)
+
+    tree = parse_expression(expression, interpolations)
+    if tree is None:
+        return []
+
+    return [
+        node
+        for node in (_walk_unconditional(tree) if unconditional else ast.walk(tree))
+        if isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in names
+    ]
+
+
+def get_referenced_names(node: ast.AST) -> Set[str]:
+    """Return the names `node` reads, excluding the functions it calls."""
+    called = {
+        id(child.func)
+        for child in ast.walk(node)
+        if isinstance(child, ast.Call) and isinstance(child.func, ast.Name)
+    }
+
+    return {
+        child.id
+        for child in ast.walk(node)
+        if isinstance(child, ast.Name) and id(child) not in called
+    }
+
+
+def get_call_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[Hashable]:
+    """Return a key identifying a call having these arguments.
+
+    Returns `None` if the arguments aren't hashable.
+
+    """
+    call_key = (args, tuple(sorted(kwargs.items())))
+
+    try:
+        hash(call_key)
+    except TypeError:
+        return None
+
+    return call_key
+
+
+def evaluate_node(
+    node: ast.AST,
+    names: Dict[str, Any],
+    functions: Optional[Dict[str, Callable]] = None,
+) -> Any:
+    """Evaluate an already-parsed (sub-)expression."""
+    return EvalWithCompoundTypes(names=names, functions=functions).eval(
+        ast.unparse(node), previously_parsed=node
+    )
+
+
+class ExpressionErrorSummary:
+    def __init__(self, message: str):
+        self.count = 0
+        self.message = message
+        self.sample_keys: List[str] = []
+
+
+class ExpressionErrors:
+    """Errors raised while evaluating expressions, counted per expression.
+
+    Expressions reading a sparsely-populated field can fail for most
+    rows; rather than logging each failure, failures are counted for
+    each expression and kind of error, and the keys of a few of the
+    rows they occurred for are kept as examples.
+
+    """
+
+    def __init__(self, sample_size: int = ERROR_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self.errors: Dict[Tuple[str, str], ExpressionErrorSummary] = {}
+        self._lock = threading.Lock()
+
+    def record(self, expression: Expression, error: Exception, row: Any) -> None:
+        error_key = (str(expression), error.__class__.__name__)
+
+        try:
+            key: Optional[str] = str(row.key)
+        except Exception:
+            key = None
+
+        with self._lock:
+            summary = self.errors.get(error_key)
+            if summary is None:
+                summary = self.errors[error_key] = ExpressionErrorSummary(str(error))
+            summary.count += 1
+
+            if key is not None and len(summary.sample_keys) < self.sample_size:
+                summary.sample_keys.append(key)
+
+    def get_counts(self) -> Dict[str, int]:
+        """Return the number of errors raised by each expression."""
+        counts: Dict[str, int] = {}
+        for (expression, _), summary in self.errors.items():
+            counts[expression] = counts.get(expression, 0) + summary.count
+
+        return counts
+
+    def log_summary(self) -> None:
+        if not self.errors:
+            return
+
+        logger.warning(
+            "Errors occurred while evaluating expressions; "
+            "these evaluated to None:\n%s",
+            "\n".join(
+                f"  {error_type} while evaluating {expression} for "
+                f"{summary.count} row(s)"
+                + (
+                    f" (e.g. {', '.join(summary.sample_keys)})"
+                    if summary.sample_keys
+                    else ""
+                )
+                + f": {summary.message}"
+                for (expression, error_type), summary in self.errors.items()
+            ),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.errors)
+
+
 def get_field_data(
     row: Result,
     expression: Expression,
     functions: Optional[Dict[str, Callable]] = None,
     interpolations: Optional[Mapping[str, Any]] = None,
     error_returns_null=True,
+    errors: Optional[ExpressionErrors] = None,
 ) -> Any:
     if functions is None:
         functions = {}
@@ -295,11 +505,7 @@ def get_field_data(
         return normalize_value(
             evaluate_expression(
                 expression,
-                names={
-                    "_": row,  # Pre 3.0 queries
-                    "issue": row,  # Post-3.0 queries
-                    **row.as_dict(),
-                },
+                names=get_expression_names(row),
                 functions=functions,
                 interpolations=interpolations,
             )
@@ -318,13 +524,16 @@ def get_field_data(
         TypeError,
         AttributeError,
     ) as e:
-        logger.warning(
-            "%s while evaluating expression %s for issue(s) %s: %s",
-            e.__class__.__name__,
-            expression,
-            row.key,
-            e,
-        )
+        if errors is not None:
+            errors.record(expression, e, row)
+        else:
+            logger.warning(
+                "%s while evaluating expression %s for issue(s) %s: %s",
+                e.__class__.__name__,
+                expression,
+                row.key,
+                e,
+            )
         if not error_returns_null:
             raise
         return None
@@ -84,6 +84,7 @@ setup(
             "store-password = jira_select.commands.store_password:Command",
             "build-query = jira_select.commands.build_query:Command",
             "run-query = jira_select.commands.run:Command",
+            "explain = jira_select.commands.explain:Command",
             "schema = jira_select.commands.schema:Command",
             "functions = jira_select.commands.functions:Command",
             "shell = jira_select.commands.shell:Command",
@@ -119,11 +120,16 @@ setup(
             "json_dumps = jira_select.functions.json_dumps:Function",
             "get_issue = jira_select.functions.get_issue:Function",
             "workdays_in_state = jira_select.functions.workdays_in_state:Function",
+            "state_durations = jira_select.functions.state_durations:Function",
             "get_issue_snapshot_on_date = jira_select.functions.get_issue_snapshot_on_date:Function",
+            "cumulative_flow = jira_select.functions.cumulative_flow:Function",
+            "business_calendar = jira_select.functions.business_calendar:Function",
             "interval_business_hours = jira_select.functions.interval_business_hours:Function",
             "interval_matching = jira_select.functions.interval_matching:Function",
             "interval_size = jira_select.functions.interval_size:Function",
+            "interval_set = jira_select.functions.interval_set:Function",
             "subquery = jira_select.functions.subquery:Function",
+            "lookup = jira_select.functions.lookup:Function",
             "union = jira_select.functions.union:Function",
             "now = jira_select.functions.now:Function",
             "get_linked_issue_keys = jira_select.functions.get_linked_issue_keys:Function",
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import datetime
+import uuid
 from types import SimpleNamespace
 from unittest.mock import Mock
+from unittest.mock import patch
 
+import portion
 import pytz
+from jira import Issue
+from jira.client import ResultList
 
+from jira_select.exceptions import QueryError
 from jira_select.functions.flatten_changelog import ChangelogEntry
+from jira_select.functions.flatten_changelog import get_flattened_changelog
 from jira_select.functions.sprint_details import SprintInfo
 from jira_select.plugin import get_installed_functions
+from jira_select.query import GroupedResult
+from jira_select.query import SingleResult
+from jira_select.sprint_catalog import SprintCatalog
 
 from .base import JiraSelectTestCase
 
@@ -99,6 +109,104 @@ class TestGetSprint(JiraSelectFunctionTestCase):
 
         assert result.raw == arbitrary_sprint_data
 
+    def test_call_batch(self):
+        mock_jira = Mock(
+            sprint=Mock(side_effect=lambda id: Mock(raw={"id": id})),
+            _options={"agile_rest_path": "/"},
+        )
+
+        function = get_installed_functions(mock_jira)["get_sprint_by_id"]
+        results = function.call_batch([((11,), {}), ((12,), {}), ((11,), {})])
+
+        assert [result.raw for result in results] == [
+            {"id": 11},
+            {"id": 12},
+            {"id": 11},
+        ]
+        assert mock_jira.sprint.call_count == 2
+
+
+class TestGetSprintByName(JiraSelectFunctionTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.boards = {
+            1: [{"id": 101, "name": "Alpha Sprint 1"}, {"id": 102, "name": "Sprint 2"}],
+            2: [{"id": 102, "name": "Sprint 2"}, {"id": 201, "name": "Beta Sprint 1"}],
+        }
+
+        def get_boards(startAt=0, maxResults=50, name=None, **kwargs):
+            boards = [
+                Mock(raw=board)
+                for board in [
+                    {"id": 1, "name": "Team Alpha"},
+                    {"id": 2, "name": "Team Beta"},
+                ]
+                if name is None or name.casefold() in board["name"].casefold()
+            ]
+            return ResultList(boards, _total=len(boards), _isLast=True)
+
+        def get_sprints(board_id, startAt=0, maxResults=50, **kwargs):
+            return ResultList(
+                [Mock(raw=sprint) for sprint in self.boards[board_id]], _isLast=True
+            )
+
+        self.mock_jira = Mock(
+            boards=Mock(side_effect=get_boards),
+            sprints=Mock(side_effect=get_sprints),
+            client_info=Mock(return_value=f"https://{uuid.uuid4()}.example.com"),
+            _options={"agile_rest_path": "/"},
+        )
+
+    def test_finds_sprint_by_board_name(self):
+        result = self.execute_function(
+            "get_sprint_by_name", "beta", "sprint 1", jira=self.mock_jira
+        )
+
+        assert result.raw == {"id": 201, "name": "Beta Sprint 1"}
+
+    def test_catalog_is_built_once(self):
+        self.execute_function(
+            "get_sprint_by_name", "Team Alpha", "Alpha", jira=self.mock_jira
+        )
+        result = self.execute_function(
+            "get_sprint_by_name", 2, "Sprint 2", jira=self.mock_jira
+        )
+        by_id = self.execute_function("get_sprint_by_id", 101, jira=self.mock_jira)
+
+        assert result.raw == {"id": 102, "name": "Sprint 2"}
+        assert by_id.raw == {"id": 101, "name": "Alpha Sprint 1"}
+        assert self.mock_jira.boards.call_count == 1
+        assert self.mock_jira.sprints.call_count == 2
+        assert not self.mock_jira.sprint.called
+
+    @patch("jira_select.functions.get_sprint_by_name.SPRINT_CATALOG_REFRESH_AFTER", -1)
+    def test_missing_sprint_refreshes_matching_boards(self):
+        self.execute_function(
+            "get_sprint_by_name", "beta", "sprint 1", jira=self.mock_jira
+        )
+        self.boards[2].append({"id": 202, "name": "Beta Sprint 2"})
+        self.mock_jira.boards.reset_mock()
+        self.mock_jira.sprints.reset_mock()
+
+        result = self.execute_function(
+            "get_sprint_by_name", "beta", "beta sprint 2", jira=self.mock_jira
+        )
+
+        assert result.raw == {"id": 202, "name": "Beta Sprint 2"}
+        assert self.mock_jira.boards.call_args.kwargs["name"] == "beta"
+        # Only Team Beta's sprints were gathered again
+        assert [call.args[0] for call in self.mock_jira.sprints.call_args_list] == [2]
+
+    def test_catalog_not_persisted_without_cache(self):
+        functions = get_installed_functions(self.mock_jira, Mock(enable_cache=False))
+
+        with patch.object(SprintCatalog, "get_cache") as get_cache:
+            result = functions["get_sprint_by_name"]("beta", "sprint 1")
+
+        assert result.raw == {"id": 201, "name": "Beta Sprint 1"}
+        assert not get_cache.called
+
 
 class TestFieldByName(JiraSelectFunctionTestCase):
     def test_basic(self):
@@ -245,6 +353,380 @@ class TestFlattenChangelog(JiraSelectFunctionTestCase):
         assert expected_results == actual_results
 
 
+class TestFlattenedChangelogMemo(JiraSelectFunctionTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.changelog = SimpleNamespace(
+            histories=[
+                SimpleNamespace(
+                    author="Someone",
+                    created="2020-01-03T00:00:00.000+0000",
+                    id="2",
+                    items=[
+                        SimpleNamespace(
+                            **{
+                                "field": "status",
+                                "fieldtype": "jira",
+                                "from": None,
+                                "fromString": "WIP",
+                                "to": None,
+                                "toString": "Done",
+                            }
+                        )
+                    ],
+                ),
+                SimpleNamespace(
+                    author="Someone",
+                    created="2020-01-02T00:00:00.000-0500",
+                    id="1",
+                    items=[
+                        SimpleNamespace(
+                            **{
+                                "field": "status",
+                                "fieldtype": "jira",
+                                "from": None,
+                                "fromString": "Open",
+                                "to": None,
+                                "toString": "WIP",
+                            }
+                        )
+                    ],
+                ),
+            ]
+        )
+
+    def test_flattened_once(self):
+        first = get_flattened_changelog(self.changelog)
+
+        assert get_flattened_changelog(self.changelog) is first
+        assert self.execute_function("flatten_changelog", self.changelog) == list(
+            first.entries
+        )
+
+    def test_reflattened_when_histories_change(self):
+        first = get_flattened_changelog(self.changelog)
+        self.changelog.histories = self.changelog.histories[:1]
+
+        assert len(get_flattened_changelog(self.changelog)) == 1
+        assert len(first) == 2
+
+    def test_chronological(self):
+        flattened = get_flattened_changelog(self.changelog)
+
+        assert [entry.id for entry in flattened.entries] == [2, 1]
+        assert [entry.id for entry in flattened.chronological] == [1, 2]
+        assert flattened.chronological[0].created == datetime.datetime(
+            2020, 1, 2, 5, tzinfo=pytz.UTC
+        )
+
+
+class TestGetIssueSnapshotOnDate(JiraSelectFunctionTestCase):
+    def setUp(self):
+        super().setUp()
+
+        def history(id, created, field, from_string, to_string):
+            return {
+                "id": str(id),
+                "author": {"displayName": "Someone"},
+                "created": created,
+                "items": [
+                    {
+                        "field": field,
+                        "fieldtype": "jira",
+                        "from": None,
+                        "fromString": from_string,
+                        "to": None,
+                        "toString": to_string,
+                    }
+                ],
+            }
+
+        self.issue = SingleResult(
+            Issue(
+                None,
+                None,
+                {
+                    "key": "ALPHA-1",
+                    "fields": {
+                        "created": "2020-01-01T00:00:00.000+0000",
+                        "status": "Done",
+                        "assignee": "Bob",
+                    },
+                    "changelog": {
+                        "histories": [
+                            history(
+                                1,
+                                "2020-01-03T00:00:00.000+0000",
+                                "status",
+                                "Open",
+                                "WIP",
+                            ),
+                            history(
+                                2,
+                                "2020-01-05T00:00:00.000+0000",
+                                "assignee",
+                                "Al",
+                                "Bob",
+                            ),
+                            history(
+                                3,
+                                "2020-01-07T00:00:00.000+0000",
+                                "status",
+                                "WIP",
+                                "Done",
+                            ),
+                        ]
+                    },
+                },
+            )
+        )
+
+    def get_snapshot(self, date):
+        return self.execute_function(
+            "get_issue_snapshot_on_date",
+            self.issue,
+            datetime.datetime(2020, 1, date, tzinfo=pytz.UTC),
+        )
+
+    def test_snapshots(self):
+        assert (self.get_snapshot(2).status, self.get_snapshot(2).assignee) == (
+            "Open",
+            "Al",
+        )
+        assert (self.get_snapshot(4).status, self.get_snapshot(4).assignee) == (
+            "WIP",
+            "Al",
+        )
+        assert (self.get_snapshot(6).status, self.get_snapshot(6).assignee) == (
+            "WIP",
+            "Bob",
+        )
+        assert (self.get_snapshot(8).status, self.get_snapshot(8).assignee) == (
+            "Done",
+            "Bob",
+        )
+
+    def test_validity(self):
+        snapshot = self.get_snapshot(4)
+
+        assert snapshot.validity_start == datetime.datetime(2020, 1, 3, tzinfo=pytz.UTC)
+        assert snapshot.validity_end == datetime.datetime(2020, 1, 5, tzinfo=pytz.UTC)
+
+    def test_timeline_built_once_per_row(self):
+        self.get_snapshot(4)
+        timeline = self.issue._memo["issue_timeline"]
+        self.get_snapshot(6)
+
+        assert self.issue._memo["issue_timeline"] is timeline
+
+    def get_interval(self, **filter_params):
+        return self.execute_function("interval_matching", self.issue, **filter_params)
+
+    def test_interval_matching(self):
+        assert self.get_interval(status="WIP") == portion.closed(
+            datetime.datetime(2020, 1, 3, tzinfo=pytz.UTC),
+            datetime.datetime(2020, 1, 7, tzinfo=pytz.UTC),
+        )
+
+    def test_interval_matching_in(self):
+        interval = self.get_interval(status__in=["Open", "WIP"])
+
+        assert interval.lower == datetime.datetime(2020, 1, 1, tzinfo=pytz.UTC)
+        assert interval.upper == datetime.datetime(2020, 1, 7, tzinfo=pytz.UTC)
+        assert interval.atomic
+
+    def test_interval_matching_several_fields(self):
+        assert self.get_interval(status="WIP", assignee__ne="Bob") == portion.closed(
+            datetime.datetime(2020, 1, 3, tzinfo=pytz.UTC),
+            datetime.datetime(2020, 1, 5, tzinfo=pytz.UTC),
+        )
+        assert self.get_interval(status="Open", assignee="Bob") == portion.empty()
+
+    def test_interval_matching_unknown_field(self):
+        assert self.get_interval(nonexistent="Value") == portion.empty()
+
+    def test_cumulative_flow(self):
+        flow = self.execute_function(
+            "cumulative_flow",
+            GroupedResult([self.issue]),
+            start=datetime.datetime(2019, 12, 31, tzinfo=pytz.UTC),
+            end=datetime.datetime(2020, 1, 8, tzinfo=pytz.UTC),
+            bucket=datetime.timedelta(days=2),
+        )
+
+        assert [bucket["date"].day for bucket in flow] == [31, 2, 4, 6, 8]
+        assert [bucket["counts"] for bucket in flow] == [
+            {},
+            {"Open": 1},
+            {"WIP": 1},
+            {"WIP": 1},
+            {"Done": 1},
+        ]
+
+    def test_cumulative_flow_requires_positive_bucket(self):
+        for bucket in [datetime.timedelta(0), datetime.timedelta(days=-1)]:
+            with self.assertRaises(QueryError):
+                self.execute_function(
+                    "cumulative_flow",
+                    GroupedResult([self.issue]),
+                    start=datetime.datetime(2019, 12, 31, tzinfo=pytz.UTC),
+                    end=datetime.datetime(2020, 1, 8, tzinfo=pytz.UTC),
+                    bucket=bucket,
+                )
+
+
+class TestBusinessCalendar(JiraSelectFunctionTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.calendar = self.execute_function(
+            "business_calendar", timezone_name="UTC", holidays=["2020-01-08"]
+        )
+
+    def moment(self, day, hour=0):
+        return datetime.datetime(2020, 1, day, hour, tzinfo=pytz.UTC)
+
+    def test_calendar_is_shared(self):
+        assert (
+            self.execute_function(
+                "business_calendar",
+                timezone_name="UTC",
+                holidays=[datetime.date(2020, 1, 8)],
+            )
+            is self.calendar
+        )
+
+    def test_business_time_within_day(self):
+        assert self.calendar.get_business_time(
+            self.moment(6, 8), self.moment(6, 10)
+        ) == datetime.timedelta(hours=1)
+
+    def test_business_time_overnight(self):
+        assert self.calendar.get_business_time(
+            self.moment(6, 16), self.moment(7, 10)
+        ) == datetime.timedelta(hours=2)
+
+    def test_business_time_across_weeks(self):
+        # Two full weeks of weekdays, less one holiday
+        assert self.calendar.get_business_time(
+            self.moment(6), self.moment(20)
+        ) == datetime.timedelta(hours=8 * 9)
+
+    def test_interval_size_matches_intervals(self):
+        interval = portion.closed(self.moment(3, 12), self.moment(14, 15))
+        business_hours = self.execute_function(
+            "interval_business_hours",
+            datetime.date(2020, 1, 1),
+            datetime.date(2020, 2, 1),
+            calendar=self.calendar,
+        )
+
+        assert self.execute_function(
+            "interval_size", interval, calendar=self.calendar
+        ) == self.execute_function("interval_size", interval & business_hours)
+
+
+class TestStateDurations(JiraSelectFunctionTestCase):
+    def setUp(self):
+        super().setUp()
+
+        def history(created, from_string, to_string):
+            return SimpleNamespace(
+                author="Someone",
+                created=created,
+                id="1",
+                items=[
+                    SimpleNamespace(
+                        **{
+                            "field": "status",
+                            "fieldtype": "jira",
+                            "from": None,
+                            "fromString": from_string,
+                            "to": None,
+                            "toString": to_string,
+                        }
+                    )
+                ],
+            )
+
+        self.history = history
+        self.changelog = SimpleNamespace(
+            histories=[
+                history("2020-01-09T11:00:00.000+0000", "Review", "WIP"),
+                history("2020-01-03T10:30:00.000+0000", "Open", "WIP"),
+                history("2020-01-08T15:00:00.000+0000", "WIP", "Review"),
+                history("2020-01-13T12:00:00.000+0000", "WIP", "Done"),
+            ]
+        )
+
+    def test_durations(self):
+        durations = self.execute_function("state_durations", self.changelog)
+
+        assert durations["WIP"] == datetime.timedelta(days=9, hours=5, minutes=30)
+        assert durations["Review"] == datetime.timedelta(hours=20)
+        assert "Open" not in durations
+
+    def test_business_durations(self):
+        calendar = self.execute_function("business_calendar", timezone_name="UTC")
+        durations = self.execute_function(
+            "state_durations", self.changelog, calendar=calendar
+        )
+
+        assert durations["WIP"] == datetime.timedelta(hours=28.5 + 17)
+        assert durations["Review"] == datetime.timedelta(hours=4)
+
+    def test_workdays_in_state(self):
+        with self.assertWarns(DeprecationWarning):
+            workdays = self.execute_function(
+                "workdays_in_state",
+                self.changelog,
+                "WIP",
+                timezone_name="UTC",
+                min_date=datetime.date(2020, 1, 6),
+                max_date=datetime.date(2020, 1, 10),
+            )
+
+        assert workdays == 3.5
+
+    def test_workdays_in_state_without_end_hour(self):
+        # Each day's hours run until 09:00 the following day; those
+        # hours must be counted once, and only once.
+        changelog = SimpleNamespace(
+            histories=[
+                self.history("2020-01-06T06:00:00.000+0000", "Open", "WIP"),
+                self.history("2020-01-08T03:00:00.000+0000", "WIP", "Done"),
+            ]
+        )
+
+        with self.assertWarns(DeprecationWarning):
+            seconds = self.execute_function(
+                "workdays_in_state",
+                changelog,
+                "WIP",
+                end_hour=None,
+                timezone_name="UTC",
+                work_days=range(7),
+            )
+
+        assert seconds == datetime.timedelta(hours=45).total_seconds()
+
+    def test_workdays_in_state_named_timezone(self):
+        # Business hours on 2020-01-08 run from 09:00 to 17:00 CST, or
+        # 15:00 to 23:00 UTC -- not from 09:00 in Chicago's LMT offset.
+        with self.assertWarns(DeprecationWarning):
+            workdays = self.execute_function(
+                "workdays_in_state",
+                self.changelog,
+                "Review",
+                timezone_name="America/Chicago",
+                min_date=datetime.date(2020, 1, 8),
+                max_date=datetime.date(2020, 1, 9),
+            )
+
+        assert workdays == 1
+
+
 class TestSimpleFilter(JiraSelectFunctionTestCase):
     def test_basic(self):
         rows = [
@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import datetime
 import uuid
 from unittest.mock import Mock
+from unittest.mock import patch
 
 import pytest
 from dotmap import DotMap
 from jira import Issue
+from jira.client import ResultList
+from jira.exceptions import JIRAError
 from jira.resources import Resource
+from jira.resources import Sprint
+from rich.progress import TaskID
 
 from jira_select.exceptions import ExpressionParameterMissing
+from jira_select.metrics import MetricsRegistry
+from jira_select.plugin import get_installed_sources
+from jira_select.profiling import Profiler
+from jira_select.profiling import ProfilerGroup
+from jira_select.profiling import Tracer
+from jira_select.query import CounterChannel
 from jira_select.query import Executor
+from jira_select.query import NullProgressbar
+from jira_select.query import ProgressTracker
+from jira_select.query import SingleResult
 from jira_select.types import QueryDefinition
 
 from .base import JiraSelectTestCase
@@ -96,7 +111,9 @@ class TestQuery(JiraSelectTestCase):
         issues.total = len(self.JIRA_ISSUES)
 
         self.mock_jira = Mock(
-            search_issues=Mock(return_value=issues), fields=Mock(return_value=[])
+            search_issues=Mock(return_value=issues),
+            fields=Mock(return_value=[]),
+            _is_cloud=False,
         )
 
     def test_simple(self):
@@ -477,3 +494,1152 @@ class TestQuery(JiraSelectTestCase):
         args, _ = self.mock_jira.search_issues.call_args
 
         assert arbitrary_value in args[0]
+
+
+class TestSubqueryBatching(JiraSelectTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.parents = [
+            {"key": "ALPHA-1", "fields": {"summary": "One"}},
+            {"key": "ALPHA-2", "fields": {"summary": "Two"}},
+            {"key": "ALPHA-3", "fields": {"summary": "Three"}},
+        ]
+        self.children = [
+            {"key": "BETA-1", "fields": {"parent": {"key": "ALPHA-1"}}},
+            {"key": "BETA-2", "fields": {"parent": {"key": "ALPHA-1"}}},
+            {"key": "BETA-3", "fields": {"parent": {"key": "ALPHA-2"}}},
+        ]
+
+        def search_issues(jql, **kwargs):
+            raw_issues = self.parents
+            if "parent" in jql:
+                raw_issues = [
+                    child
+                    for child in self.children
+                    if child["fields"]["parent"]["key"] in jql
+                ]
+            issues = JiraList([Issue(None, None, issue) for issue in raw_issues])
+            issues.total = len(issues)
+            return issues
+
+        self.mock_jira = Mock(
+            search_issues=Mock(side_effect=search_issues),
+            fields=Mock(return_value=[]),
+        )
+        self.query = QueryDefinition.parse_obj(
+            {
+                "select": {"key": None, "children": 'subquery("children", key=key)'},
+                "from": "issues",
+                "subqueries": {
+                    "children": {
+                        "select": ["key"],
+                        "from": "issues",
+                        "where": ['parent = "{params.key}"'],
+                    }
+                },
+            }
+        )
+
+    def test_fuses_subquery_searches(self):
+        actual_results = list(Executor(self.mock_jira, self.query))
+        expected_results = [
+            {"key": "ALPHA-1", "children": ["BETA-1", "BETA-2"]},
+            {"key": "ALPHA-2", "children": ["BETA-3"]},
+            {"key": "ALPHA-3", "children": []},
+        ]
+
+        assert expected_results == actual_results
+        assert self.mock_jira.search_issues.call_count == 2
+
+        args, _ = self.mock_jira.search_issues.call_args
+        assert 'parent in ("ALPHA-1", "ALPHA-2", "ALPHA-3")' in args[0]
+
+    def test_subquery_errors_reported_once(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {
+                    "children": 'subquery("children", key=key)',
+                    "missing": "parent.missing",
+                },
+                "from": "issues",
+                "subqueries": {
+                    "children": {
+                        "select": ["parent.missing"],
+                        "from": "issues",
+                        "where": ['parent = "{params.key}"'],
+                    }
+                },
+            }
+        )
+        executor = Executor(self.mock_jira, query)
+
+        with self.assertLogs("jira_select.utils", "WARNING") as logs:
+            list(executor)
+
+        assert len(logs.output) == 1
+        # Three parents and three children
+        assert executor.errors.get_counts() == {"parent.missing": 6}
+
+    def test_memoizes_unbatchable_subqueries(self):
+        self.query.subqueries["children"].where = [
+            'parent = "{params.key}" OR parent = "NONE-1"'
+        ]
+        self.parents = [self.parents[0], self.parents[0]]
+
+        actual_results = list(Executor(self.mock_jira, self.query))
+        expected_results = [
+            {"key": "ALPHA-1", "children": ["BETA-1", "BETA-2"]},
+            {"key": "ALPHA-1", "children": ["BETA-1", "BETA-2"]},
+        ]
+
+        assert expected_results == actual_results
+        assert self.mock_jira.search_issues.call_count == 2
+
+    def test_lookup_runs_subquery_once(self):
+        self.mock_jira.search_issues.side_effect = None
+        children = JiraList([Issue(None, None, issue) for issue in self.children])
+        children.total = len(children)
+        self.mock_jira.search_issues.return_value = children
+
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {
+                    "key": None,
+                    "sibling": 'lookup("siblings", "parent.key", parent.key)',
+                },
+                "from": "issues",
+                "subqueries": {
+                    "siblings": {
+                        "select": ["key"],
+                        "from": "issues",
+                    }
+                },
+            }
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+        expected_results = [
+            {"key": "BETA-1", "sibling": "BETA-1"},
+            {"key": "BETA-2", "sibling": "BETA-1"},
+            {"key": "BETA-3", "sibling": "BETA-3"},
+        ]
+
+        assert expected_results == actual_results
+        assert self.mock_jira.search_issues.call_count == 2
+
+    def test_plans_independent_subqueries(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {
+                    "key": None,
+                    "children": 'subquery("children", key=key)',
+                    "first": 'subquery("children", key=first_parent)',
+                    "sibling": 'lookup("children", "key", key)',
+                },
+                "static": {"first_parent": '"ALPHA-1"'},
+                "from": "issues",
+                "subqueries": self.query.subqueries,
+            }
+        )
+        executor = Executor(self.mock_jira, query)
+
+        calls = executor.plan.get_independent_subqueries({"first_parent": "ALPHA-1"})
+
+        assert [(call.name, call.args, call.kwargs) for call in calls] == [
+            ("subquery", ("children",), {"key": "ALPHA-1"}),
+            ("lookup", ("children", "key"), {}),
+        ]
+
+
+class TestGetIssueBatching(JiraSelectTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.parents = {
+            "BETA-1": {"key": "BETA-1", "fields": {"summary": "First"}},
+            "BETA-2": {"key": "BETA-2", "fields": {"summary": "Second"}},
+        }
+        self.children = [
+            {"key": "ALPHA-1", "fields": {"parent": {"key": "BETA-1"}}},
+            {"key": "ALPHA-2", "fields": {"parent": {"key": "BETA-2"}}},
+            {"key": "ALPHA-3", "fields": {"parent": {"key": "BETA-1"}}},
+        ]
+
+        def search_issues(jql, **kwargs):
+            raw_issues = self.children
+            if jql.startswith("key in"):
+                raw_issues = [
+                    issue for key, issue in self.parents.items() if f'"{key}"' in jql
+                ]
+            issues = JiraList([Issue(None, None, issue) for issue in raw_issues])
+            issues.total = len(issues)
+            return issues
+
+        self.mock_jira = Mock(
+            search_issues=Mock(side_effect=search_issues),
+            fields=Mock(return_value=[]),
+        )
+
+    def test_fetches_distinct_issues_in_bulk(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {
+                    "key": None,
+                    "parent": "get_issue(parent.key).fields.summary",
+                },
+                "from": "issues",
+            }
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+        expected_results = [
+            {"key": "ALPHA-1", "parent": "First"},
+            {"key": "ALPHA-2", "parent": "Second"},
+            {"key": "ALPHA-3", "parent": "First"},
+        ]
+
+        assert expected_results == actual_results
+        assert self.mock_jira.search_issues.call_count == 2
+        assert not self.mock_jira.issue.called
+
+        args, _ = self.mock_jira.search_issues.call_args
+        assert args[0] == 'key in ("BETA-1", "BETA-2")'
+
+    def test_unknown_key_does_not_reject_batch(self):
+        self.children.append(
+            {"key": "ALPHA-4", "fields": {"parent": {"key": "GONE-1"}}}
+        )
+        search_issues = self.mock_jira.search_issues.side_effect
+
+        def rejecting_search_issues(jql, **kwargs):
+            if "GONE-1" in jql:
+                raise JIRAError(status_code=400, text="Issue does not exist")
+            return search_issues(jql, **kwargs)
+
+        self.mock_jira.search_issues.side_effect = rejecting_search_issues
+        self.mock_jira.issue = Mock(return_value=None)
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {
+                    "key": None,
+                    "parent": "get_issue(parent.key).fields.summary",
+                },
+                "from": "issues",
+            }
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+
+        assert [row["parent"] for row in actual_results] == [
+            "First",
+            "Second",
+            "First",
+            None,
+        ]
+        # Only the unknown key was fetched individually
+        self.mock_jira.issue.assert_called_once_with("GONE-1")
+
+    def test_nested_calls_served_from_batches(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {
+                    "key": None,
+                    "parent": "get_issue(get_issue(parent.key).key).fields.summary",
+                },
+                "from": "issues",
+            }
+        )
+        profiler = Profiler()
+        self.mock_jira._session = Mock(hooks={"response": []})
+
+        actual_results = list(Executor(self.mock_jira, query, profiler=profiler))
+
+        assert [row["parent"] for row in actual_results] == [
+            "First",
+            "Second",
+            "First",
+        ]
+        assert self.mock_jira.search_issues.call_count == 2
+        assert not self.mock_jira.issue.called
+        # The inner call made while gathering each row's batched calls
+        # is profiled along with both calls made evaluating the row
+        assert profiler.functions["get_issue"].calls == 9
+
+    def test_conditional_calls_not_batched(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {
+                    "key": None,
+                    "parent": (
+                        "get_issue(parent.key).fields.summary "
+                        "if key == 'ALPHA-2' else None"
+                    ),
+                },
+                "from": "issues",
+            }
+        )
+        self.mock_jira.issue = Mock(
+            return_value=Issue(None, None, self.parents["BETA-2"])
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+        expected_results = [
+            {"key": "ALPHA-1", "parent": None},
+            {"key": "ALPHA-2", "parent": "Second"},
+            {"key": "ALPHA-3", "parent": None},
+        ]
+
+        assert expected_results == actual_results
+        # Only the issue actually needed was requested
+        assert self.mock_jira.search_issues.call_count == 1
+        self.mock_jira.issue.assert_called_once()
+
+
+class TestSprintsSource(JiraSelectTestCase):
+    def setUp(self):
+        super().setUp()
+
+        board_sprints = {
+            1: [{"id": 101, "name": "One"}, {"id": 102, "name": "Shared"}],
+            2: [{"id": 102, "name": "Shared"}, {"id": 201, "name": "Two"}],
+            3: [],
+        }
+
+        def get_boards(startAt=0, maxResults=50, **kwargs):
+            boards = [Mock(id=id, raw={"id": id}) for id in board_sprints]
+            return ResultList(
+                boards[startAt : startAt + 2],
+                _startAt=startAt,
+                _total=len(boards),
+                _isLast=startAt + 2 >= len(boards),
+            )
+
+        def get_sprints(board_id, startAt=0, maxResults=50, **kwargs):
+            return ResultList(
+                [Sprint({}, None, raw) for raw in board_sprints[board_id]],
+                _isLast=True,
+            )
+
+        self.mock_jira = Mock(
+            boards=Mock(side_effect=get_boards),
+            sprints=Mock(side_effect=get_sprints),
+            _options={"agile_rest_path": "/"},
+        )
+
+    def test_deduplicates_shared_sprints(self):
+        query = QueryDefinition.parse_obj({"select": ["id", "name"], "from": "sprints"})
+
+        actual_results = list(Executor(self.mock_jira, query))
+        expected_results = [
+            {"id": 101, "name": "One"},
+            {"id": 102, "name": "Shared"},
+            {"id": 201, "name": "Two"},
+        ]
+
+        assert expected_results == actual_results
+        assert self.mock_jira.boards.call_count == 2
+        assert self.mock_jira.sprints.call_count == 3
+
+    def test_limit(self):
+        query = QueryDefinition.parse_obj(
+            {"select": ["id"], "from": "sprints", "limit": 2}
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+
+        assert [{"id": 101}, {"id": 102}] == actual_results
+
+
+class TestTruncatedChangelog(JiraSelectTestCase):
+    def get_history(self, id):
+        return {
+            "id": str(id),
+            "created": "2020-01-01T00:00:00.000+0000",
+            "items": [{"field": "status", "fromString": "A", "toString": "B"}],
+        }
+
+    def test_fetches_remaining_histories(self):
+        histories = [self.get_history(id) for id in range(1, 251)]
+        issues = JiraList(
+            [
+                Issue(
+                    None,
+                    None,
+                    {
+                        "key": "ALPHA-1",
+                        "fields": {},
+                        "changelog": {
+                            "startAt": 0,
+                            "maxResults": 100,
+                            "total": 250,
+                            "histories": histories[:100],
+                        },
+                    },
+                )
+            ]
+        )
+        issues.total = 1
+
+        def get_json(path, params):
+            start_at = params["startAt"]
+            values = histories[start_at : start_at + params["maxResults"]]
+            return {
+                "startAt": start_at,
+                "total": len(histories),
+                "isLast": start_at + len(values) >= len(histories),
+                "values": values,
+            }
+
+        mock_jira = Mock(
+            search_issues=Mock(return_value=issues),
+            fields=Mock(return_value=[]),
+            _get_json=Mock(side_effect=get_json),
+        )
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {
+                    "count": "len(changelog.histories)",
+                    "last": "changelog.histories[-1].id",
+                },
+                "from": "issues",
+                "expand": ["changelog"],
+            }
+        )
+
+        actual_results = list(Executor(mock_jira, query))
+
+        assert [{"count": 250, "last": "250"}] == actual_results
+        assert mock_jira._get_json.call_count == 3
+
+
+class TestTwoPhaseFetch(JiraSelectTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.issues = [
+            {
+                "key": f"ALPHA-{index}",
+                "fields": {"customfield_1": index},
+                "changelog": {
+                    "startAt": 0,
+                    "maxResults": 0,
+                    "total": 0,
+                    "histories": [],
+                },
+            }
+            for index in range(1, 6)
+        ]
+
+        def search_issues(jql, **kwargs):
+            raw_issues = self.issues
+            if jql.startswith("key in"):
+                raw_issues = [
+                    issue for issue in self.issues if f'"{issue["key"]}"' in jql
+                ]
+            issues = JiraList([Issue(None, None, issue) for issue in raw_issues])
+            issues.total = len(issues)
+            return issues
+
+        self.mock_jira = Mock(
+            search_issues=Mock(side_effect=search_issues),
+            fields=Mock(return_value=[]),
+        )
+
+    def test_expands_only_filtered_issues(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "filter": ["customfield_1 % 2 == 0"],
+                "expand": ["changelog"],
+            }
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+
+        assert [{"key": "ALPHA-2"}, {"key": "ALPHA-4"}] == actual_results
+
+        first_call, second_call = self.mock_jira.search_issues.call_args_list
+        assert first_call.kwargs["fields"] == "customfield_1"
+        assert "expand" not in first_call.kwargs
+        assert second_call.args[0] == 'key in ("ALPHA-2", "ALPHA-4")'
+        assert second_call.kwargs["expand"] == "changelog"
+
+    def test_expanded_searches_repeated_for_missing_issues(self):
+        search_issues = self.mock_jira.search_issues.side_effect
+
+        def capped_search_issues(jql, **kwargs):
+            issues = search_issues(jql, **kwargs)
+            if jql.startswith("key in"):
+                # Return at most one issue per search
+                issues = JiraList(issues[:1])
+                issues.total = len(issues)
+            return issues
+
+        self.mock_jira.search_issues.side_effect = capped_search_issues
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "filter": ["customfield_1 % 2 == 1"],
+                "expand": ["changelog"],
+            }
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+
+        assert [{"key": "ALPHA-1"}, {"key": "ALPHA-3"}, {"key": "ALPHA-5"}] == (
+            actual_results
+        )
+        assert [
+            call.args[0] for call in self.mock_jira.search_issues.call_args_list[1:]
+        ] == [
+            'key in ("ALPHA-1", "ALPHA-3", "ALPHA-5")',
+            'key in ("ALPHA-3", "ALPHA-5")',
+            'key in ("ALPHA-5")',
+        ]
+
+    def test_missing_issues_reported(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "filter": ["customfield_1 % 2 == 0"],
+                "expand": ["changelog"],
+            }
+        )
+        executor = Executor(self.mock_jira, query)
+        search_issues = self.mock_jira.search_issues.side_effect
+        # ALPHA-4 is deleted after being found
+        self.mock_jira.search_issues.side_effect = [
+            search_issues("project = ALPHA"),
+            search_issues('key in ("ALPHA-2")'),
+            search_issues('key in ("ALPHA-2")'),
+        ]
+
+        with self.assertLogs("jira_select.sources.issues", "WARNING") as logs:
+            actual_results = list(executor)
+
+        assert [{"key": "ALPHA-2"}] == actual_results
+        assert "ALPHA-4" in logs.output[0]
+
+    @patch("jira_select.sources.issues.ISSUE_PAGE_SIZE", 1)
+    def test_cap_stops_fetching_pages(self):
+        self.issues = [
+            {"key": f"ALPHA-{index}", "fields": {"customfield_1": index}}
+            for index in range(1, 21)
+        ]
+
+        def search_issues(jql, startAt=0, maxResults=0, **kwargs):
+            raw_issues = self.issues
+            if jql.startswith("key in"):
+                raw_issues = [
+                    issue for issue in self.issues if f'"{issue["key"]}"' in jql
+                ]
+            issues = JiraList(
+                [
+                    Issue(None, None, issue)
+                    for issue in raw_issues[
+                        startAt : (startAt + maxResults if maxResults else None)
+                    ]
+                ]
+            )
+            issues.total = len(raw_issues)
+            return issues
+
+        self.mock_jira._is_cloud = False
+        self.mock_jira.search_issues.side_effect = search_issues
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "filter": ["customfield_1 % 2 == 0"],
+                "expand": ["changelog"],
+                "cap": 2,
+            }
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+
+        assert [{"key": "ALPHA-2"}, {"key": "ALPHA-4"}] == actual_results
+        *pages, expand = self.mock_jira.search_issues.call_args_list
+        # The four rows needed, and at most the few pages prefetched
+        # alongside them, were requested
+        assert len(pages) < 10
+        assert expand.args[0] == 'key in ("ALPHA-2", "ALPHA-4")'
+
+    def test_filter_using_expanded_data(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "filter": ["len(changelog.histories) == 0 and customfield_1 > 3"],
+                "expand": ["changelog"],
+            }
+        )
+
+        actual_results = list(Executor(self.mock_jira, query))
+
+        assert [{"key": "ALPHA-4"}, {"key": "ALPHA-5"}] == actual_results
+        assert self.mock_jira.search_issues.call_count == 1
+
+
+class PushdownTestCase(JiraSelectTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.issues = [
+            {
+                "key": f"ALPHA-{index}",
+                "fields": {
+                    "status": {"name": status},
+                    "customfield_10010": index,
+                    "created": f"2024-01-0{index}T12:00:00.000+0000",
+                },
+            }
+            for index, status in enumerate(["Done", "done", "Open"], start=1)
+        ]
+
+        def search_issues(jql, **kwargs):
+            issues = JiraList([Issue(None, None, issue) for issue in self.issues])
+            issues.total = len(issues)
+            return issues
+
+        self.mock_jira = Mock(
+            _is_cloud=False,
+            search_issues=Mock(side_effect=search_issues),
+            statuses=Mock(
+                return_value=[DotMap(name=name) for name in ["Done", "Open"]]
+            ),
+            fields=Mock(
+                return_value=[
+                    {
+                        "id": "status",
+                        "searchable": True,
+                        "name": "Status",
+                        "schema": {"type": "status"},
+                        "clauseNames": ["status"],
+                    },
+                    {
+                        "id": "customfield_10010",
+                        "searchable": True,
+                        "name": "Story Points",
+                        "schema": {"type": "number"},
+                        "clauseNames": ["cf[10010]", "Story Points"],
+                    },
+                    {
+                        "id": "created",
+                        "searchable": True,
+                        "name": "Created",
+                        "schema": {"type": "datetime"},
+                        "clauseNames": ["created", "createdDate"],
+                    },
+                ]
+            ),
+        )
+
+    def execute(self, filter, **kwargs):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "where": ["project = ALPHA"],
+                "filter": filter,
+                **kwargs,
+            }
+        )
+        executor = Executor(self.mock_jira, query)
+
+        return [row["key"] for row in executor], executor
+
+    def get_jql(self):
+        return self.mock_jira.search_issues.call_args.args[0]
+
+
+class TestFilterPushdown(PushdownTestCase):
+    def test_exact_filter_not_evaluated_locally(self):
+        keys, executor = self.execute(["{Story Points} in [1, 3]"])
+
+        assert self.get_jql() == "(project = ALPHA) AND (cf[10010] in (1, 3))"
+        # Jira would have already excluded the other issue
+        assert keys == ["ALPHA-1", "ALPHA-2", "ALPHA-3"]
+        assert executor.plan.get_filter_pushdown().local == []
+
+    def test_inexact_filter_checked_locally(self):
+        keys, executor = self.execute(['status.name == "Done"'])
+
+        assert self.get_jql() == '(project = ALPHA) AND (status = "Done")'
+        assert keys == ["ALPHA-1"]
+        assert executor.plan.explain() == [
+            "filter 'status.name == \"Done\"' added to where as "
+            "'status = \"Done\"' (still checked locally)"
+        ]
+
+    def test_unknown_names_not_pushed_down(self):
+        keys, executor = self.execute(['status.name == "Dnoe"'])
+
+        # Jira would have rejected the search rather than finding nothing
+        assert self.get_jql() == "(project = ALPHA)"
+        assert keys == []
+
+        keys, _ = self.execute(['status.name in ["Dnoe", "done"]'])
+
+        assert self.get_jql() == '(project = ALPHA) AND (status in ("done"))'
+        assert keys == ["ALPHA-2"]
+
+    def test_unsearchable_fields_not_pushed_down(self):
+        self.mock_jira.fields.return_value += [
+            {
+                "id": "aggregatetimespent",
+                "name": "Σ Time Spent",
+                "schema": {"type": "number"},
+                "clauseNames": [],
+                "searchable": False,
+            },
+            {
+                "id": "timespent",
+                "name": "Time Spent",
+                "schema": {"type": "number"},
+                "clauseNames": ["timespent"],
+                "searchable": True,
+            },
+        ]
+
+        # Jira can't search the first, and compares the second as a
+        # duration rather than as a number of seconds
+        keys, executor = self.execute(["aggregatetimespent > 60 or timespent > 60"])
+
+        assert self.get_jql() == "(project = ALPHA)"
+        assert executor.plan.get_filter_pushdown().pushed == []
+
+    def test_known_names_shared_with_subqueries(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": {"key": None, "done": 'subquery("done")'},
+                "from": "issues",
+                "filter": ['status.name == "Open"'],
+                "subqueries": {
+                    "done": {
+                        "select": ["key"],
+                        "from": "issues",
+                        "filter": ['status.name == "Done"'],
+                    }
+                },
+            }
+        )
+
+        list(Executor(self.mock_jira, query))
+
+        assert self.mock_jira.statuses.call_count == 1
+
+    def test_date_filter_selects_superset(self):
+        keys, _ = self.execute(
+            ['parse_datetime(created) > parse_datetime("2024-01-02T18:00:00Z")']
+        )
+
+        assert self.get_jql() == '(project = ALPHA) AND (created >= "2024-01-01")'
+        assert keys == ["ALPHA-3"]
+
+    def test_partially_translated_filter(self):
+        keys, _ = self.execute(
+            ['status.name in ["Done", "Open"] and len(key) > 10 or False']
+        )
+
+        assert self.get_jql() == "(project = ALPHA)"
+        assert keys == []
+
+    def test_not_pushed_down_with_limit(self):
+        keys, _ = self.execute(["customfield_10010 >= 2"], limit=2)
+
+        assert self.get_jql() == "(project = ALPHA)"
+        assert keys == ["ALPHA-2", "ALPHA-3"]
+
+
+class TestSortPushdown(PushdownTestCase):
+    def test_sort_pushed_down(self):
+        keys, executor = self.execute([], sort_by=["created desc"], order_by=["key"])
+
+        assert self.get_jql() == "(project = ALPHA) ORDER BY created DESC, key"
+        # Jira is trusted to have returned the issues in order
+        assert keys == ["ALPHA-1", "ALPHA-2", "ALPHA-3"]
+        assert executor.plan.explain() == ["sort_by replaced by ORDER BY created DESC"]
+
+    def test_sort_not_pushed_down(self):
+        keys, _ = self.execute(
+            [], sort_by=["parse_datetime(created) desc", "customfield_10010"]
+        )
+
+        assert self.get_jql() == "(project = ALPHA)"
+        assert keys == ["ALPHA-3", "ALPHA-2", "ALPHA-1"]
+
+
+class TestCapPushdown(PushdownTestCase):
+    def setUp(self):
+        super().setUp()
+
+        def search_issues(jql, startAt=0, maxResults=0, **kwargs):
+            issues = JiraList(
+                [
+                    Issue(None, None, issue)
+                    for issue in self.issues[
+                        startAt : (startAt + maxResults if maxResults else None)
+                    ]
+                ]
+            )
+            issues.total = len(self.issues)
+            return issues
+
+        self.mock_jira.search_issues.side_effect = search_issues
+
+    def test_cap_limits_fetch(self):
+        keys, executor = self.execute([], cap=2)
+
+        assert keys == ["ALPHA-1", "ALPHA-2"]
+        assert self.mock_jira.search_issues.call_args.kwargs["maxResults"] == 2
+        assert executor.plan.explain() == [
+            "issues fetched page by page until cap is reached (at most 2)"
+        ]
+
+    @patch("jira_select.sources.issues.ISSUE_PAGE_SIZE", 1)
+    def test_cap_stops_fetching_pages(self):
+        self.issues = [
+            {"key": f"ALPHA-{index}", "fields": {"customfield_10010": index}}
+            for index in range(1, 21)
+        ]
+
+        keys, executor = self.execute(["int(customfield_10010) % 2 == 0"], cap=1)
+
+        assert keys == ["ALPHA-2"]
+        assert executor.plan.get_fetch_limit() is None
+        # Only the pages prefetched alongside the capped row were requested
+        assert self.mock_jira.search_issues.call_count < 10
+
+    @patch("jira_select.sources.issues.ISSUE_PAGE_SIZE", 2)
+    def test_cap_paged_by_token_on_cloud(self):
+        self.issues = [
+            {"key": f"ALPHA-{index}", "fields": {"customfield_10010": index}}
+            for index in range(1, 8)
+        ]
+
+        def enhanced_search_issues(jql, nextPageToken=None, maxResults=50, **kwargs):
+            start_at = int(nextPageToken or 0)
+            issues = JiraList(
+                [
+                    Issue(None, None, issue)
+                    for issue in self.issues[start_at : start_at + maxResults]
+                ]
+            )
+            # Cloud reports only the size of the page it returned
+            issues.total = len(issues)
+            if start_at + maxResults < len(self.issues):
+                issues.nextPageToken = str(start_at + maxResults)
+            return issues
+
+        self.mock_jira._is_cloud = True
+        self.mock_jira.enhanced_search_issues = Mock(side_effect=enhanced_search_issues)
+        self.mock_jira.approximate_issue_count = Mock(return_value=len(self.issues))
+
+        keys, executor = self.execute([], cap=5)
+
+        assert keys == ["ALPHA-1", "ALPHA-2", "ALPHA-3", "ALPHA-4", "ALPHA-5"]
+        assert [
+            call.kwargs["maxResults"]
+            for call in self.mock_jira.enhanced_search_issues.call_args_list
+        ] == [2, 2, 1]
+        self.mock_jira.approximate_issue_count.assert_called_once_with(
+            "(project = ALPHA)"
+        )
+        assert not self.mock_jira.search_issues.called
+
+    def test_cap_limits_batch_window(self):
+        query = QueryDefinition.parse_obj(
+            {"select": ["get_issue(key).key"], "from": "issues", "cap": 2}
+        )
+        executor = Executor(self.mock_jira, query)
+        consumed = []
+
+        def rows():
+            for index in range(1, 1000):
+                consumed.append(index)
+                yield SingleResult(Issue(None, None, {"key": f"ALPHA-{index}"}))
+
+        next(executor._iter_batched(rows(), ["get_issue(key).key"]))
+
+        assert consumed == [1, 2]
+
+    def test_cap_not_pushed_down_with_local_sort(self):
+        keys, executor = self.execute([], sort_by=["customfield_10010 desc"], cap=1)
+
+        assert keys == ["ALPHA-3"]
+        assert self.mock_jira.search_issues.call_args.kwargs["maxResults"] == 0
+        assert not executor.plan.can_stop_early()
+
+
+class TestExplain(PushdownTestCase):
+    def get_executor(self, **kwargs):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "where": ["project = ALPHA"],
+                **kwargs,
+            }
+        )
+
+        return Executor(self.mock_jira, query, enable_cache=False)
+
+    def test_phases(self):
+        executor = self.get_executor(
+            filter=["int(customfield_10010) % 2 == 0"],
+            sort_by=["customfield_10010"],
+        )
+
+        assert executor.plan.get_phases() == ["filter", "sort_by"]
+        assert executor.plan.get_fetched_fields() == "*all"
+
+    def test_pushed_down_phases_omitted(self):
+        executor = self.get_executor(filter=["customfield_10010 >= 2"])
+
+        assert executor.plan.get_phases() == []
+
+    def test_estimated_requests(self):
+        executor = self.get_executor(filter=["customfield_10010 >= 2"], cap=150)
+
+        assert executor.plan.get_estimated_requests(1000) == {"search": 2}
+
+    def test_estimated_count(self):
+        executor = self.get_executor()
+        source = get_installed_sources()["issues"](executor, 0, CounterChannel())
+
+        assert source.get_estimated_count() == 3
+        self.mock_jira.search_issues.assert_called_once_with(
+            "(project = ALPHA)", maxResults=1, fields="key"
+        )
+
+    def test_estimated_count_on_cloud(self):
+        self.mock_jira._is_cloud = True
+        self.mock_jira.approximate_issue_count = Mock(return_value=1234)
+        executor = self.get_executor()
+        source = get_installed_sources()["issues"](executor, 0, CounterChannel())
+
+        assert source.get_estimated_count() == 1234
+        self.mock_jira.approximate_issue_count.assert_called_once_with(
+            "(project = ALPHA)"
+        )
+        assert not self.mock_jira.search_issues.called
+
+    def test_warnings(self):
+        executor = self.get_executor(
+            select=["get_issue(key).key", "get_issue('ALPHA-1').key"],
+            sort_by=["customfield_10010"],
+            filter=["int(issue.fields.customfield_10010) % 2 == 0"],
+            expand=["changelog"],
+        )
+
+        warnings = executor.plan.get_warnings()
+
+        assert len(warnings) == 3
+        assert warnings[0].startswith("get_issue(key) may make a request")
+        assert warnings[1].startswith("sort_by is evaluated locally")
+        assert warnings[2].startswith("each issue's changelog is fetched")
+
+    def test_no_warnings(self):
+        executor = self.get_executor(sort_by=["created"])
+
+        assert executor.plan.get_warnings() == []
+
+
+class TestProfiler(PushdownTestCase):
+    def test_profile(self):
+        self.mock_jira._session = Mock(hooks={"response": []})
+        profiler = Profiler()
+
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key", "parse_datetime(created)"],
+                "from": "issues",
+                "filter": ["int(customfield_10010) % 2 == 1"],
+            }
+        )
+        executor = Executor(self.mock_jira, query, profiler=profiler)
+        rows = list(executor)
+
+        report = profiler.as_dict()
+
+        assert len(rows) == 2
+        assert list(report["phases"].keys()) == ["source", "filter", "select"]
+        assert report["phases"]["source"]["rows"] == 3
+        assert report["phases"]["filter"]["rows"] == 2
+        assert report["expressions"]["int(customfield_10010) % 2 == 1"]["calls"] == 3
+        assert report["expressions"]["parse_datetime(created)"]["calls"] == 2
+        assert report["functions"]["parse_datetime"]["calls"] == 2
+        # The response hook is removed once the query completes
+        assert self.mock_jira._session.hooks["response"] == []
+
+    def test_expression_errors(self):
+        self.mock_jira._session = Mock(hooks={"response": []})
+        profiler = Profiler()
+        metrics = MetricsRegistry()
+
+        query = QueryDefinition.parse_obj(
+            {"select": ["key", "customfield_10010['missing']"], "from": "issues"}
+        )
+        executor = Executor(
+            self.mock_jira, query, profiler=ProfilerGroup([profiler, metrics])
+        )
+        rows = list(executor)
+
+        assert [row["customfield_10010['missing']"] for row in rows] == [None] * 3
+        assert executor.errors.get_counts() == {"customfield_10010['missing']": 3}
+        assert (
+            profiler.as_dict()["expressions"]["customfield_10010['missing']"]["errors"]
+            == 3
+        )
+        assert (
+            "jira_select_expression_errors_total"
+            "{expression=\"customfield_10010['missing']\"} 3"
+        ) in metrics.as_prometheus().splitlines()
+
+    def test_request_report(self):
+        profiler = Profiler()
+        for seconds in [0.1, 0.2, 0.3, 0.4]:
+            profiler.record_response(
+                Mock(elapsed=datetime.timedelta(seconds=seconds), content=b"abc")
+            )
+
+        report = profiler.get_request_report()
+
+        assert report["count"] == 4
+        assert report["bytes"] == 12
+        assert report["p50_seconds"] == 0.2
+        assert report["p99_seconds"] == 0.4
+
+
+class TestTracer(PushdownTestCase):
+    def test_trace(self):
+        self.mock_jira._session = Mock(hooks={"response": []})
+        tracer = Tracer(min_duration=0)
+        profiler = Profiler()
+
+        query = QueryDefinition.parse_obj(
+            {"select": ["parse_datetime(created)"], "from": "issues"}
+        )
+        executor = Executor(
+            self.mock_jira, query, profiler=ProfilerGroup([profiler, tracer])
+        )
+        list(executor)
+
+        events = tracer.as_dict()["traceEvents"]
+        spans = {
+            (event["cat"], event["name"]) for event in events if event["ph"] == "X"
+        }
+
+        assert spans == {
+            ("phase", "source"),
+            ("phase", "select"),
+            ("function", "parse_datetime"),
+        }
+        assert events[0]["ph"] == "M"
+        # Both profilers saw the query
+        assert profiler.as_dict()["phases"]["select"]["rows"] == 3
+
+    def test_response_span(self):
+        tracer = Tracer(min_duration=0)
+        tracer.record_response(
+            Mock(
+                elapsed=datetime.timedelta(seconds=0.25),
+                url="https://jira.example.com/rest/api/2/search?startAt=100",
+                request=Mock(method="GET"),
+                status_code=200,
+                content=b"{}",
+            )
+        )
+
+        (event,) = tracer.events
+
+        assert event["name"] == "GET /rest/api/2/search"
+        assert event["dur"] == 250000
+        assert event["args"] == {"query": "startAt=100", "status": 200, "bytes": 2}
+
+    def test_short_spans_omitted(self):
+        tracer = Tracer(min_duration=1)
+        with tracer.span("cache read", "cache"):
+            pass
+
+        assert tracer.events == []
+
+
+class TestMetrics(PushdownTestCase):
+    def test_metrics(self):
+        self.mock_jira._session = Mock(hooks={"response": []})
+        metrics = MetricsRegistry()
+
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "filter": ["int(customfield_10010) % 2 == 1"],
+            }
+        )
+        for _ in range(2):
+            list(Executor(self.mock_jira, query, profiler=metrics))
+        metrics.record_response(
+            Mock(status_code=429, elapsed=datetime.timedelta(seconds=0.2), content=b"")
+        )
+
+        lines = metrics.as_prometheus().splitlines()
+
+        assert "jira_select_queries_total 2" in lines
+        assert 'jira_select_rows_total{phase="source"} 6' in lines
+        assert 'jira_select_rows_total{phase="filter"} 4' in lines
+        assert 'jira_select_rows_total{phase="select"} 4' in lines
+        assert "jira_select_source_rows_expected 3" in lines
+        assert 'jira_select_http_requests_total{status="429"} 1' in lines
+        assert "jira_select_http_retries_total 1" in lines
+        assert 'jira_select_http_request_duration_seconds_bucket{le="0.1"} 0' in lines
+        assert 'jira_select_http_request_duration_seconds_bucket{le="0.25"} 1' in lines
+        assert 'jira_select_http_request_duration_seconds_bucket{le="+Inf"} 1' in lines
+        assert "# TYPE jira_select_query_duration_seconds histogram" in lines
+        assert metrics.as_dict()["counters"]["queries_total"] == [
+            {"labels": {}, "value": 2}
+        ]
+
+
+class TestProgress(PushdownTestCase):
+    def test_updates_batched(self):
+        progress = Mock()
+        tracker = ProgressTracker(progress, TaskID(1), total=lambda: 10, interval=60)
+
+        for _ in range(5):
+            tracker.advance()
+        tracker.flush()
+
+        # Once for the first row, then once for the remainder
+        assert progress.update.call_count == 2
+        assert [call.kwargs["advance"] for call in progress.update.call_args_list] == [
+            1,
+            4,
+        ]
+        assert progress.update.call_args.kwargs["total"] == 10
+
+    def test_null_progress_untracked(self):
+        query = QueryDefinition.parse_obj({"select": ["key"], "from": "issues"})
+        executor = Executor(self.mock_jira, query)
+        executor._progress_bar = NullProgressbar()
+        rows = iter([1, 2, 3])
+
+        assert executor.track_progress(rows, TaskID(0)) is rows
+
+    def test_query_with_progress(self):
+        query = QueryDefinition.parse_obj(
+            {
+                "select": ["key"],
+                "from": "issues",
+                "filter": ["int(customfield_10010) % 2 == 1"],
+                "sort_by": ["customfield_10010 desc"],
+            }
+        )
+        executor = Executor(self.mock_jira, query, progress_bar=True)
+
+        assert [row["key"] for row in executor] == ["ALPHA-3", "ALPHA-1"]
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import ast
 import copy
+import datetime
+import json
 from unittest.mock import ANY
 from unittest.mock import Mock
 from unittest.mock import patch
 
+import portion
+import pytz
 import simpleeval
 
 from jira_select import query
 from jira_select import utils
+from jira_select.intervals import IntervalSet
 from jira_select.types import SelectFieldDefinition
 
 from .base import JiraSelectTestCase
@@ -97,6 +103,39 @@ class TestCalculateResultHash(JiraSelectTestCase):
         assert isinstance(utils.calculate_result_hash(row, ["key"], {}), int)
 
 
+class TestGetFunctionCalls(JiraSelectTestCase):
+    def test_unconditional(self):
+        calls = utils.get_function_calls(
+            "f(1) if f(2) else f(3) or [f(4) for x in f(5)] and f(6)",
+            ["f"],
+            unconditional=True,
+        )
+
+        assert sorted(ast.unparse(call) for call in calls) == ["f(2)"]
+
+        calls = utils.get_function_calls(
+            "[f(1) for x in f(2)] + [(f(3) and f(4)), f(5) < f(6) < f(7)]",
+            ["f"],
+            unconditional=True,
+        )
+
+        assert sorted(ast.unparse(call) for call in calls) == [
+            "f(2)",
+            "f(3)",
+            "f(5)",
+            "f(6)",
+        ]
+
+    def test_all(self):
+        calls = utils.get_function_calls("f(1) if f(2) else f(3)", ["f"])
+
+        assert sorted(ast.unparse(call) for call in calls) == [
+            "f(1)",
+            "f(2)",
+            "f(3)",
+        ]
+
+
 class TestGetRowDict(JiraSelectTestCase):
     def test_copies_field_data(self):
         field_data = {
@@ -236,3 +275,73 @@ class TestGetFieldData(JiraSelectTestCase):
 
         result = utils.get_field_data(mock_row, "arbitrary")
         assert result is None
+
+    @patch("simpleeval.simple_eval")
+    def test_errors_collected(self, simple_eval):
+        simple_eval.side_effect = KeyError("missing")
+        errors = utils.ExpressionErrors(sample_size=2)
+
+        with patch.object(utils.logger, "warning") as warning:
+            for index in range(3):
+                mock_row = Mock(
+                    key=f"ALPHA-{index}", as_dict=Mock(return_value={"field": "OK"})
+                )
+                assert (
+                    utils.get_field_data(mock_row, "arbitrary", errors=errors) is None
+                )
+
+            assert not warning.called
+
+            errors.log_summary()
+
+        assert errors.get_counts() == {"arbitrary": 3}
+        (summary,) = errors.errors.values()
+        assert summary.sample_keys == ["ALPHA-0", "ALPHA-1"]
+        # Logged once for the whole run
+        assert warning.call_count == 1
+
+
+class TestIntervalSet(JiraSelectTestCase):
+    def hours(self, lower, upper):
+        return (
+            datetime.datetime(2020, 1, 1, lower, tzinfo=pytz.UTC),
+            datetime.datetime(2020, 1, 1, upper, tzinfo=pytz.UTC),
+        )
+
+    def test_merges_segments(self):
+        interval_set = IntervalSet(
+            [self.hours(5, 7), self.hours(1, 3), self.hours(3, 4), self.hours(6, 6)]
+        )
+
+        assert list(interval_set) == [self.hours(1, 4), self.hours(5, 7)]
+
+    def test_set_operations(self):
+        left = IntervalSet([self.hours(1, 4), self.hours(6, 9)])
+        right = IntervalSet([self.hours(3, 7)])
+
+        assert list(left | right) == [self.hours(1, 9)]
+        assert list(left & right) == [self.hours(3, 4), self.hours(6, 7)]
+        assert list(left - right) == [self.hours(1, 3), self.hours(7, 9)]
+        assert (left & right).size() == datetime.timedelta(hours=2)
+
+    def test_touching_segments_do_not_intersect(self):
+        left = IntervalSet([self.hours(1, 3)])
+        right = IntervalSet([self.hours(3, 5)])
+
+        assert not left & right
+
+    def test_portion_interoperability(self):
+        interval_set = IntervalSet([self.hours(1, 4)])
+        interval = portion.closed(*self.hours(3, 6))
+
+        assert list(interval_set | interval) == [self.hours(1, 6)]
+        assert list(interval & interval_set) == [self.hours(3, 4)]
+        assert interval_set.to_portion() == portion.closed(*self.hours(1, 4))
+        assert IntervalSet.from_portion(interval) == interval
+
+    def test_json_encoding(self):
+        interval_set = IntervalSet([self.hours(1, 4)])
+
+        assert json.loads(
+            json.dumps(interval_set, cls=utils.JiraSelectJsonEncoder)
+        ) == [["2020-01-01 01:00:00Z", "2020-01-01 04:00:00Z"]]